@@ -40,8 +40,9 @@ app.include_router(advisor.router,      prefix="/api/advisor",      tags=["advis
 
 # ─── APScheduler 일일 파이프라인 ──────────────────────────────
 
-def _run_script(script_path: str, log_label: str):
-    """quant_project/.venv로 서브프로세스 실행"""
+def _run_script(script_path: str, log_label: str, env: dict | None = None,
+                timeout: int | None = 3600):
+    """quant_project/.venv로 서브프로세스 실행 (env: 추가 환경변수)"""
     from config import BASE_DIR
     venv_python = os.path.join(BASE_DIR, ".venv", "bin", "python")
     if not os.path.exists(venv_python):
@@ -49,7 +50,8 @@ def _run_script(script_path: str, log_label: str):
     try:
         result = subprocess.run(
             [venv_python, script_path],
-            capture_output=True, text=True, timeout=3600,
+            capture_output=True, text=True, timeout=timeout,
+            env={**os.environ, **env} if env else None,
         )
         if result.returncode != 0:
             logger.error(f"{log_label} 실패:\n{result.stderr[:500]}")
@@ -92,6 +94,20 @@ def job_analysis_cache():
         logger.error(f"정성 분석 캐시 갱신 오류: {e}")
 
 
+def job_model_reload():
+    """MODEL_RELOAD_SEC 주기 — 새 모델 버전(latest 링크/registry 변경) 감지 시 핫 리로드"""
+    from services.model_server import get_model_server
+    get_model_server().refresh()
+
+
+def job_monthly_retrain():
+    """매월 RETRAIN_DAY일 02:00 KST — 증분 모드 재학습 (새 WF 윈도우 + 최종 모델만 학습).
+    저장이 끝나면 job_model_reload가 새 latest 버전을 핫 리로드한다."""
+    from config import BASE_DIR
+    script = os.path.join(BASE_DIR, "scripts", "train_model.py")
+    _run_script(script, "월간 증분 재학습", env={"TRAIN_MODE": "incremental"}, timeout=None)
+
+
 def job_sentiment():
     """18:30 KST — 감성분석 갱신"""
     from services.sentiment_service import collect_sentiment
@@ -108,13 +124,25 @@ scheduler.add_job(job_sentiment,      "cron", hour=18, minute=30, id="sentiment"
 
 @app.on_event("startup")
 def startup():
+    # 모델 번들 선로드 → 첫 요청부터 디스크 I/O 없이 예측
+    from config import MODEL_RELOAD_SEC, RETRAIN_DAY
+    from services.model_server import get_model_server
+    get_model_server().refresh()
+    if MODEL_RELOAD_SEC > 0:
+        scheduler.add_job(job_model_reload, "interval", seconds=MODEL_RELOAD_SEC, id="model_reload")
+    if RETRAIN_DAY > 0:
+        scheduler.add_job(job_monthly_retrain, "cron", day=RETRAIN_DAY, hour=2, minute=0,
+                          id="monthly_retrain", max_instances=1, coalesce=True)
+
     scheduler.start()
     logger.info("APScheduler 시작 (18:00~18:30 KST 일일 파이프라인)")
 
 
 @app.on_event("shutdown")
 def shutdown():
+    from services.backtest_jobs import shutdown_job_manager
     scheduler.shutdown(wait=False)
+    shutdown_job_manager()
 
 
 @app.get("/health")
@@ -122,6 +150,35 @@ def health():
     return {"status": "ok", "version": "1.0.0"}
 
 
+@app.get("/admin/models")
+def model_status():
+    """상주 모델 현재/직전 버전"""
+    from services.model_server import get_model_server
+    return get_model_server().status()
+
+
+@app.post("/admin/models/reload")
+def model_reload():
+    """latest 번들 강제 재로드"""
+    from services.model_server import get_model_server
+    server = get_model_server()
+    server.refresh(force=True)
+    return server.status()
+
+
+@app.post("/admin/models/rollback")
+def model_rollback():
+    """직전 모델 버전으로 즉시 복귀"""
+    from fastapi import HTTPException
+    from services.model_server import get_model_server
+    server = get_model_server()
+    try:
+        server.rollback()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return server.status()
+
+
 @app.post("/admin/run-pipeline")
 def run_pipeline_now():
     """수동 파이프라인 즉시 실행 (테스트용)"""
@@ -2,14 +2,25 @@
 백테스트 결과 엔드포인트 — P6 실제 JSON 파일 연결
 models/results/backtest_summary.json
 data/processed/sharpe_contour.json
+
+온디맨드 백테스트 (services.backtest_jobs 비동기 작업 큐):
+  POST   /run                 임의 그리드(ml_weight × rule_weight × top_n × cost) 작업 등록 → 즉시 job id
+  GET    /jobs                최근 작업 목록
+  GET    /jobs/{id}?since=N   상태·진행률 + N번째 이후 부분 결과 (next = 다음 커서)
+  GET    /jobs/{id}/stream    완료되는 결과를 NDJSON으로 스트리밍 (마지막 줄 = 작업 상태)
+  DELETE /jobs/{id}           취소
 """
 
+import asyncio
 import json
 import logging
 import os
+from functools import lru_cache
 
+import numpy as np
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -32,10 +43,24 @@ class SharpeContourPoint(BaseModel):
     rule_weight: float | None = None
     top_n:       int
     sharpe:      float
+    sharpe_lo:   float | None = None     # 95% bootstrap 신뢰구간
+    sharpe_hi:   float | None = None
+    sortino:     float | None = None
+    calmar:      float | None = None
     cagr:        float | None = None
     mdd:         float | None = None
 
 
+class BacktestRunRequest(BaseModel):
+    ml_weights:   list[float] = Field(default=[0.5], min_length=1)
+    rule_weights: list[float] = Field(default=[0.3], min_length=1)
+    top_ns:       list[int]   = Field(default=[10],  min_length=1)
+    costs:        list[float] | None = None           # None → 기본 비용 (슬리피지 + 수수료)
+
+
+STREAM_POLL_SEC = 0.5
+
+
 def _load_json(path: str) -> dict | list | None:
     if not os.path.exists(path):
         return None
@@ -72,6 +97,10 @@ def get_sharpe_contour():
             rule_weight = p.get("rule_weight"),      # None이면 그대로
             top_n       = int(p.get("top_n", 10)),
             sharpe      = p.get("sharpe", 0.0),
+            sharpe_lo   = p.get("sharpe_lo"),
+            sharpe_hi   = p.get("sharpe_hi"),
+            sortino     = p.get("sortino"),
+            calmar      = p.get("calmar"),
             cagr        = p.get("cagr"),
             mdd         = p.get("mdd"),
         ))
@@ -171,25 +200,123 @@ def get_optimal_params(metric: str = "sharpe", top_k: int = 5):
     }
 
 
+@lru_cache(maxsize=32)
+def _equity_curves(path: str, mtime_ns: int, max_points: int):
+    """equity_curve.parquet → (strategy, benchmark) 곡선, max_points > 0이면 LTTB 축소.
+    (파일 버전 = 수정 시각, max_points)별 캐시 → 같은 요청은 파일 I/O·축소 계산 없음"""
+    import pandas as pd
+    from services.equity_curve import EquityCurves
+    stored = EquityCurves.from_frame(pd.read_parquet(path))
+    curves = EquityCurves(stored.days, {role: stored.values[n]
+                                        for role, n in zip(("strategy", "benchmark"), stored.names)})
+    return curves.downsample(max_points)
+
+
 @router.get("/equity-curve")
-def get_equity_curve():
-    """누적 수익률 시계열 반환 (전략 vs SPY)"""
+def get_equity_curve(format: str = "json", max_points: int = 0):
+    """누적 수익률 시계열 반환 (전략 vs SPY)
+
+    format: "json"(기본, {"dates","strategy","benchmark"} 리스트) | "delta"(차분 인코딩 JSON,
+            services.equity_curve.decode_delta로 복원) | "arrow"(Arrow IPC 스트림: day/strategy/benchmark)
+    max_points: > 0이면 LTTB로 최대 max_points개로 축소 (최대 낙폭 고점·저점 보존), 0 = 전체
+    """
     from config import BASE_DIR, DATA_PROCESSED
-    # equity_curve.parquet → JSON 변환 or equity_curve.json 직접 로드
+    if format not in ("json", "delta", "arrow"):
+        raise HTTPException(status_code=422, detail=f"알 수 없는 format: {format}")
+    if max_points < 0:
+        raise HTTPException(status_code=422, detail="max_points ≥ 0 이어야 합니다.")
+
+    # equity_curve.parquet (열 저장) → 요청 형식으로 인코딩, 없으면 equity_curve.json 직접 로드
     parquet_path = os.path.join(DATA_PROCESSED, "equity_curve.parquet")
     if os.path.exists(parquet_path):
-        import pandas as pd
-        ec = pd.read_parquet(parquet_path)
-        cols = ec.columns.tolist()
-        return {
-            "dates": ec.index.astype(str).tolist() if ec.index.dtype != object else ec.index.tolist(),
-            "strategy":  ec[cols[0]].tolist() if cols else [],
-            "benchmark": ec[cols[1]].tolist() if len(cols) > 1 else [],
-        }
+        curves = _equity_curves(parquet_path, os.stat(parquet_path).st_mtime_ns, max_points)
+        if format == "arrow":
+            from fastapi import Response
+            return Response(curves.to_arrow_ipc(), media_type="application/vnd.apache.arrow.stream")
+        if format == "delta":
+            return curves.to_delta_json()
+        return {"benchmark": [], **curves.to_lists()}
+    if format != "json":
+        raise HTTPException(status_code=404, detail="equity_curve.parquet 없음. P5 백테스트를 먼저 실행하세요.")
     path = os.path.join(DATA_PROCESSED, "equity_curve.json")
     if not os.path.exists(path):
         path = os.path.join(BASE_DIR, "models", "results", "equity_curve.json")
     data = _load_json(path)
     if data is None:
         return {"dates": [], "strategy": [], "benchmark": []}
+    if max_points and len(data.get("dates", [])) > max_points:
+        from services.equity_curve import EquityCurves, to_days
+        names  = [n for n in ("strategy", "benchmark") if len(data.get(n) or []) == len(data["dates"])]
+        curves = EquityCurves(to_days(data["dates"]), {n: np.asarray(data[n], dtype=np.float32) for n in names})
+        data   = {"benchmark": [], **curves.downsample(max_points).to_lists()}
     return data
+
+
+# ─── 온디맨드 백테스트 작업 ───────────────────────────────────
+
+@router.post("/run", status_code=202)
+def run_backtest_job(req: BacktestRunRequest):
+    """백테스트/스윕 작업 등록 — 계산은 작업 큐 워커에서, 응답은 즉시"""
+    from config import BACKTEST_JOB_MAX_POINTS
+    from services.backtest_engine import DEFAULT_COST
+    from services.backtest_jobs import get_job_manager
+    from services.backtest_sweep import param_grid
+
+    if any(n < 1 for n in req.top_ns) or any(w < 0 for w in req.ml_weights + req.rule_weights):
+        raise HTTPException(status_code=422, detail="top_n ≥ 1, 가중치 ≥ 0 이어야 합니다.")
+    grid = param_grid(req.ml_weights, req.rule_weights, req.top_ns, req.costs or [DEFAULT_COST])
+    if len(grid) > BACKTEST_JOB_MAX_POINTS:
+        raise HTTPException(status_code=422,
+                            detail=f"그리드 {len(grid)}개 > 최대 {BACKTEST_JOB_MAX_POINTS}개")
+
+    job, duplicate = get_job_manager().submit(grid)
+    return {"job_id": job.id, "status": job.status, "total": job.total, "deduplicated": duplicate}
+
+
+@router.get("/jobs")
+def list_backtest_jobs():
+    from services.backtest_jobs import get_job_manager
+    return get_job_manager().list()
+
+
+def _get_job(job_id: str):
+    from services.backtest_jobs import get_job_manager
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업 없음: {job_id}")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+def get_backtest_job(job_id: str, since: int = 0):
+    """작업 상태 + 진행률 + since 이후 부분 결과 (폴링 시 응답의 next를 since로 전달)"""
+    return _get_job(job_id).view(since)
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_backtest_job(job_id: str):
+    """완료되는 결과를 한 줄씩(NDJSON) 전송, 작업이 끝나면 상태 요약 줄로 종료"""
+    from services.backtest_jobs import FINAL_STATES
+    job = _get_job(job_id)
+
+    async def _lines():
+        since = 0
+        while True:
+            view = job.view(since)
+            for r in view.pop("results"):
+                yield json.dumps(r, default=str) + "\n"
+            since = view["next"]
+            if view["status"] in FINAL_STATES:
+                yield json.dumps(view, default=str) + "\n"
+                return
+            await asyncio.sleep(STREAM_POLL_SEC)
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@router.delete("/jobs/{job_id}")
+def cancel_backtest_job(job_id: str):
+    from services.backtest_jobs import get_job_manager
+    _get_job(job_id)
+    job = get_job_manager().cancel(job_id)
+    return {"job_id": job.id, "status": job.status}
@@ -7,10 +7,11 @@
 import logging
 import os
 from datetime import datetime
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -44,69 +45,52 @@ class PortfolioStatus(BaseModel):
 
 
 def _load_signals() -> pd.DataFrame | None:
-    """factors.parquet 마지막 날 기준 ML 신호 로드"""
+    """최신 ML 신호 로드 — ohlcv 후행 윈도우로 최신 팩터 단면 직접 계산
+    (ohlcv 없으면 factors.parquet 마지막 날 폴백).
+    모델은 프로세스 상주 ModelServer가 보유 → 요청마다 모델 파일을 읽지 않는다."""
     try:
-        from config import DATA_PROCESSED, BASE_DIR
-        import joblib
+        from config import DATA_PROCESSED
+        from services.model_server import get_model_server
 
         factors_path = os.path.join(DATA_PROCESSED, "factors.parquet")
-        model_dir    = os.path.join(BASE_DIR, "models", "trained", "latest")
+        ohlcv_path   = os.path.join(DATA_PROCESSED, "ohlcv.parquet")
 
-        if not os.path.exists(factors_path) or not os.path.exists(model_dir):
+        # 모델 버전 스냅샷 1개로 피처 계산·예측 (도중 핫 리로드/롤백이 있어도 같은 버전)
+        server = get_model_server()
+        model  = server.current()
+        if model is None:
             return None
-
-        df = pd.read_parquet(factors_path)
-        selected_path = os.path.join(DATA_PROCESSED, "selected_features.json")
-        if not os.path.exists(selected_path):
+        if not os.path.exists(ohlcv_path) and not os.path.exists(factors_path):
             return None
 
-        import json
-        with open(selected_path) as f:
-            raw = json.load(f)
-        # selected_features.json이 {"selected_features": [...]} 또는 직접 리스트 모두 처리
-        if isinstance(raw, dict):
-            features = raw.get("selected_features", list(raw.keys()))
+        # 모델이 학습한 피처 기준 (단면 정규화 모델이면 동일 정규화 적용 → {factor}_cs)
+        features      = model.raw_features
+        normalization = model.normalization
+
+        if os.path.exists(ohlcv_path) and normalization:
+            from services.cross_section import load_latest_normalized
+            # rsi는 응답 표시용으로 함께 계산
+            last_date, last_df = load_latest_normalized(features, normalization, extra=["rsi"])
+        elif os.path.exists(ohlcv_path):
+            from services.factor_registry import load_latest_factors
+            # rsi는 응답 표시용으로 함께 계산
+            wanted = features + (["rsi"] if "rsi" not in features else [])
+            last_date, last_df = load_latest_factors(wanted, universe=model.universe)
         else:
-            features = raw
-
-        # 마지막 날 데이터 — RangeIndex 또는 MultiIndex 양쪽 처리
-        if "date" in df.columns:
-            # RangeIndex + 컬럼 형태
-            last_date = pd.to_datetime(df["date"]).max()
-            last_df = df[pd.to_datetime(df["date"]) == last_date].copy()
-            last_df = last_df.set_index("ticker")
-        else:
-            # MultiIndex (date, ticker) 형태
-            last_date = df.index.get_level_values("date").max()
-            last_df   = df.xs(last_date, level="date")
-
-        # 스케일러 로드 (있으면 사용)
-        scaler = None
-        scaler_path = os.path.join(model_dir, "scaler.pkl")
-        if os.path.exists(scaler_path):
-            scaler = joblib.load(scaler_path)
-
-        X = last_df[features].fillna(0)
-
-        # 앙상블 모델 로드 (파일명 lgbm.pkl 또는 lightgbm.pkl 모두 시도)
-        preds = []
-        for model_file in ["lgbm.pkl", "lightgbm.pkl", "ridge.pkl"]:
-            mpath = os.path.join(model_dir, model_file)
-            if os.path.exists(mpath):
-                model = joblib.load(mpath)
-                if scaler is not None:
-                    X_arr = scaler.transform(X.values)
-                    X_input = pd.DataFrame(X_arr, index=X.index, columns=X.columns)
-                else:
-                    X_input = X
-                preds.append(model.predict(X_input))
-
-        if not preds:
-            return None
+            df = pd.read_parquet(factors_path)
+            # 마지막 날 데이터 — RangeIndex 또는 MultiIndex 양쪽 처리
+            if "date" in df.columns:
+                # RangeIndex + 컬럼 형태
+                last_date = pd.to_datetime(df["date"]).max()
+                last_df = df[pd.to_datetime(df["date"]) == last_date].copy()
+                last_df = last_df.set_index("ticker")
+            else:
+                # MultiIndex (date, ticker) 형태
+                last_date = df.index.get_level_values("date").max()
+                last_df   = df.xs(last_date, level="date")
 
-        signal = np.mean(preds, axis=0)
         result = last_df[["rsi"]].copy() if "rsi" in last_df.columns else pd.DataFrame(index=last_df.index)
-        result["signal"] = signal
+        result["signal"] = server.predict(last_df, model)
         return result
 
     except Exception as e:
@@ -400,19 +384,32 @@ def get_current_portfolio(top_n: int = 10, sentiment_weight: float = 0.0):
     )
 
 
-@router.get("/history")
-def get_portfolio_history(days: int = 30):
-    """포트폴리오 가치 히스토리 (equity_curve.json 활용)"""
-    from config import BASE_DIR
+@lru_cache(maxsize=32)
+def _history(path: str, mtime_ns: int, days: int, max_points: int) -> dict:
+    """equity_curve.json 최근 days일 (max_points > 0이면 LTTB 축소) — (파일 버전, days, max_points)별 캐시"""
     import json
-    path = os.path.join(BASE_DIR, "models", "results", "equity_curve.json")
-    if not os.path.exists(path):
-        return {"dates": [], "values": []}
+    from services.equity_curve import EquityCurves, to_days
     with open(path) as f:
         data = json.load(f)
     dates    = data.get("dates", [])[-days:]
     strategy = data.get("strategy", [])[-days:]
-    return {"dates": dates, "values": strategy}
+    if not max_points or len(dates) <= max_points:
+        return {"dates": dates, "values": strategy}
+    curve = EquityCurves(to_days(dates), {"values": np.asarray(strategy, dtype=np.float32)})
+    return curve.downsample(max_points).to_lists()
+
+
+@router.get("/history")
+def get_portfolio_history(days: int = 30, max_points: int = 0):
+    """포트폴리오 가치 히스토리 (equity_curve.json 활용)
+    max_points > 0이면 LTTB로 최대 약 max_points개로 축소 (최대 낙폭 고점·저점 보존)"""
+    from config import BASE_DIR
+    if max_points < 0:
+        raise HTTPException(status_code=422, detail="max_points ≥ 0 이어야 합니다.")
+    path = os.path.join(BASE_DIR, "models", "results", "equity_curve.json")
+    if not os.path.exists(path):
+        return {"dates": [], "values": []}
+    return _history(path, os.stat(path).st_mtime_ns, days, max_points)
 
 
 @router.get("/regime")
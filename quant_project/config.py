@@ -31,6 +31,58 @@ DATA_PROCESSED  = os.path.join(BASE_DIR, "data", "processed")
 DATA_CONSTITUENTS = os.path.join(BASE_DIR, "data", "constituents")
 DATA_CHECKPOINTS  = os.path.join(BASE_DIR, "data", "checkpoints")
 
+# ─── 팩터 빌드 ────────────────────────────────────────────────
+# 0 = 인메모리 빌드 / >0 = 날짜 블록 단위 아웃오브코어 빌드 (메모리 상한 MB — ohlcv 블록 읽기·베타 포함,
+#     부분 읽기 지원 저장소 전용: STORAGE_BACKEND=parquet)
+FACTOR_MEMORY_MB = int(os.getenv("FACTOR_MEMORY_MB", "0"))
+
+# ─── 모델 학습 병렬화 ─────────────────────────────────────────
+# 0 = 자동 (CPU 예산: os.cpu_count(), 워커: 예산 // 2)
+TRAIN_CPU_BUDGET = int(os.getenv("TRAIN_CPU_BUDGET", "0"))
+TRAIN_N_WORKERS  = int(os.getenv("TRAIN_N_WORKERS",  "0"))
+
+# Optuna: pruner ("hyperband" | "median" | "none"), fit당 병렬 trial 수, study 저장소
+OPTUNA_PRUNER  = os.getenv("OPTUNA_PRUNER", "hyperband")
+OPTUNA_N_JOBS  = int(os.getenv("OPTUNA_N_JOBS", "2"))
+OPTUNA_STORAGE = os.getenv("OPTUNA_STORAGE",
+                           "sqlite:///" + os.path.join(DATA_CHECKPOINTS, "optuna.db"))
+
+# 학습 백엔드(max_bin / LightGBM 스레딩) 보정:
+#   "1" = 저장된 보정 결과 재사용 (없거나 패널 크기가 크게 바뀌면 보정) / "force" = 항상 재보정 / "0" = 기본값 사용
+TRAIN_BACKEND_CALIBRATE = os.getenv("TRAIN_BACKEND_CALIBRATE", "1")
+
+# 학습 모드: "full" = TimeSeriesSplit 전체 윈도우 / "incremental" = 시작일 고정 그리드, 새 윈도우만 학습
+TRAIN_MODE = os.getenv("TRAIN_MODE", "full")
+
+# 월간 증분 재학습 실행일 (매월 N일 02:00 KST, 0 = 비활성)
+RETRAIN_DAY = int(os.getenv("RETRAIN_DAY", "1"))
+
+# 1 = 학습 실행 보고서(run_report.json) 옆에 flamegraph용 profile.folded 추가 기록
+TRAIN_PROFILE_FOLDED = int(os.getenv("TRAIN_PROFILE_FOLDED", "0"))
+
+# ─── 백테스트 ─────────────────────────────────────────────────
+# ML 신호: "oos" = Walk-Forward 검증 예측 이어 붙이기 / "model" = 최종 모델 전 기간 추론
+BACKTEST_SIGNALS = os.getenv("BACKTEST_SIGNALS", "oos")
+
+# 파라미터 스윕 프로세스 수 (0 = CPU 수)
+BACKTEST_SWEEP_WORKERS = int(os.getenv("BACKTEST_SWEEP_WORKERS", "0"))
+
+# 결과 캐시 (services.backtest_store) — 0이면 매번 재계산하고 저장하지 않음
+BACKTEST_CACHE = int(os.getenv("BACKTEST_CACHE", "1"))
+# 보존할 최근 데이터 버전 수 — 이전 버전의 결과 행·곡선 테이블은 저장 시 삭제 (0 = 모두 보존)
+BACKTEST_KEEP_DATA_VERSIONS = int(os.getenv("BACKTEST_KEEP_DATA_VERSIONS", "3"))
+
+# Sharpe 신뢰구간 stationary block bootstrap 재표본 수 (services.metrics, 0 = 신뢰구간 생략)
+BACKTEST_BOOTSTRAP = int(os.getenv("BACKTEST_BOOTSTRAP", "200"))
+
+# API 비동기 백테스트 작업: 동시 실행 작업 수 / 작업당 최대 그리드 크기
+BACKTEST_JOB_CONCURRENCY = int(os.getenv("BACKTEST_JOB_CONCURRENCY", "2"))
+BACKTEST_JOB_MAX_POINTS  = int(os.getenv("BACKTEST_JOB_MAX_POINTS",  "5000"))
+
+# ─── 모델 서빙 ────────────────────────────────────────────────
+# API 프로세스 상주 모델의 새 버전 감시 주기 (초, 0 = 감시 안 함)
+MODEL_RELOAD_SEC = int(os.getenv("MODEL_RELOAD_SEC", "60"))
+
 # ─── 학습 기간 ────────────────────────────────────────────────
 TRAIN_START = "2014-01-01"
 TRAIN_END   = "2024-12-31"
@@ -8,12 +8,14 @@
 import json
 import os
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import requests
 import streamlit as st
 
 API = "http://localhost:8000"
+EQUITY_MAX_POINTS = 800     # 차트 폭 기준 서버 측 LTTB 축소 점 수
 
 st.set_page_config(page_title="백테스트", layout="wide")
 
@@ -41,6 +43,19 @@ def _get(endpoint: str, **params):
     return r.json()
 
 
+def _equity_curve() -> dict:
+    """차분 인코딩 응답(format=delta) 복원 → {"dates", "strategy", "benchmark"}. 미지원 시 기존 JSON."""
+    try:
+        p = _get("/api/backtest/equity-curve", format="delta", max_points=EQUITY_MAX_POINTS)
+    except requests.HTTPError:
+        return _get("/api/backtest/equity-curve", max_points=EQUITY_MAX_POINTS)
+    days = np.cumsum([p["start_day"], *p["day_deltas"]])
+    out  = {"dates": pd.to_datetime(days, unit="D").strftime("%Y-%m-%d").tolist(), "benchmark": []}
+    for name, s in p["series"].items():
+        out[name] = (np.cumsum([s["first"], *s["deltas"]]) / p["scale"]).tolist()
+    return out
+
+
 def _ai_insight(context: dict) -> str:
     try:
         r = requests.post(f"{API}/api/advisor/insight",
@@ -61,7 +76,8 @@ try:
     col4.metric("MDD",     f"{summary['max_drawdown']*100:.1f}%",
                 delta=f"{'목표달성 ✅' if summary['max_drawdown'] >= -0.30 else '목표미달 ⚠️'}")
     col5.metric("승률",    f"{summary['win_rate']*100:.1f}%")
-    st.caption(f"기간: {summary['start_date']} ~ {summary['end_date']}")
+    st.caption(f"기간: {summary['start_date']} ~ {summary['end_date']}"
+               + (f" · Calmar {summary['calmar']:.2f}" if summary.get("calmar") is not None else ""))
 except Exception as e:
     st.warning(f"백테스트 요약 로드 실패: {e}")
     summary = {}
@@ -80,14 +96,23 @@ try:
         if "rule_weight" in df_c.columns and df_c["rule_weight"].nunique() > 1:
             # ── 신규: ml_weight × rule_weight 3D Surface ──────────────
             pivot = df_c.pivot_table(index="rule_weight", columns="ml_weight", values="sharpe")
-            fig3d = go.Figure(data=[go.Surface(
+            surface = dict(
                 z=pivot.values,
                 x=pivot.columns.tolist(),   # ml_weight
                 y=pivot.index.tolist(),      # rule_weight
                 colorscale="RdYlGn",
                 colorbar=dict(title="Sharpe", thickness=15),
                 hovertemplate="ML가중치: %{x:.1f}<br>룰베이스가중치: %{y:.1f}<br>Sharpe: %{z:.3f}<extra></extra>",
-            )])
+            )
+            if "sharpe_lo" in df_c.columns and df_c["sharpe_lo"].notna().any():
+                # 95% bootstrap 신뢰구간 (services.metrics) — 호버에 표시
+                ci = [df_c.pivot_table(index="rule_weight", columns="ml_weight", values=c)
+                      .reindex(index=pivot.index, columns=pivot.columns).values
+                      for c in ("sharpe_lo", "sharpe_hi")]
+                surface["customdata"]    = np.stack(ci, axis=-1)
+                surface["hovertemplate"] = ("ML가중치: %{x:.1f}<br>룰베이스가중치: %{y:.1f}<br>Sharpe: %{z:.3f}"
+                                            "<br>95% CI: [%{customdata[0]:.3f}, %{customdata[1]:.3f}]<extra></extra>")
+            fig3d = go.Figure(data=[go.Surface(**surface)])
             fig3d.update_layout(
                 scene=dict(
                     xaxis_title="ML 가중치 (ml_weight)",
@@ -106,6 +131,7 @@ try:
             st.plotly_chart(fig3d, use_container_width=True)
             st.caption("• X축: ML 모델 신호 가중치 | Y축: 룰베이스(모멘텀+저변동성) 신호 가중치 | Z축: Sharpe Ratio")
             st.caption("• 두 가중치 합은 정규화되므로 절대값보다 비율이 중요합니다.")
+            st.caption("• 95% CI: 월 단위 블록 부트스트랩 Sharpe 구간 — 구간이 겹치는 조합끼리의 차이는 잡음일 수 있습니다.")
         else:
             # ── 레거시 폴백: ml_weight × top_n 3D Surface ──────────────
             pivot = df_c.pivot_table(index="top_n", columns="ml_weight", values="sharpe")
@@ -140,7 +166,7 @@ st.divider()
 # ── 누적 수익률 — 전략 vs SPY ─────────────────────────────────
 st.markdown('<div class="qv-section-header">누적 수익률 — 전략 vs SPY 벤치마크</div>', unsafe_allow_html=True)
 try:
-    equity = _get("/api/backtest/equity-curve")
+    equity = _equity_curve()
     if equity.get("dates"):
         fig_eq = go.Figure()
         fig_eq.add_trace(go.Scatter(
@@ -217,9 +243,16 @@ try:
             f"ml={r.get('ml_weight',0):.1f}, rb={r.get('rule_weight',r.get('top_n',0))}"
             for _, r in df_sc.iterrows()
         ]
+        error_x = None
+        if "sharpe_lo" in df_sc.columns and df_sc["sharpe_lo"].notna().any():
+            error_x = dict(type="data", symmetric=False,
+                           array=(df_sc["sharpe_hi"] - df_sc["sharpe"]).tolist(),
+                           arrayminus=(df_sc["sharpe"] - df_sc["sharpe_lo"]).tolist(),
+                           color="rgba(76,155,232,0.35)", thickness=1)
         if "mdd" in df_sc.columns:
             fig_sc.add_trace(go.Scatter(
                 x=df_sc["sharpe"], y=df_sc["mdd"],
+                error_x=error_x,
                 mode="markers+text",
                 text=hover_text,
                 textposition="top center",
@@ -362,6 +395,57 @@ except Exception as e:
 
 st.divider()
 
+# ── 사용자 지정 백테스트 (비동기 작업) ───────────────────────────
+st.markdown('<div class="qv-section-header">🧪 사용자 지정 백테스트</div>', unsafe_allow_html=True)
+st.markdown('<div class="qv-hint">원하는 top_n·거래비용 조합으로 즉시 백테스트합니다. 이미 평가한 조합은 캐시에서 바로 반환됩니다.</div>', unsafe_allow_html=True)
+
+with st.form("bt_custom_run"):
+    c1, c2, c3, c4 = st.columns(4)
+    ml_ws   = c1.multiselect("ml_weight",   [0.1, 0.3, 0.5, 0.7, 0.9], default=[0.5])
+    rule_ws = c2.multiselect("rule_weight", [0.0, 0.1, 0.3, 0.5, 0.7, 0.9], default=[0.3])
+    top_ns  = c3.multiselect("top_n",       [5, 10, 15, 20, 30, 50], default=[10])
+    cost_bp = c4.multiselect("거래비용 (bp)", [0, 5, 10, 15, 20, 30], default=[15])
+    submitted = st.form_submit_button("백테스트 실행")
+
+if submitted and ml_ws and rule_ws and top_ns and cost_bp:
+    try:
+        r = requests.post(f"{API}/api/backtest/run", timeout=10, json={
+            "ml_weights": ml_ws, "rule_weights": rule_ws, "top_ns": top_ns,
+            "costs": [bp / 10000 for bp in cost_bp],
+        })
+        r.raise_for_status()
+        st.session_state["bt_job_id"] = r.json()["job_id"]
+    except Exception as e:
+        st.warning(f"작업 등록 실패: {e}")
+
+job_id = st.session_state.get("bt_job_id")
+if job_id:
+    import time
+    bar, rows = st.progress(0.0), []
+    since, job = 0, {}
+    try:
+        while True:
+            job = _get(f"/api/backtest/jobs/{job_id}", since=since)
+            rows += job["results"]
+            since = job["next"]
+            bar.progress(job["progress"], text=f"{job['status']} · {job['done']}/{job['total']} (캐시 {job['cached']})")
+            if job["status"] in ("done", "failed", "cancelled"):
+                break
+            time.sleep(0.5)
+    except Exception as e:
+        st.warning(f"작업 조회 실패: {e}")
+
+    if job.get("error"):
+        st.error(job["error"])
+    if rows:
+        df_run = pd.DataFrame(rows).sort_values("index")
+        st.dataframe(
+            df_run[["ml_weight", "rule_weight", "top_n", "cost", "sharpe", "cagr", "max_drawdown", "win_rate"]],
+            use_container_width=True, hide_index=True,
+        )
+
+st.divider()
+
 # ── AI 해설 패널 ──────────────────────────────────────────────
 st.markdown('<div class="qv-section-header">🤖 AI 퀀트 어드바이저 해설</div>', unsafe_allow_html=True)
 st.markdown('<div class="qv-hint">현재 성과 지표와 최적 파라미터를 분석하여 전략 권고를 제공합니다.</div>', unsafe_allow_html=True)
@@ -0,0 +1,212 @@
+"""
+팩터 파이프라인 벤치마크 (합성 OHLCV 패널)
+
+측정 대상 (단계별 wall time + peak 메모리):
+  calc_factors      : 종목별 루프 엔진 (build_factors.calc_factors)
+  calc_block        : 종목 축 벡터화 엔진 (build_factors._calc_block)
+  compute_ic        : 날짜별 Rank IC
+  compute_vif       : VIF
+  normalize         : 단면 정규화/중립화 (cross_section.normalize_long)
+두 엔진의 수치 동등성(최대 상대오차, NaN 위치 불일치 수)도 함께 기록.
+
+프로필 (환경변수 BENCH_PROFILE):
+  quick (기본) : 100종목 × 5년
+  full         : {100, 500, 3000}종목 × {5, 10, 20}년
+                 (종목별 루프 엔진은 500종목 이하에서만 실행)
+
+산출물:
+  data/benchmarks/factor_bench.jsonl  — 실행마다 누적 (git 커밋 해시 포함)
+  이전 커밋의 같은 (크기, 단계) 결과와 비교해 20% 이상 느려지면 경고.
+"""
+
+import os, sys, json, time, logging, subprocess, tracemalloc, warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts import build_factors as bf
+from services import cross_section
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+BASE_DIR    = Path(__file__).parent.parent
+BENCH_DIR   = BASE_DIR / "data" / "benchmarks"
+BENCH_PATH  = BENCH_DIR / "factor_bench.jsonl"
+
+PROFILES = {
+    "quick": {"tickers": [100],            "years": [5]},
+    "full":  {"tickers": [100, 500, 3000], "years": [5, 10, 20]},
+}
+LOOP_ENGINE_MAX_TICKERS = 500    # 종목별 루프 엔진은 이 이하에서만 측정
+REGRESSION_RATIO        = 1.2    # 이전 커밋 대비 20% 이상 느려지면 경고
+EQUIV_RTOL              = 1e-8
+
+
+# ─── 1. 합성 패널 ─────────────────────────────────────────────
+
+def make_synthetic_ohlcv(n_tickers: int, n_years: int, seed: int = 42) -> tuple[pd.DataFrame, ...]:
+    """load_price_data()와 같은 형태의 (close, high, low, volume) wide 패널 생성.
+    GBM 가격 + 일부 종목 늦은 상장(앞부분 NaN) 포함."""
+    rng     = np.random.default_rng(seed)
+    n_days  = 252 * n_years
+    dates   = pd.bdate_range("2000-01-03", periods=n_days)
+    tickers = [f"S{i:04d}" for i in range(n_tickers)]
+
+    vol   = rng.uniform(0.01, 0.035, n_tickers)
+    rets  = rng.standard_normal((n_days, n_tickers)) * vol + 0.0003
+    close = pd.DataFrame(50 * np.exp(np.cumsum(rets, axis=0)), index=dates, columns=tickers)
+
+    late = rng.random(n_tickers) < 0.1
+    for j in np.flatnonzero(late):
+        close.iloc[: rng.integers(60, n_days // 2), j] = np.nan
+
+    spread = np.abs(rng.standard_normal(close.shape)) * vol * 0.5
+    high   = close * (1 + spread)
+    low    = close * (1 - spread)
+    volume = pd.DataFrame(
+        rng.lognormal(13, 0.6, close.shape), index=dates, columns=tickers,
+    ).where(close.notna())
+
+    return close, high, low, volume.fillna(0)
+
+
+# ─── 2. 측정 ─────────────────────────────────────────────────
+
+def _measure(fn, *args, **kwargs) -> tuple[object, float, float]:
+    """(결과, 초, peak MB). 시간은 추적 없이, 메모리는 tracemalloc로 별도 1회 측정."""
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    seconds = time.perf_counter() - t0
+    del out
+
+    tracemalloc.start()
+    out = fn(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, seconds, peak / 2**20
+
+
+def _equivalence(loop_df: pd.DataFrame, block_df: pd.DataFrame) -> dict:
+    """두 엔진 결과의 최대 상대오차 / NaN 위치 불일치 수"""
+    a = loop_df.sort_index()
+    b = block_df.reindex(a.index)
+    cols = bf.FACTOR_COLS + bf.TARGET_COLS
+    av, bv = a[cols].to_numpy(), b[cols].to_numpy()
+    both = ~np.isnan(av) & ~np.isnan(bv)
+    rel  = np.abs(av[both] - bv[both]) / np.maximum(np.abs(av[both]), 1.0)
+    return {
+        "rows_loop":     int(len(loop_df)),
+        "rows_block":    int(len(block_df)),
+        "max_rel_err":   float(rel.max()) if rel.size else 0.0,
+        "nan_mismatch":  int((np.isnan(av) != np.isnan(bv)).sum()),
+    }
+
+
+def run_case(n_tickers: int, n_years: int) -> list[dict]:
+    close, high, low, volume = make_synthetic_ohlcv(n_tickers, n_years)
+    size = f"{n_tickers}x{n_years}y"
+    records: list[dict] = []
+
+    def record(stage: str, seconds: float, peak_mb: float, rows: int, **extra):
+        records.append({"size": size, "stage": stage, "seconds": round(seconds, 4),
+                        "peak_mb": round(peak_mb, 1), "rows": rows, **extra})
+        logger.info(f"  [{size}] {stage:<13} {seconds:8.3f}s  peak {peak_mb:8.1f}MB  ({rows:,}행)")
+
+    block_df, sec, mb = _measure(bf._calc_block, close, high, low, volume)
+    record("calc_block", sec, mb, len(block_df))
+
+    if n_tickers <= LOOP_ENGINE_MAX_TICKERS:
+        loop_df, sec, mb = _measure(bf.calc_factors, close, high, low, volume)
+        equiv = _equivalence(loop_df, block_df)
+        record("calc_factors", sec, mb, len(loop_df), equivalence=equiv)
+        if equiv["max_rel_err"] > EQUIV_RTOL or equiv["nan_mismatch"]:
+            logger.warning(f"  [{size}] 엔진 불일치: {equiv}")
+        del loop_df
+
+    ic, sec, mb = _measure(bf.compute_ic, block_df)
+    record("compute_ic", sec, mb, len(block_df))
+
+    _, sec, mb = _measure(bf.compute_vif, block_df, bf.FACTOR_COLS)
+    record("compute_vif", sec, mb, len(block_df))
+
+    beta = cross_section.rolling_beta(close)
+    _, sec, mb = _measure(cross_section.normalize_long, block_df, bf.FACTOR_COLS, beta=beta)
+    record("normalize", sec, mb, len(block_df))
+
+    return records
+
+
+# ─── 3. 저장 / 커밋 간 비교 ──────────────────────────────────
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare_previous(records: list[dict], commit: str) -> None:
+    """같은 (size, stage)의 직전 다른 커밋 결과 대비 속도 비교"""
+    if not BENCH_PATH.exists():
+        return
+    prev: dict[tuple, dict] = {}
+    with open(BENCH_PATH) as f:
+        for line in f:
+            r = json.loads(line)
+            if r["commit"] != commit:
+                prev[(r["size"], r["stage"])] = r   # 파일 순서상 마지막(최신) 유지
+
+    for r in records:
+        p = prev.get((r["size"], r["stage"]))
+        if p is None or p["seconds"] <= 0:
+            continue
+        ratio = r["seconds"] / p["seconds"]
+        msg = (f"  {r['size']:<10} {r['stage']:<13} {p['seconds']:8.3f}s ({p['commit']}) "
+               f"→ {r['seconds']:8.3f}s  x{ratio:.2f}")
+        if ratio > REGRESSION_RATIO:
+            logger.warning(msg + "  ⚠️ 회귀")
+        else:
+            logger.info(msg)
+
+
+def main():
+    profile = os.getenv("BENCH_PROFILE", "quick")
+    if profile not in PROFILES:
+        raise ValueError(f"알 수 없는 BENCH_PROFILE: {profile}")
+    grid   = PROFILES[profile]
+    commit = _git_commit()
+    logger.info(f"팩터 벤치마크 시작: profile={profile}, commit={commit}")
+
+    records: list[dict] = []
+    for n_tickers in grid["tickers"]:
+        for n_years in grid["years"]:
+            records.extend(run_case(n_tickers, n_years))
+
+    run_at = datetime.now().isoformat()
+    for r in records:
+        r.update({"commit": commit, "profile": profile, "run_at": run_at})
+
+    logger.info("이전 커밋 대비:")
+    compare_previous(records, commit)
+
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    with open(BENCH_PATH, "a") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+    print(f"\n{'='*55}")
+    print(f"✅ 팩터 벤치마크 완료 ({profile}, {commit})")
+    print(f"   {len(records)}개 측정 → {BENCH_PATH}")
+    print(f"{'='*55}")
+
+
+if __name__ == "__main__":
+    main()
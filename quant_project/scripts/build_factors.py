@@ -9,8 +9,9 @@ PRD 팩터 그룹:
   target_next   = 익일 수익률  (학습용)
   target_smooth = 5일 이동평균 (EDA 전용 — 학습 절대 금지)
 산출물:
-  data/processed/factors.parquet
+  data/processed/factors.parquet        (선택 팩터 원본 + {factor}_cs 단면 정규화본 + 타겟)
   data/processed/selected_features.json
+  (FACTOR_MEMORY_MB > 0 → ohlcv를 날짜 블록 단위로 읽어 factors_raw.parquet/, factors.parquet/ 파트 디렉터리)
 """
 
 import os, sys, json, logging, warnings
@@ -19,6 +20,7 @@ import pandas as pd
 from scipy import stats
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from services import cross_section, factor_registry
 from services.storage import get_storage
 
 warnings.filterwarnings("ignore")
@@ -29,6 +31,10 @@ IC_MIN   = 0.02   # IC 절댓값 기준 미달 시 제거
 VIF_MAX  = 10.0   # VIF 초과 시 제거
 FEAT_TARGET = (10, 15)   # 최종 선택 범위
 
+# 팩터 정의는 services/factor_registry.py 에 선언 (등록 순서 유지)
+FACTOR_COLS = factor_registry.factor_names()
+TARGET_COLS = factor_registry.target_names()
+
 
 # ─── 1. 데이터 로드 ───────────────────────────────────────────
 
@@ -43,9 +49,8 @@ def load_price_data() -> tuple[pd.DataFrame, ...]:
     low    = ohlcv["Low"]
     volume = ohlcv["Volume"]
 
-    # 결측 30% 이하 종목만 사용
-    valid_mask = close.isna().mean() < 0.3
-    tickers = valid_mask[valid_mask].index.tolist()
+    # 결측 30% 미만 종목만 사용 (라이브 추론도 같은 유니버스 — normalization["universe"])
+    tickers = factor_registry.price_universe(close)
     logger.info(f"유효 종목: {len(tickers)}개")
 
     return (
@@ -64,10 +69,12 @@ def calc_factors(
     high: pd.DataFrame,
     low: pd.DataFrame,
     volume: pd.DataFrame,
+    factors: list[str] | None = None,
 ) -> pd.DataFrame:
-    """종목별로 ta 라이브러리 사용, 결과를 (date × ticker, factor) 형태로 반환"""
-    import ta
+    """종목별로 팩터 레지스트리 엔진 실행, 결과를 (date × ticker, factor) 형태로 반환
 
+    factors: 계산할 팩터 목록 (None이면 등록된 전체 팩터). 의존 중간값만 계산된다.
+    """
     all_records = []
 
     tickers = close.columns.tolist()
@@ -82,11 +89,11 @@ def calc_factors(
         l = low[ticker].reindex(c.index).ffill()
         v = volume[ticker].reindex(c.index).fillna(0)
 
-        if len(c) < 60:
+        if len(c) < factor_registry.UNIVERSE_MIN_ROWS:
             continue
 
         try:
-            rec = _calc_single(ticker, c, h, l, v)
+            rec = _calc_single(ticker, c, h, l, v, factors=factors)
             all_records.append(rec)
         except Exception as e:
             logger.debug(f"  [{ticker}] 팩터 계산 오류: {e}")
@@ -103,75 +110,16 @@ def _calc_single(
     h: pd.Series,
     l: pd.Series,
     v: pd.Series,
+    factors: list[str] | None = None,
 ) -> pd.DataFrame:
-    import ta
-
-    ret = c.pct_change()
-
-    # ── 모멘텀 ──────────────────────────────────────────────
-    ret_1m  = c.pct_change(21)
-    ret_3m  = c.pct_change(63)
-    ma50    = c.rolling(50).mean()
-    ma200   = c.rolling(200).mean()
-    mom_gap = (ma50 - ma200) / ma200          # 50일 MA와 200일 MA 괴리
-
-    # ── 변동성 ──────────────────────────────────────────────
-    vol_20      = ret.rolling(20).std() * np.sqrt(252)
-    down_ret    = ret.clip(upper=0)
-    downside_vol = down_ret.rolling(20).std() * np.sqrt(252)
-    tr          = pd.concat([
-                    h - l,
-                    (h - c.shift()).abs(),
-                    (l - c.shift()).abs()
-                  ], axis=1).max(axis=1)
-    natr        = tr.rolling(14).mean() / c     # Normalized ATR
-    skew        = ret.rolling(60).skew()
-    kurt        = ret.rolling(60).kurt()
-
-    # ── 유동성 ──────────────────────────────────────────────
-    dol_vol     = (c * v).rolling(20).mean()    # 달러 거래량 (20일 평균)
-    vol_mean    = v.rolling(20).mean()
-    vol_std     = v.rolling(20).std()
-    vol_zscore  = (v - vol_mean) / (vol_std + 1e-9)
-
-    # MFI (Money Flow Index) — ta 라이브러리
-    mfi = ta.volume.MFIIndicator(
-        high=h, low=l, close=c, volume=v, window=14, fillna=False
-    ).money_flow_index()
-
-    # ── 추세/반전 ────────────────────────────────────────────
-    rsi = ta.momentum.RSIIndicator(close=c, window=14, fillna=False).rsi()
-    disparity_20 = (c / c.rolling(20).mean() - 1) * 100   # 이격도
-    ma_cross     = (ma50 > ma200).astype(float)            # 골든크로스 1, 데스크로스 0
-
-    # ── 타겟 ─────────────────────────────────────────────────
-    target_next   = ret.shift(-1)                          # 익일 수익률 (학습 타겟)
-    target_smooth = target_next.rolling(5).mean()          # EDA 전용 — 학습 금지
-
-    df = pd.DataFrame({
-        # 모멘텀
-        "ret_1m":       ret_1m,
-        "ret_3m":       ret_3m,
-        "mom_gap":      mom_gap,
-        # 변동성
-        "vol_20":       vol_20,
-        "downside_vol": downside_vol,
-        "natr":         natr,
-        "skew":         skew,
-        "kurt":         kurt,
-        # 유동성
-        "dol_vol":      dol_vol,
-        "vol_zscore":   vol_zscore,
-        "mfi":          mfi,
-        # 추세/반전
-        "rsi":          rsi,
-        "disparity_20": disparity_20,
-        "ma_cross":     ma_cross,
-        # 타겟
-        "target_next":   target_next,
-        "target_smooth": target_smooth,
-    }, index=c.index)
+    factors = factors or FACTOR_COLS
+    # 공유 중간값(ret, ma50, ma200 …)은 DAG 엔진이 한 번만 계산
+    out = factor_registry.compute(
+        {"close": c, "high": h, "low": l, "volume": v},
+        targets=factors + TARGET_COLS,
+    )
 
+    df = pd.DataFrame(out, index=c.index)
     df.index.name = "date"
     df["ticker"] = ticker
     df = df.dropna(subset=["target_next"])
@@ -179,19 +127,166 @@ def _calc_single(
     return df
 
 
-# ─── 3. IC 검증 ───────────────────────────────────────────────
+# ─── 2-B. 아웃오브코어 팩터 계산 (대형 유니버스) ─────────────
+
+OOC_WARMUP_EXTRA = 250    # 최대 lookback 외 추가 워밍업 (RSI EWM 잔차 < 1e-11)
+OOC_MIN_BLOCK    = 21     # 최소 블록 (거래일) — 워밍업 대비 블록이 너무 짧으면 중복 계산만 늘어남
+VIF_SAMPLE       = 10000
+PRICE_FIELDS     = ("Close", "High", "Low", "Volume")
+BETA_COL         = "mkt_beta"   # factors_raw 파트에 함께 저장하는 롤링 베타 (정규화 단계 입력)
+BETA_NODES       = 6            # rolling_beta 중간 wide 프레임 수 (수익률·이동평균·공분산·베타)
+
+
+class PriceBlockReader:
+    """ohlcv를 날짜 구간 단위로 읽어 load_price_data와 같은 (ffill 완료) 필드별 패널을 만든다.
+
+    구간은 앞에서부터 차례로(중첩 허용) 읽는다 — 직전 구간의 ffill 결과에서 구간 바로 앞 행을
+    이월하므로 전체 패널을 한 번에 ffill한 것과 같은 값이 나온다.
+    """
+
+    def __init__(self, storage, table: str = "ohlcv"):
+        self.storage = storage
+        self.table   = table
+        self.raw_dates = self.storage.load_index(table).sort_values()   # 필터용 (저장된 타입 그대로)
+        self.dates     = pd.DatetimeIndex(pd.to_datetime(self.raw_dates))
+        self.tickers: list[str] | None = None
+        self.n_stored = 0                      # 파일에 저장된 종목 수 (블록 읽기 메모리 산정용)
+        self._prev: dict[str, pd.DataFrame] | None = None
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def _load(self, lo: int, hi: int) -> pd.DataFrame:
+        raw = self.storage.load_range(self.table, self.raw_dates[lo], self.raw_dates[hi - 1])
+        raw.index = pd.to_datetime(raw.index)
+        return raw
+
+    def scan_universe(self, bytes_budget: int) -> pd.Series:
+        """전 기간을 예산 안의 행 수씩 읽어 유니버스를 정하고 self.tickers에 고정.
+        유니버스 = price_universe와 같은 결측 비율 기준. Returns: 종목별 첫 종가 이후 행 수"""
+        n = len(self)
+        self.n_stored = self._load(0, 1)["Close"].shape[1]
+        rows = max(1, bytes_budget // (self.n_stored * len(PRICE_FIELDS) * 8 * 2))    # 원본 + 결측 마스크
+        missing, first = 0, np.full(self.n_stored, n)
+        for a in range(0, n, rows):
+            close = self._load(a, min(a + rows, n))["Close"]
+            valid = close.notna().to_numpy()
+            missing = missing + (~valid).sum(axis=0)
+            first   = np.minimum(first, np.where(valid.any(axis=0), a + valid.argmax(axis=0), n))
+        keep = missing / n < factor_registry.UNIVERSE_MAX_MISSING
+        self.tickers = close.columns[keep].tolist()
+        return pd.Series(n - first[keep], index=self.tickers)
+
+    def read(self, lo: int, hi: int) -> dict[str, pd.DataFrame]:
+        """[lo, hi) 행 구간 → {필드: date × ticker} (유니버스 종목, 전체 ffill과 같은 값)"""
+        raw  = self._load(lo, hi)
+        seed = self.dates[lo - 1] if lo > 0 else None
+        if seed is not None and (self._prev is None or seed not in self._prev["Close"].index):
+            raise RuntimeError(f"구간은 앞에서부터 이어서 읽어야 함 (이월할 {seed.date()} 행 없음)")
+        out = {}
+        for field in PRICE_FIELDS:
+            x = raw[field].reindex(columns=self.tickers)
+            if seed is not None:
+                x = pd.concat([self._prev[field].loc[[seed]], x]).ffill().iloc[1:]
+            else:
+                x = x.ffill()
+            out[field] = x.fillna(0) if field == "Volume" else x
+        self._prev = out
+        return out
+
+
+def _calc_block(
+    close: pd.DataFrame,
+    high: pd.DataFrame,
+    low: pd.DataFrame,
+    volume: pd.DataFrame,
+    factors: list[str] | None = None,
+) -> pd.DataFrame:
+    """date × ticker 블록 전체를 종목 축으로 벡터화 계산 → (date, ticker) 롱 포맷"""
+    names = (factors or FACTOR_COLS) + TARGET_COLS
+    # 상장 전 거래량(fillna 0)은 NaN 처리 → 종목별 계산과 동일한 워밍업 구간
+    out = factor_registry.compute(
+        {"close": close, "high": high, "low": low, "volume": volume.where(close.notna())},
+        targets=names,
+    )
+    index = pd.MultiIndex.from_product([close.index, close.columns], names=["date", "ticker"])
+    df = pd.DataFrame({n: out[n].to_numpy().ravel() for n in names}, index=index)
+    return df.dropna(subset=["target_next"])
+
+
+def calc_factors_out_of_core(
+    memory_mb: int,
+    table: str = "factors_raw",
+    factors: list[str] | None = None,
+) -> dict:
+    """날짜 블록(+워밍업 중첩) 단위로 ohlcv를 읽고 팩터를 계산해 파트별로 바로 저장.
+
+    ohlcv 전체 패널을 메모리에 올리지 않는다: 유니버스 판정도 ohlcv를 블록 단위로 훑어서 한다.
+    블록 크기는 memory_mb 상한에서 역산 — 읽은 ohlcv 블록(저장된 전 종목), 계산 노드, 롤링 베타,
+    롱 포맷 출력이 모두 상한에 포함된다. 파트마다 롤링 베타(BETA_COL)를 함께 저장해
+    정규화 단계도 가격 패널 없이 파트 단위로 진행된다.
+    각 파트는 완전한 날짜 단면을 담으므로 IC 등 단면 통계를 파트 단위로 스트리밍 가능.
+    """
+    storage = get_storage()
+    names   = (factors or FACTOR_COLS) + TARGET_COLS
+    reader  = PriceBlockReader(storage)
+
+    # 결측 기준 유니버스 + 상장 후 60일 미만 종목 제외 (calc_factors와 동일 기준)
+    n_since_first = reader.scan_universe(memory_mb * 2**20)
+    tickers     = reader.tickers
+    long_enough = n_since_first.index[n_since_first >= factor_registry.UNIVERSE_MIN_ROWS]
+    logger.info(f"유효 종목: {len(tickers)}개 (계산 대상 {len(long_enough)}개)")
+
+    n_dates, n_tickers = len(reader), len(tickers)
+    beta_window = CS_PARAMS["beta_window"]
+    warmup  = max(factor_registry.max_lookback(names) + OOC_WARMUP_EXTRA, beta_window + 1)
+    n_nodes = len(factor_registry.resolve(names)) + len(factor_registry.BASE_INPUTS)
+    # 블록 1일당: 읽은 ohlcv (저장된 전 종목) + 계산 노드 + 롤링 베타 + 롱 포맷 출력(+베타 열) (float64)
+    # 한 번에 계산하는 행 = 워밍업 + 블록 + 1일(target_next) → 세 부분 모두 상한 안에 들어가야 함
+    bytes_per_date = (reader.n_stored * len(PRICE_FIELDS)
+                      + n_tickers * (n_nodes + BETA_NODES + len(names) + 1)) * 8
+    block = memory_mb * 2**20 // bytes_per_date - warmup - 1
+    if block < OOC_MIN_BLOCK:
+        need_mb = -(-(warmup + OOC_MIN_BLOCK + 1) * bytes_per_date // 2**20)
+        raise ValueError(f"FACTOR_MEMORY_MB={memory_mb}MB로는 워밍업 {warmup}일 + 최소 블록 "
+                         f"{OOC_MIN_BLOCK}일을 담을 수 없음 ({n_tickers}종목 기준 최소 {need_mb}MB)")
+    logger.info(f"아웃오브코어 팩터 계산: {len(long_enough)}종목 × {n_dates}일, "
+                f"블록 {block}일 + 워밍업 {warmup}일 (상한 {memory_mb}MB)")
+
+    n_rows, part = 0, 0
+    for start in range(0, n_dates, block):
+        stop = min(start + block, n_dates)
+        # 앞쪽 워밍업 + 뒤쪽 1일(target_next 계산용) 포함해 계산 후 블록 구간만 저장
+        lo, hi = max(0, start - warmup), min(stop + 1, n_dates)
+        px = reader.read(lo, hi)
+        # 베타는 빌드 유니버스 전체 종가로 계산 (SPY 없으면 유니버스 동일가중 시장) — 인메모리 빌드와 동일
+        beta = cross_section.rolling_beta(px["Close"], beta_window)
+        rec = _calc_block(*(px[f][long_enough] for f in PRICE_FIELDS), factors=factors)
+        keep = reader.dates[start:stop]
+        rec = rec[rec.index.get_level_values("date").isin(keep)]
+        if rec.empty:
+            continue
+        rec[BETA_COL] = beta.to_numpy()[beta.index.get_indexer(rec.index.get_level_values("date")),
+                                        beta.columns.get_indexer(rec.index.get_level_values("ticker"))]
+        storage.save_part(rec.reset_index(), table, part)
+        n_rows += len(rec)
+        part   += 1
+        logger.info(f"  블록 {part}: {keep[0].date()}~{keep[-1].date()} ({len(rec):,}행)")
+
+    logger.info(f"아웃오브코어 팩터 계산 완료: {n_rows:,}행, {part}개 파트")
+    return {"n_rows": n_rows, "n_parts": part, "n_tickers": len(long_enough), "tickers": tickers}
 
-FACTOR_COLS = [
-    "ret_1m", "ret_3m", "mom_gap",
-    "vol_20", "downside_vol", "natr", "skew", "kurt",
-    "dol_vol", "vol_zscore", "mfi",
-    "rsi", "disparity_20", "ma_cross",
-]
 
+# ─── 3. IC 검증 ───────────────────────────────────────────────
 
 def compute_ic(df: pd.DataFrame) -> pd.DataFrame:
     """날짜별 Rank IC (Spearman) 계산 후 평균/t-stat 반환"""
     logger.info("IC 계산 중...")
+    return summarize_ic(_ic_records(df))
+
+
+def _ic_records(df: pd.DataFrame) -> list[dict]:
+    """날짜별 × 팩터별 Rank IC 레코드 (완전한 단면이 들어있는 블록 단위로 호출 가능)"""
     records = []
 
     for date, group in df.groupby(level="date"):
@@ -205,7 +300,10 @@ def compute_ic(df: pd.DataFrame) -> pd.DataFrame:
                 continue
             corr, _ = stats.spearmanr(vals[mask], target[mask])
             records.append({"date": date, "factor": col, "ic": corr})
+    return records
+
 
+def summarize_ic(records: list[dict]) -> pd.DataFrame:
     ic_df = pd.DataFrame(records)
     summary = (
         ic_df.groupby("factor")["ic"]
@@ -277,44 +375,40 @@ def select_features(ic_summary: pd.DataFrame, vif_data: pd.DataFrame) -> list[st
     return vif_pass
 
 
-# ─── 6. 메인 ─────────────────────────────────────────────────
+# ─── 5-B. 단면 정규화/중립화 ──────────────────────────────────
 
-def main():
-    storage = get_storage()
+CS_PARAMS = cross_section.DEFAULT_PARAMS
 
-    # 데이터 로드
-    close, high, low, volume, tickers = load_price_data()
 
-    # 팩터 계산
-    factors_df = calc_factors(close, high, low, volume)
+def _with_normalized(df: pd.DataFrame, selected: list[str], beta: pd.DataFrame) -> pd.DataFrame:
+    """선택 팩터의 날짜별 단면 정규화 결과를 {factor}_cs 컬럼으로 추가"""
+    norm = cross_section.normalize_long(
+        df, selected, CS_PARAMS, sectors=cross_section.load_sectors(), beta=beta,
+    )
+    return pd.concat([df, norm], axis=1)
 
-    # IC 검증
-    ic_summary = compute_ic(factors_df)
 
-    # VIF 검증 (IC 통과 후보만)
+# ─── 6. 메인 ─────────────────────────────────────────────────
+
+def _ic_candidates(ic_summary: pd.DataFrame) -> list[str]:
+    """VIF 검증 후보 (IC 통과 후보만)"""
     ic_candidates = ic_summary[ic_summary["ic_abs"] >= IC_MIN / 2].index.tolist()
     if len(ic_candidates) < 3:
         ic_candidates = FACTOR_COLS  # 후보 부족시 전체 사용
+    return ic_candidates
 
-    vif_data = compute_vif(factors_df, ic_candidates)
-
-    # 팩터 선택
-    selected = select_features(ic_summary, vif_data)
-
-    # 저장
-    # factors.parquet: 선택 팩터 + 타겟만 저장
-    save_cols = selected + ["target_next", "target_smooth"]
-    factors_save = factors_df[save_cols].reset_index()
-    storage.save(factors_save, "factors")
-    logger.info(f"factors.parquet 저장: {factors_save.shape}")
 
+def _save_selection(selected, ic_summary, vif_data, tickers, date_range, n_rows):
     # selected_features.json
+    # 정규화 스펙에 빌드 유니버스(결측 기준 통과 종목) 포함 → 라이브 단면 통계도 같은 유니버스로 계산
     result = {
         "selected_features": selected,
+        "normalization":     {**CS_PARAMS, "universe": list(tickers)},
+        "universe":          list(tickers),     # 정규화 여부와 무관하게 라이브 팩터 계산도 같은 유니버스
         "ic_summary": ic_summary[["ic_mean", "ic_std", "ic_ir"]].to_dict(),
         "vif_summary": vif_data.set_index("feature")["VIF"].to_dict(),
         "n_tickers": len(tickers),
-        "date_range": [str(factors_save["date"].min()), str(factors_save["date"].max())],
+        "date_range": date_range,
     }
     out_path = os.path.join(
         os.path.dirname(__file__), "..", "data", "processed", "selected_features.json"
@@ -326,9 +420,82 @@ def main():
     print(f"\n{'='*50}")
     print(f"✅ P2 팩터 계산 완료")
     print(f"   선택 팩터 {len(selected)}개: {selected}")
-    print(f"   전체 데이터: {factors_save.shape[0]:,}행")
+    print(f"   전체 데이터: {n_rows:,}행")
     print(f"{'='*50}")
 
+
+def main():
+    from config import FACTOR_MEMORY_MB
+    if FACTOR_MEMORY_MB > 0:
+        return main_out_of_core(FACTOR_MEMORY_MB)
+
+    storage = get_storage()
+
+    # 데이터 로드
+    close, high, low, volume, tickers = load_price_data()
+
+    # 팩터 계산
+    factors_df = calc_factors(close, high, low, volume)
+
+    # IC 검증
+    ic_summary = compute_ic(factors_df)
+
+    # VIF 검증 (IC 통과 후보만)
+    vif_data = compute_vif(factors_df, _ic_candidates(ic_summary))
+
+    # 팩터 선택
+    selected = select_features(ic_summary, vif_data)
+
+    # 단면 정규화/중립화 → 선택 팩터 원본 + {factor}_cs + 타겟 저장
+    save_cols = selected + TARGET_COLS
+    beta = cross_section.rolling_beta(close, CS_PARAMS["beta_window"])
+    factors_save = _with_normalized(factors_df[save_cols], selected, beta).reset_index()
+    storage.save(factors_save, "factors")
+    logger.info(f"factors.parquet 저장: {factors_save.shape}")
+
+    date_range = [str(factors_save["date"].min()), str(factors_save["date"].max())]
+    _save_selection(selected, ic_summary, vif_data, tickers, date_range, factors_save.shape[0])
+    return selected
+
+
+def main_out_of_core(memory_mb: int):
+    """대형 유니버스용: 블록 단위 읽기·계산·저장 → 파트 스트리밍으로 IC/VIF/선택 팩터 저장.
+    factors_raw.parquet/ (전체 팩터 + 베타) 와 factors.parquet/ (선택 팩터) 모두 파트 디렉터리.
+    부분 읽기를 지원하지 않는 저장소(CHUNKED_READS=False)에서는 상한을 지킬 수 없으므로 거부한다."""
+    storage = get_storage()
+    if not storage.CHUNKED_READS:
+        raise ValueError(f"FACTOR_MEMORY_MB > 0 (아웃오브코어 빌드)은 부분 읽기를 지원하는 저장소에서만 가능 "
+                         f"({type(storage).__name__}) — STORAGE_BACKEND=parquet 사용 또는 FACTOR_MEMORY_MB=0")
+
+    info = calc_factors_out_of_core(memory_mb)
+
+    # IC: 파트별 완전 단면 → 레코드 누적 / VIF: 파트별 비례 샘플
+    frac = min(1.0, 2 * VIF_SAMPLE / max(info["n_rows"], 1))
+    records, samples = [], []
+    for part in storage.iter_parts("factors_raw", columns=["date", "ticker"] + FACTOR_COLS + ["target_next"]):
+        part = part.set_index(["date", "ticker"])
+        records.extend(_ic_records(part))
+        samples.append(part[FACTOR_COLS].sample(frac=frac, random_state=42))
+
+    ic_summary = summarize_ic(records)
+    vif_data   = compute_vif(pd.concat(samples), _ic_candidates(ic_summary))
+    selected   = select_features(ic_summary, vif_data)
+
+    # factors.parquet/: 선택 팩터 + {factor}_cs + 타겟만 파트 단위로 재기록
+    # (각 파트가 완전한 날짜 단면이므로 파트별 정규화 = 전체 정규화, 베타는 파트에 저장된 값)
+    save_cols = ["date", "ticker"] + selected + TARGET_COLS
+    dates_min, dates_max, n_rows = None, None, 0
+    for i, part in enumerate(storage.iter_parts("factors_raw", columns=save_cols + [BETA_COL])):
+        part = part.set_index(["date", "ticker"])
+        beta = part.pop(BETA_COL).unstack("ticker")
+        part = _with_normalized(part, selected, beta).reset_index()
+        storage.save_part(part, "factors", i)
+        dates_min = part["date"].min() if dates_min is None else min(dates_min, part["date"].min())
+        dates_max = part["date"].max() if dates_max is None else max(dates_max, part["date"].max())
+        n_rows   += len(part)
+
+    _save_selection(selected, ic_summary, vif_data, info["tickers"],
+                    [str(dates_min), str(dates_max)], n_rows)
     return selected
 
 
@@ -14,13 +14,14 @@ import pandas as pd
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from config import DATA_CONSTITUENTS, DATA_CHECKPOINTS, TRAIN_START, TRAIN_END
-from services.storage import get_storage
+from services.storage import get_storage, ParquetStorage
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
 CHECKPOINT_PATH = os.path.join(DATA_CHECKPOINTS, "ohlcv_progress.json")
 BATCH_SIZE = 50
+OHLCV_ROW_GROUP = 63   # parquet 행 그룹 (약 1분기) — 최신 구간 조회(load_tail)가 이전 그룹을 건너뜀
 os.makedirs(DATA_CHECKPOINTS, exist_ok=True)
 
 
@@ -111,7 +112,8 @@ def main():
     combined = combined.loc[:, ~combined.columns.duplicated()]
     combined.sort_index(inplace=True)
 
-    storage.save(combined, "ohlcv")
+    save_kwargs = {"row_group_size": OHLCV_ROW_GROUP} if isinstance(storage, ParquetStorage) else {}
+    storage.save(combined, "ohlcv", **save_kwargs)
     logger.info(f"ohlcv.parquet 저장 완료: {combined.shape}")
 
     if state["failed_tickers"]:
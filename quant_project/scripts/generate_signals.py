@@ -2,8 +2,11 @@
 generate_signals.py — ML 신호 사전 캐싱 스크립트
 
 build_factors.py 실행 후 호출됨 (APScheduler 18:10).
-factors.parquet 최신 날 데이터에 학습된 모델을 적용해 신호를 계산하고
+모델이 학습한 팩터(번들 features)의 최대 lookback 만큼의 후행 OHLCV 윈도우로 최신 단면만 계산해
+(factor_registry.load_latest_factors, 단면 정규화 모델이면 cross_section.load_latest_normalized)
+학습된 모델을 적용하고
 data/processed/latest_signals.json 으로 저장한다.
+factors.parquet 전체 빌드에 의존하지 않으므로 새 봉 도착 즉시 재실행 가능.
 
 portfolio.py _load_signals()는 이미 실시간 계산을 지원하므로
 이 스크립트가 없어도 API는 정상 동작하지만, 캐시가 있으면 응답 속도를 높인다.
@@ -14,9 +17,6 @@ import logging
 import os
 import sys
 
-import numpy as np
-import pandas as pd
-
 # quant_project 루트를 sys.path에 추가
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, ROOT)
@@ -27,56 +27,49 @@ logger = logging.getLogger(__name__)
 
 def main():
     from config import BASE_DIR, DATA_PROCESSED
-    import joblib
 
-    factors_path = os.path.join(DATA_PROCESSED, "factors.parquet")
+    ohlcv_path   = os.path.join(DATA_PROCESSED, "ohlcv.parquet")
     model_dir    = os.path.join(BASE_DIR, "models", "trained", "latest")
     output_path  = os.path.join(DATA_PROCESSED, "latest_signals.json")
-    sel_path     = os.path.join(DATA_PROCESSED, "selected_features.json")
 
-    if not os.path.exists(factors_path):
-        logger.warning("factors.parquet 없음 — generate_signals 스킵")
+    if not os.path.exists(ohlcv_path):
+        logger.warning("ohlcv.parquet 없음 — generate_signals 스킵")
         return
     if not os.path.exists(model_dir):
         logger.warning("models/trained/latest 없음 — generate_signals 스킵")
         return
 
-    df = pd.read_parquet(factors_path)
+    from services.cross_section import CS_SUFFIX, load_latest_normalized
+    from services.factor_registry import load_latest_factors
+    from services.model_bundle import load_predictor
+
+    # 네이티브 번들 → 앙상블 전체(스케일러 포함)를 한 번에 예측
+    try:
+        predictor = load_predictor(model_dir)
+    except FileNotFoundError as e:
+        logger.warning(f"모델 파일 없음 — generate_signals 스킵 ({e})")
+        return
 
-    with open(sel_path) as f:
-        raw = json.load(f)
-    features = raw.get("selected_features", list(raw.keys())) if isinstance(raw, dict) else raw
+    meta = {}
+    meta_path = os.path.join(model_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    normalization = meta.get("normalization")
 
-    # 마지막 날 데이터 추출
-    if "date" in df.columns:
-        last_date = pd.to_datetime(df["date"]).max()
-        last_df   = df[pd.to_datetime(df["date"]) == last_date].copy()
-        last_df   = last_df.set_index("ticker")
+    # 피처는 모델이 학습한 목록 기준 (selected_features.json은 매일 갱신되어 월간 모델과 어긋날 수 있음)
+    features = [f[: -len(CS_SUFFIX)] if normalization and f.endswith(CS_SUFFIX) else f
+                for f in predictor.features]
+
+    # 최신 단면만 최소 윈도우로 계산 (모델이 단면 정규화 피처로 학습됐으면 동일 정규화 적용)
+    if normalization:
+        last_date, last_df = load_latest_normalized(features, normalization)
     else:
-        last_date = df.index.get_level_values("date").max()
-        last_df   = df.xs(last_date, level="date")
-
-    X = last_df[features].fillna(0)
-
-    scaler = None
-    scaler_path = os.path.join(model_dir, "scaler.pkl")
-    if os.path.exists(scaler_path):
-        scaler = joblib.load(scaler_path)
-
-    preds = []
-    for model_file in ["lgbm.pkl", "lightgbm.pkl", "ridge.pkl"]:
-        mpath = os.path.join(model_dir, model_file)
-        if os.path.exists(mpath):
-            model = joblib.load(mpath)
-            X_arr   = scaler.transform(X.values) if scaler else X.values
-            X_input = pd.DataFrame(X_arr, index=X.index, columns=X.columns)
-            preds.append(model.predict(X_input))
-
-    if not preds:
-        logger.warning("모델 파일 없음 — generate_signals 스킵")
-        return
+        # 빌드 유니버스로 제한 (예전 모델은 meta에 없음 → ohlcv 전 종목)
+        last_date, last_df = load_latest_factors(features, universe=meta.get("universe"))
 
-    signal = np.mean(preds, axis=0)
+    # DataFrame 그대로 전달 → 예측기가 학습 피처 이름·순서로 열 선택
+    signal = predictor.predict(last_df.reindex(columns=predictor.features).fillna(0))
     result = {
         "as_of": str(last_date.date()) if hasattr(last_date, "date") else str(last_date),
         "signals": {ticker: float(sig) for ticker, sig in zip(last_df.index, signal)},
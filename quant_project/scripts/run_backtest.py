@@ -7,14 +7,22 @@ PRD 설정:
   포지션 크기: 변동성 역가중 (vol_20 역수 → 정규화)
   레짐 조정  : VIX > 25 → 포지션 50% 축소 / T10Y2Y < 0 → 25% 추가 축소
   파라미터 스윕: ml_weight(0.3~0.7) × top_n(5~20) → Sharpe Contour
+  ML 신호    : BACKTEST_SIGNALS="oos" → train_model이 저장한 Walk-Forward OOS 예측을 이어 붙여 사용
+               (최종 모델 재추론 없음, 학습 구간 예측 미포함) / "model" → 최종 모델로 전 기간 추론
+  엔진       : services.backtest_engine 행렬 커널 (파라미터 무관 입력 1회 계산 + 배열 연산 시뮬레이션)
+  결과 캐시  : services.backtest_store — (모델 버전, 데이터 버전, 파라미터, 비용 모델) 키로 지표·곡선 누적 저장,
+               이미 평가한 조합은 재계산 없이 반환 (BACKTEST_CACHE=0이면 비활성)
+  성과 지표  : services.metrics 벡터화 지표 (Sortino·Calmar·낙폭 기간·회전율·Sharpe bootstrap 신뢰구간)
+               — 기본 백테스트와 스윕 전략군 전체가 같은 함수 1회 호출
 
 산출물:
   data/processed/backtest_summary.json
   data/processed/sharpe_contour.json
-  data/processed/equity_curve.parquet
+  data/processed/equity_curve.parquet   (day int64 + equity/spy float32 열 — services.equity_curve)
+  data/processed/backtest_results.parquet, backtest_curves_{데이터 버전}.parquet
 """
 
-import os, sys, json, logging, warnings, pickle
+import os, sys, json, logging, warnings
 from pathlib import Path
 
 import numpy as np
@@ -22,6 +30,8 @@ import pandas as pd
 
 warnings.filterwarnings("ignore")
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from services.backtest_engine import prepare_inputs, simulate
+from services.equity_curve import EquityCurves
 from services.storage import get_storage
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -31,33 +41,26 @@ BASE_DIR    = Path(__file__).parent.parent
 MODELS_DIR  = BASE_DIR / "models" / "trained" / "latest"
 OUT_DIR     = BASE_DIR / "data" / "processed"
 
-# ─── 거래비용 설정 (PRD) ────────────────────────────────────
-SLIPPAGE    = 0.001   # 슬리피지 0.1%
-COMMISSION  = 0.0005  # 수수료 0.05%
 
-# ─── 레짐 필터 임계값 (mdd-improvement v2 — 균형 조정) ──────────
-# VIX > 20이 28% 빈도 → 과포지션 축소 문제 → VIX 기준 25 복원
-# SPY 200MA는 추가 조건으로 온건하게 적용 (×0.80)
-VIX_BEAR_THRESHOLD    = 25.0   # VIX > 25: bear 공포 구간 (기존 유지)
-VIX_EXTREME_THRESHOLD = 32.0   # VIX > 32: 극단적 공포 (추가 축소)
-T10Y2Y_THRESHOLD      = 0.0    # 장단기금리차 < 0: 추가 축소
-STOP_LOSS_1M          = -0.10  # 개별 손절: 1개월 수익률 < -10%
-SPY_MA_WINDOW         = 200    # SPY 200일 이평 윈도우
+# ─── 1. 모델·데이터 로드 ─────────────────────────────────────
 
+def model_version(source: str) -> str:
+    """결과 캐시 키용 모델 버전: "{신호 출처}:{최신 학습 버전}" (OOS도 같은 학습 실행에서 저장됨)"""
+    meta_path = MODELS_DIR / "meta.json"
+    version = "unknown"
+    if meta_path.exists():
+        with open(meta_path) as f:
+            version = json.load(f).get("version", version)
+    return f"{source}:{version}"
 
-# ─── 1. 모델·데이터 로드 ─────────────────────────────────────
 
 def load_model():
+    from services.model_bundle import load_predictor
     with open(MODELS_DIR / "meta.json") as f:
         meta = json.load(f)
-    models = {}
-    for name in meta["ensemble"]:
-        with open(MODELS_DIR / f"{name}.pkl", "rb") as f:
-            models[name] = pickle.load(f)
-    with open(MODELS_DIR / "scaler.pkl", "rb") as f:
-        scaler = pickle.load(f)
-    logger.info(f"모델 로드: {meta['ensemble']}, 피처 {len(meta['features'])}개")
-    return models, scaler, meta
+    predictor = load_predictor(str(MODELS_DIR))
+    logger.info(f"모델 로드: {predictor.names}, 피처 {len(predictor.features)}개")
+    return predictor, meta
 
 
 def load_data():
@@ -85,18 +88,31 @@ def load_data():
 
 def generate_signals(
     factors: pd.DataFrame,
-    models: dict,
-    scaler,
+    predictor,
     features: list[str],
+    normalization: dict | None = None,
+    close: pd.DataFrame | None = None,
 ) -> pd.DataFrame:
-    """날짜별 종목 ML 점수 예측 → (date × ticker) 피벗 테이블"""
+    """날짜별 종목 ML 점수 예측 → (date × ticker) 피벗 테이블
+
+    모델이 단면 정규화 피처({factor}_cs)로 학습됐는데 factors에 해당 컬럼이 없으면
+    build_factors와 동일한 cross_section.normalize_long으로 즉석 계산.
+    """
     logger.info("ML 신호 생성 중...")
 
+    missing = [f for f in features if f not in factors.columns]
+    if normalization and missing:
+        from services import cross_section
+        raw  = [f[: -len(cross_section.CS_SUFFIX)] for f in missing]
+        beta = cross_section.rolling_beta(close, normalization["beta_window"]) if close is not None else None
+        norm = cross_section.normalize_long(
+            factors, raw, normalization, sectors=cross_section.load_sectors(), beta=beta,
+        )
+        factors = pd.concat([factors, norm], axis=1)
+
+    # 스케일링 + 앙상블 평균 (EnsemblePredictor 1회 호출)
     X = factors[features].fillna(0).values
-    X_sc = scaler.transform(X)
-
-    # 앙상블 평균
-    preds = np.mean([m.predict(X_sc) for m in models.values()], axis=0)
+    preds = predictor.predict(X)
     factors = factors.copy()
     factors["ml_score"] = preds
 
@@ -106,6 +122,25 @@ def generate_signals(
     return scores
 
 
+def load_oos_scores(model: str = "ensemble") -> pd.DataFrame | None:
+    """Walk-Forward OOS 예측 (storage "oos_predictions") → (date × ticker) 피벗.
+    검증 구간이 겹치면 가장 늦은 윈도우(최신 학습 데이터)의 예측을 사용. 테이블 없으면 None."""
+    storage = get_storage()
+    if not storage.exists("oos_predictions"):
+        return None
+    oos = storage.load("oos_predictions", model=model)
+    if oos.empty:
+        return None
+    oos["date"] = pd.to_datetime(oos["date"])
+
+    latest = (oos.sort_values("window")
+                 .drop_duplicates(["date", "ticker"], keep="last"))
+    scores = latest.pivot(index="date", columns="ticker", values="score").astype(np.float64)
+    logger.info(f"OOS 신호 ({model}): {scores.shape}, 윈도우 {oos['window'].nunique()}개, "
+                f"{scores.index[0].date()}~{scores.index[-1].date()}")
+    return scores
+
+
 def generate_rule_scores(factors: pd.DataFrame) -> pd.DataFrame:
     """룰베이스 신호 생성 — 모멘텀 + 저변동성 혼합 팩터
     rule_score = 0.5×ret_3m + 0.3×ret_1m + 0.2×(1/vol_20) (정규화)
@@ -127,65 +162,7 @@ def generate_rule_scores(factors: pd.DataFrame) -> pd.DataFrame:
     return rule_scores
 
 
-# ─── 3. 레짐 필터 ────────────────────────────────────────────
-
-def get_regime_multiplier(
-    macro: pd.DataFrame,
-    dates: pd.DatetimeIndex,
-    close: pd.DataFrame | None = None,
-) -> pd.Series:
-    """날짜별 포지션 크기 배수 (3단계 레짐 — mdd-improvement)
-
-    1단계: VIX > 20 or SPY < 200MA → 1/3 축소 (0.333)
-    2단계: T10Y2Y < 0               → 추가 25% 축소 (*0.75)
-    3단계: VIX > 25                 → 현금 30% 확보 (*0.70)
-    """
-    macro_aligned = macro.reindex(dates, method="ffill")
-    mult = pd.Series(1.0, index=dates)
-
-    vix    = macro_aligned["VIXCLS"]    if "VIXCLS" in macro_aligned.columns else None
-    t10y2y = macro_aligned["T10Y2Y"]   if "T10Y2Y" in macro_aligned.columns else None
-
-    # SPY 200일 이평 조건
-    spy_below_ma200 = pd.Series(False, index=dates)
-    if close is not None and "SPY" in close.columns:
-        spy = close["SPY"].reindex(dates, method="ffill")
-        ma200 = spy.rolling(SPY_MA_WINDOW, min_periods=100).mean()
-        spy_below_ma200 = spy < ma200
-
-    # 1단계: SPY < 200MA → 20% 축소 (온건한 추가 방어)
-    mult[spy_below_ma200] *= 0.80
-
-    # 2단계: VIX > 25 → 50% 축소 (공포 구간 기존 수준 유지)
-    if vix is not None:
-        mult[vix > VIX_BEAR_THRESHOLD] *= 0.50
-
-    # 3단계: T10Y2Y < 0 → 추가 15% 축소 (완화: 기존 25% → 15%)
-    if t10y2y is not None:
-        mult[t10y2y < T10Y2Y_THRESHOLD] *= 0.85
-
-    # 4단계: VIX > 32 → 극단적 공포, 추가 30% 축소 (코로나 같은 구간)
-    if vix is not None:
-        mult[vix > VIX_EXTREME_THRESHOLD] *= 0.70
-
-    return mult.clip(upper=1.0)
-
-
-# ─── 4. 포지션 크기: 변동성 역가중 ───────────────────────────
-
-def vol_inv_weights(factors: pd.DataFrame, top_tickers: list[str], date) -> pd.Series:
-    """선택된 종목의 변동성 역수로 가중치 계산"""
-    try:
-        vols = factors.loc[date, "vol_20"].reindex(top_tickers).fillna(0.2)
-        vols = vols.clip(lower=1e-4)
-        inv_vol = 1.0 / vols
-        return inv_vol / inv_vol.sum()
-    except Exception:
-        n = len(top_tickers)
-        return pd.Series(1.0 / n, index=top_tickers)
-
-
-# ─── 5. 핵심 백테스트 로직 ───────────────────────────────────
+# ─── 3. 핵심 백테스트 로직 ───────────────────────────────────
 
 def run_single_backtest(
     scores: pd.DataFrame,
@@ -203,109 +180,56 @@ def run_single_backtest(
     단일 파라미터 조합 백테스트 (mdd-improvement).
     월별 리밸런싱 → 변동성 역가중 → 레짐 조정 → 손절 필터.
     rule_scores / rule_weight 추가: ML + 룰베이스 혼합 점수 지원.
+    계산은 services.backtest_engine 행렬 커널 (일별 루프 없음).
     """
-    dates = scores.index[scores.index >= start]
-    months = pd.PeriodIndex(dates, freq="M")
-    rebal_mask  = np.concatenate([[True], months[1:] != months[:-1]])
-    rebal_dates = set(dates[rebal_mask])
-
-    tickers_all  = scores.columns.tolist()
-    close_common = close.reindex(columns=tickers_all).reindex(dates).ffill()
-    # SPY 포함 close 전달 (200MA 계산)
-    regime_mult  = get_regime_multiplier(macro, dates, close=close)
-
-    # ── 혼합 점수 계산 (퍼센타일 랭킹 후 가중합) ──────────────────
-    total_w = ml_weight + (rule_weight if rule_scores is not None else 0.0)
-    if rule_scores is not None and rule_weight > 0.0 and total_w > 0:
-        ml_ranks   = scores.rank(axis=1, pct=True)
-        rule_ranks = rule_scores.reindex(index=scores.index, columns=scores.columns).rank(axis=1, pct=True)
-        combined   = (ml_weight * ml_ranks + rule_weight * rule_ranks) / total_w
-    else:
-        combined = scores  # 순수 ML 모드
-
-    prev_weights  = pd.Series(0.0, index=tickers_all)
-    daily_returns = []
-
-    for i, date in enumerate(dates):
-        if date in rebal_dates:
-            day_scores = combined.loc[date].dropna() if date in combined.index else scores.loc[date].dropna()
-            if len(day_scores) < top_n:
-                weights = prev_weights
-            else:
-                # 손절 필터: 1개월 수익률 < -10% 종목 후보에서 제외
-                if i >= 22:
-                    prev22_date = dates[max(i - 22, 0)]
-                    ret_1m = (close_common.loc[date] / close_common.loc[prev22_date] - 1).fillna(0)
-                    valid_scores = day_scores[
-                        day_scores.index.map(lambda t: ret_1m.get(t, 0) >= STOP_LOSS_1M)
-                    ]
-                    if len(valid_scores) < 3:
-                        valid_scores = day_scores  # 손절 후 종목 너무 적으면 무시
-                else:
-                    valid_scores = day_scores
-
-                # 상위 top_n 선택
-                ranked = valid_scores.nlargest(top_n).index.tolist()
-
-                # 변동성 역가중
-                try:
-                    w = vol_inv_weights(factors.loc[date], ranked, date)
-                except Exception:
-                    w = pd.Series(1.0 / top_n, index=ranked)
-
-                weights = pd.Series(0.0, index=tickers_all)
-                weights[ranked] = w.values
-                weights *= regime_mult.loc[date]  # 레짐 조정
-
-            # 거래비용: 비중 변화량 × (slippage + commission)
-            turnover = (weights - prev_weights).abs().sum()
-            cost     = turnover * (SLIPPAGE + COMMISSION)
-            prev_weights = weights
-        else:
-            cost = 0.0
-
-        # 일별 포트폴리오 수익률
-        if i > 0:
-            prev_date = dates[i - 1]
-            ret = (close_common.loc[date] / close_common.loc[prev_date] - 1).fillna(0)
-            port_ret = (prev_weights * ret).sum() - cost
-        else:
-            port_ret = 0.0
-
-        daily_returns.append({"date": date, "return": port_ret})
-
-    ret_series = pd.DataFrame(daily_returns).set_index("date")["return"]
+    inp = prepare_inputs(scores, close, factors, macro, rule_scores=rule_scores, start=start)
+    ret_series = simulate(inp, ml_weight, top_n, rule_weight)
     return _calc_metrics(ret_series, spy_ret=spy_ret)
 
 
-def _calc_metrics(ret: pd.Series, spy_ret: pd.Series | None = None) -> dict:
-    """수익률 시계열 → 성과 지표 계산. spy_ret 제공 시 벤치마크 곡선 포함."""
-    cum   = (1 + ret).cumprod()
-    total = float(cum.iloc[-1] - 1)
-    n_years = len(ret) / 252
-    cagr  = float((cum.iloc[-1]) ** (1 / max(n_years, 0.1)) - 1)
-    sharpe = float(ret.mean() / (ret.std() + 1e-9) * np.sqrt(252))
-    roll_max = cum.cummax()
-    mdd   = float(((cum - roll_max) / roll_max).min())
-    win   = float((ret > 0).mean())
+def base_backtest(
+    inp,
+    ml_weight: float = 0.5,
+    top_n: int = 10,
+    rule_weight: float = 0.3,
+    store=None,
+    version: str = "",
+) -> tuple[dict, "EquityCurves"]:
+    """기본 파라미터 백테스트 → (요약 지표, 누적 수익 곡선 "equity"). store가 있으면 캐시 경유."""
+    if store is not None:
+        from services.backtest_engine import DEFAULT_COST
+        from services.backtest_store import METRIC_KEYS, cached_sweep
+        grid = [{"ml_weight": ml_weight, "rule_weight": rule_weight, "top_n": top_n, "cost": DEFAULT_COST}]
+        row  = cached_sweep(inp, grid, version, store, n_workers=1)[0]
+        curves = store.curves([row["key"]])
+        if curves is not None:
+            metrics = {k: row[k] for k in (*METRIC_KEYS, "start_date", "end_date")}
+            return metrics, EquityCurves(curves.days, {"equity": curves.values[row["key"]]})
+        # 곡선 테이블 없음 (다른 프로세스가 이전 데이터 버전으로 정리 등) → 직접 계산
+        logger.warning("저장된 곡선 없음 — 기본 백테스트 직접 계산")
+
+    metrics = _calc_metrics(simulate(inp, ml_weight, top_n, rule_weight))
+    return metrics, metrics.pop("curves")
 
+
+def _calc_metrics(ret: pd.Series, spy_ret: pd.Series | None = None) -> dict:
+    """수익률 시계열 → 성과 지표 계산 (services.metrics.compute_metrics — 스윕과 같은 정의).
+    곡선은 "curves" (EquityCurves: int64 일수 + float32 배열) — spy_ret 제공 시 "spy" 열 포함."""
+    from services.metrics import compute_metrics, records
+    r = ret.to_numpy(dtype=np.float64)
     result = {
-        "total_return": round(total, 4),
-        "cagr":         round(cagr, 4),
-        "sharpe":       round(sharpe, 4),
-        "max_drawdown": round(mdd, 4),
-        "win_rate":     round(win, 4),
+        **records(compute_metrics(r, dates=ret.index))[0],
         "start_date":   str(ret.index[0].date()),
         "end_date":     str(ret.index[-1].date()),
-        "equity_curve": (1 + ret).cumprod().round(6).to_dict(),
+        "curves":       EquityCurves.from_returns(ret.index, {"equity": r}),
     }
     if spy_ret is not None:
-        spy_aligned = spy_ret.reindex(ret.index).fillna(0)
-        result["spy_curve"] = (1 + spy_aligned).cumprod().round(6).to_dict()
+        spy_aligned = spy_ret.reindex(ret.index).fillna(0).to_numpy()
+        result["curves"] = result["curves"].with_returns("spy", spy_aligned)
     return result
 
 
-# ─── 6. 파라미터 스윕 ────────────────────────────────────────
+# ─── 4. 파라미터 스윕 ────────────────────────────────────────
 
 def param_sweep(
     scores, close, factors, macro,
@@ -313,68 +237,97 @@ def param_sweep(
     ml_weights=None,
     rule_weights=None,
     top_n: int = 10,
+    top_ns=None,
+    costs=None,
+    n_workers: int | None = None,
+    inp=None,
+    store=None,
+    version: str = "",
 ) -> list[dict]:
     """ml_weight × rule_weight 2D 그리드 탐색 → 3D Sharpe Surface 데이터
     rule_scores 없으면 기존 ml_weight × top_n 1D 스윕으로 폴백.
+    top_ns / costs를 주면 해당 축도 함께 탐색 (임의 그리드, services.backtest_sweep 병렬 실행).
+    inp: 미리 만든 BacktestInputs 재사용 (주면 scores/rule_scores 무시) / store: BacktestStore 주면 평가된 조합은 캐시에서 반환.
+    각 점: Sharpe + 95% bootstrap 신뢰구간(sharpe_lo/hi, BACKTEST_BOOTSTRAP=0이면 None) + Sortino/Calmar/CAGR/MDD.
     """
-    if rule_scores is not None:
+    from services.backtest_engine import DEFAULT_COST
+    from services.backtest_sweep import param_grid, run_sweep
+
+    if inp is None:
+        inp = prepare_inputs(scores, close, factors, macro, rule_scores=rule_scores)
+    if inp.rule_rank is not None:
         # 신규: 2D 스윕 (ml_weight × rule_weight), top_n 고정
-        ml_weights   = ml_weights   or [0.1, 0.3, 0.5, 0.7, 0.9]
-        rule_weights = rule_weights or [0.1, 0.3, 0.5, 0.7, 0.9]
-        total = len(ml_weights) * len(rule_weights)
-        logger.info(f"2D 파라미터 스윕: {total}개 조합 (ml_weight × rule_weight, top_n={top_n})")
-
-        results = []
-        for ml_w in ml_weights:
-            for rb_w in rule_weights:
-                logger.info(f"  [{len(results)+1}/{total}] ml_w={ml_w}, rb_w={rb_w}")
-                metrics = run_single_backtest(
-                    scores, close, factors, macro,
-                    ml_weight=ml_w, top_n=top_n,
-                    rule_scores=rule_scores, rule_weight=rb_w,
-                )
-                results.append({
-                    "ml_weight":   ml_w,
-                    "rule_weight": rb_w,
-                    "top_n":       top_n,
-                    "sharpe":      metrics["sharpe"],
-                    "cagr":        metrics["cagr"],
-                    "mdd":         metrics["max_drawdown"],
-                })
+        grid = param_grid(
+            ml_weights   = ml_weights   or [0.1, 0.3, 0.5, 0.7, 0.9],
+            rule_weights = rule_weights or [0.1, 0.3, 0.5, 0.7, 0.9],
+            top_ns       = top_ns or [top_n],
+            costs        = costs or [DEFAULT_COST],
+        )
+        logger.info(f"2D 파라미터 스윕: {len(grid)}개 조합 (ml_weight × rule_weight, top_n={top_ns or top_n})")
     else:
         # 레거시 폴백: ml_weight × top_n 스윕
-        ml_weights = ml_weights or [0.3, 0.4, 0.5, 0.6, 0.7]
-        top_ns     = [5, 10, 15, 20]
-        total = len(ml_weights) * len(top_ns)
-        logger.info(f"1D 파라미터 스윕 (레거시): {total}개 조합")
-
-        results = []
-        for ml_w in ml_weights:
-            for tn in top_ns:
-                logger.info(f"  [{len(results)+1}/{total}] ml_weight={ml_w}, top_n={tn}")
-                metrics = run_single_backtest(scores, close, factors, macro, ml_w, tn)
-                results.append({
-                    "ml_weight":   ml_w,
-                    "rule_weight": 0.0,
-                    "top_n":       tn,
-                    "sharpe":      metrics["sharpe"],
-                    "cagr":        metrics["cagr"],
-                    "mdd":         metrics["max_drawdown"],
-                })
-
-    return results
-
-
-# ─── 7. 메인 ─────────────────────────────────────────────────
+        grid = param_grid(
+            ml_weights = ml_weights or [0.3, 0.4, 0.5, 0.6, 0.7],
+            top_ns     = top_ns or [5, 10, 15, 20],
+            costs      = costs or [DEFAULT_COST],
+        )
+        logger.info(f"1D 파라미터 스윕 (레거시): {len(grid)}개 조합")
+
+    if store is not None:
+        from services.backtest_store import cached_sweep
+        results = cached_sweep(inp, grid, version, store, n_workers)
+    else:
+        results = run_sweep(inp, grid, n_workers)
+    return [
+        {
+            "ml_weight":   r["ml_weight"],
+            "rule_weight": r["rule_weight"],
+            "top_n":       r["top_n"],
+            "cost":        r["cost"],
+            "sharpe":      r["sharpe"],
+            "sharpe_lo":   r["sharpe_ci_lo"],
+            "sharpe_hi":   r["sharpe_ci_hi"],
+            "sortino":     r["sortino"],
+            "calmar":      r["calmar"],
+            "cagr":        r["cagr"],
+            "mdd":         r["max_drawdown"],
+        }
+        for r in results
+    ]
+
+
+# ─── 5. 메인 ─────────────────────────────────────────────────
+
+def build_inputs(data: tuple | None = None):
+    """데이터 로드 + ML/룰 신호 → 파라미터 무관 입력 1회 계산.
+    Returns: (BacktestInputs, 모델 버전) — API 비동기 작업(services.backtest_jobs)도 사용"""
+    from config import BACKTEST_SIGNALS
+    factors, close, macro = data or load_data()
+
+    # ML 신호 (OOS 우선, 없으면 최종 모델 추론) + 룰베이스 신호
+    scores, source = (load_oos_scores(), "oos") if BACKTEST_SIGNALS == "oos" else (None, "model")
+    if scores is None:
+        if BACKTEST_SIGNALS == "oos":
+            logger.warning("OOS 예측 없음 → 최종 모델로 전 기간 추론")
+        predictor, meta = load_model()
+        scores = generate_signals(factors, predictor, meta["features"],
+                                  normalization=meta.get("normalization"), close=close)
+        source = "model"
+    rule_scores = generate_rule_scores(factors)
+    inp = prepare_inputs(scores, close, factors, macro, rule_scores=rule_scores)
+    return inp, model_version(source)
+
 
 def main():
-    models, scaler, meta = load_model()
+    from config import BACKTEST_CACHE
     factors, close, macro = load_data()
-    features = meta["features"]
 
-    # ML 신호 + 룰베이스 신호
-    scores      = generate_signals(factors, models, scaler, features)
-    rule_scores = generate_rule_scores(factors)
+    # 파라미터 무관 입력 1회 계산 (기본 백테스트 + 스윕 공유) / 결과 캐시
+    inp, version = build_inputs((factors, close, macro))
+    store = None
+    if BACKTEST_CACHE:
+        from services.backtest_store import BacktestStore
+        store = BacktestStore()
 
     # SPY 일별 수익률 (벤치마크용)
     spy_ret = None
@@ -393,28 +346,15 @@ def main():
 
     # ── 개선된 파라미터로 백테스트 ─────────────────────────────
     logger.info("개선된 백테스트 실행 (mdd-improvement v2: SPY 200MA + 손절 + 룰베이스 혼합)...")
-    base_metrics = run_single_backtest(
-        scores, close, factors, macro,
-        ml_weight=0.5, top_n=10,
-        rule_scores=rule_scores, rule_weight=0.3,
-        spy_ret=spy_ret,
-    )
-
-    # 수익률 곡선 저장 (전략 + SPY 벤치마크)
-    eq_dict  = base_metrics.pop("equity_curve")
-    spy_dict = base_metrics.pop("spy_curve", {})
-    eq_curve = pd.Series(eq_dict, name="equity")
-    eq_curve.index = pd.to_datetime(eq_curve.index)
+    base_metrics, eq_curve = base_backtest(inp, ml_weight=0.5, top_n=10, rule_weight=0.3,
+                                           store=store, version=version)
 
+    # 수익률 곡선 저장 (전략 + SPY 벤치마크, 열 저장)
     storage = get_storage()
-    if spy_dict:
-        spy_curve = pd.Series(spy_dict, name="spy")
-        spy_curve.index = pd.to_datetime(spy_curve.index)
-        eq_df = pd.concat([eq_curve, spy_curve], axis=1).sort_index()
-    else:
-        eq_df = eq_curve.to_frame()
-    storage.save(eq_df, "equity_curve")
-    logger.info(f"equity_curve 저장: {eq_df.shape} (컬럼: {eq_df.columns.tolist()})")
+    if spy_ret is not None:
+        eq_curve = eq_curve.with_returns("spy", spy_ret.reindex(eq_curve.dates).fillna(0).to_numpy())
+    eq_curve.save(storage, "equity_curve")
+    logger.info(f"equity_curve 저장: {len(eq_curve)}일 (곡선: {eq_curve.names})")
 
     # backtest_summary.json 갱신
     summary_path = OUT_DIR / "backtest_summary.json"
@@ -424,7 +364,8 @@ def main():
 
     # ── 2D 파라미터 스윕 (ml_weight × rule_weight) ───────────────
     logger.info("2D 파라미터 스윕 시작 (ml_weight × rule_weight, 25 조합)...")
-    sweep = param_sweep(scores, close, factors, macro, rule_scores=rule_scores, top_n=10)
+    sweep = param_sweep(None, close, factors, macro, top_n=10,
+                        inp=inp, store=store, version=version)
     contour_path = OUT_DIR / "sharpe_contour.json"
     with open(contour_path, "w") as f:
         json.dump(sweep, f, indent=2)
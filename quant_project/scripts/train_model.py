@@ -9,35 +9,54 @@ P4-C: Walk-Forward + Optuna ML 학습
 PRD 설정:
   Walk-Forward : 학습 3년 / 검증 6개월 / 스텝 3개월
   후보 모델    : XGBoost, LightGBM, Ridge (베이스라인)
+                 Ridge는 날짜별 충분통계량 누적합(services.ridge_stats)으로 윈도우별 k×k solve만 수행
   튜닝         : Optuna n_trials=50, max_depth≤5, min_child_weight≥50
+                 검증 IC 기반 pruning, 병렬 trial, SQLite study 저장 + 이전 윈도우 warm-start
+                 윈도우 배열은 memmap(.npy) 1회 기록, DMatrix/Dataset은 trial 간 재사용
+                 검증 Rank IC 조기 종료 → 윈도우별 best_iteration(최종 학습률 기준 환산) 중앙값으로 최종 모델 크기 결정
+  학습 백엔드  : hist + float32 입력, max_bin / LightGBM 스레딩은 실제 윈도우 크기로 보정 후 고정 (train_backend.json)
+  병렬화       : (윈도우 × 모델군) 작업을 프로세스 풀로 동시 실행,
+                 CPU 예산(TRAIN_CPU_BUDGET)을 워커 수 × fit당 n_jobs로 분할
+  체크포인트   : (윈도우 기간, 피처, 탐색 공간, 결과에 영향을 주는 백엔드 설정, 윈도우 데이터) 내용 해시로 키잉
+                 → 분할 수·데이터가 바뀌면 해당 윈도우만 재학습, 나머지는 재사용
+  증분 모드    : TRAIN_MODE=incremental → 시작일 고정 윈도우 그리드 (새 데이터는 새 윈도우만 추가)
+                 backend/main.py 월간 작업(RETRAIN_DAY)이 이 모드로 실행
+                 직전 모델(latest/meta.json)의 학습 백엔드를 그대로 써서 과거 윈도우 체크포인트 키 유지
   앙상블       : 상위 2개 모델 동일가중
-  저장         : models/trained/v{날짜}_{시각}/ + latest 심볼릭 링크
+  OOS 예측     : 윈도우별 검증 예측(모델별 + 앙상블)을 storage "oos_predictions"
+                 (date, ticker, model, window, score)로 저장 → run_backtest가 이어 붙여 신호로 사용
+  저장         : models/trained/v{날짜}_{시각}/ 네이티브 번들 (services.model_bundle) + latest 심볼릭 링크
   버전 추적    : model_registry.json
+  계측         : 단계별 벽시계/CPU/최대 RSS → 버전 디렉터리 run_report.json
+                 (TRAIN_PROFILE_FOLDED=1 이면 flamegraph용 profile.folded 추가)
 """
 
-import os, sys, json, logging, warnings, pickle
+import os, sys, json, logging, warnings, shutil, hashlib
 from datetime import datetime
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from scipy.stats import spearmanr
-from sklearn.linear_model import Ridge
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.preprocessing import RobustScaler
 
 warnings.filterwarnings("ignore")
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from services.panel import DatePanel
+from services.ridge_stats import RidgeMoments, RidgeStats
+from services.run_profiler import RunProfiler
 from services.storage import get_storage
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
 # ─── 경로 ────────────────────────────────────────────────────
-BASE_DIR   = Path(__file__).parent.parent
-MODELS_DIR = BASE_DIR / "models" / "trained"
-REG_PATH   = BASE_DIR / "models" / "model_registry.json"
-CKPT_DIR   = BASE_DIR / "data" / "checkpoints" / "wf_results"
+BASE_DIR     = Path(__file__).parent.parent
+MODELS_DIR   = BASE_DIR / "models" / "trained"
+REG_PATH     = BASE_DIR / "models" / "model_registry.json"
+CKPT_DIR     = BASE_DIR / "data" / "checkpoints" / "wf_results"
+WF_CACHE_DIR = BASE_DIR / "data" / "checkpoints" / "wf_cache"   # 윈도우별 스케일 배열 + 네이티브 데이터셋
 
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 CKPT_DIR.mkdir(parents=True, exist_ok=True)
@@ -53,7 +72,11 @@ N_OPTUNA_TRIALS    = 50
 
 # ─── 1. 데이터 로드 ───────────────────────────────────────────
 
-def load_features() -> tuple[pd.DataFrame, list[str]]:
+def load_features() -> tuple[pd.DataFrame, list[str], dict | None, list[str] | None]:
+    """팩터 로드. 단면 정규화 컬럼({factor}_cs)이 있으면 그것을 학습 피처로 사용.
+    Returns: (패널, 학습 피처 컬럼, 정규화 파라미터 또는 None, 빌드 유니버스 또는 None)"""
+    from services.cross_section import cs_name
+
     with open(BASE_DIR / "data" / "processed" / "selected_features.json") as f:
         sf = json.load(f)
     features = sf["selected_features"]
@@ -63,21 +86,34 @@ def load_features() -> tuple[pd.DataFrame, list[str]]:
     df["date"] = pd.to_datetime(df["date"])
     df = df.set_index(["date", "ticker"]).sort_index()
 
-    logger.info(f"팩터 로드: {df.shape}, 피처 {len(features)}개")
-    return df, features
+    normalization = sf.get("normalization")
+    universe      = sf.get("universe") or (normalization or {}).get("universe")
+    cs_features   = [cs_name(f) for f in features]
+    if normalization and all(c in df.columns for c in cs_features):
+        features = cs_features
+    else:
+        normalization = None
+
+    logger.info(f"팩터 로드: {df.shape}, 피처 {len(features)}개 (단면 정규화: {bool(normalization)})")
+    return df, features, normalization, universe
 
 
 # ─── 2. TimeSeriesSplit 기반 날짜 윈도우 생성 ────────────────
 
-def make_wf_splits(df: pd.DataFrame) -> list[dict]:
+def make_wf_splits(dates: pd.DatetimeIndex, mode: str = "full") -> list[dict]:
     """
     고유 날짜 배열에 TimeSeriesSplit 적용:
       - max_train_size : 3년치 거래일 고정 롤링 윈도우
       - test_size      : 6개월 검증 고정
       - gap            : 학습/검증 사이 간격 (0 = 연속)
     n_splits는 (전체일수 - train_days) / (val_days + step_days) 에서 자동 산출.
+
+    mode="incremental": TimeSeriesSplit은 마지막 날짜 기준으로 윈도우를 배치하므로
+    데이터가 늘면 모든 윈도우가 밀린다. 증분 모드는 첫 날짜 기준 고정 그리드
+    (같은 학습/검증 길이, 검증 구간 간격 val_days)를 써서 기존 윈도우는 그대로 두고
+    검증 기간이 새로 채워진 윈도우만 뒤에 추가한다.
     """
-    dates = df.index.get_level_values("date").unique().sort_values()
+    dates = pd.DatetimeIndex(dates).unique().sort_values()
     total_days = len(dates)
 
     step_days  = TRADING_DAYS_YEAR // 4   # 3개월 스텝 ≈ 63일
@@ -85,17 +121,25 @@ def make_wf_splits(df: pd.DataFrame) -> list[dict]:
     if total_days <= min_required:
         raise ValueError(f"데이터 기간 부족: {total_days}일 < 최소 {min_required}일")
 
-    n_splits = max(1, (total_days - WF_TRAIN_DAYS) // (WF_VAL_DAYS + step_days) - 1)
-
-    tscv = TimeSeriesSplit(
-        n_splits=n_splits,
-        max_train_size=WF_TRAIN_DAYS,
-        test_size=WF_VAL_DAYS,
-        gap=WF_GAP_DAYS,
-    )
+    if mode == "incremental":
+        origin = np.arange(0, total_days - min_required - WF_GAP_DAYS + 1, WF_VAL_DAYS)
+        splits = [(np.arange(o, o + WF_TRAIN_DAYS),
+                   np.arange(o + WF_TRAIN_DAYS + WF_GAP_DAYS,
+                             o + WF_TRAIN_DAYS + WF_GAP_DAYS + WF_VAL_DAYS)) for o in origin]
+        label  = f"시작일 고정 그리드, 스텝 {WF_VAL_DAYS}일"
+    else:
+        n_splits = max(1, (total_days - WF_TRAIN_DAYS) // (WF_VAL_DAYS + step_days) - 1)
+        tscv = TimeSeriesSplit(
+            n_splits=n_splits,
+            max_train_size=WF_TRAIN_DAYS,
+            test_size=WF_VAL_DAYS,
+            gap=WF_GAP_DAYS,
+        )
+        splits = list(tscv.split(dates))
+        label  = f"TimeSeriesSplit n_splits={n_splits}"
 
     windows = []
-    for tr_idx, va_idx in tscv.split(dates):
+    for tr_idx, va_idx in splits:
         tr_dates = dates[tr_idx]
         va_dates = dates[va_idx]
         windows.append({
@@ -107,179 +151,754 @@ def make_wf_splits(df: pd.DataFrame) -> list[dict]:
             "val_end":     va_dates[-1],
         })
 
-    logger.info(f"Walk-Forward 윈도우: {len(windows)}개 (TimeSeriesSplit n_splits={n_splits})")
+    logger.info(f"Walk-Forward 윈도우: {len(windows)}개 ({label})")
     for w in windows:
         logger.info(f"  train [{w['train_start'].date()}~{w['train_end'].date()}]"
                     f"  val [{w['val_start'].date()}~{w['val_end'].date()}]")
     return windows
 
 
-# ─── 3. 패널 슬라이싱 헬퍼 ───────────────────────────────────
+# ─── 3. 학습 패널 (날짜 오프셋 기반 슬라이싱) ─────────────────
 
-def slice_panel(df: pd.DataFrame, dates: pd.DatetimeIndex) -> pd.DataFrame:
-    """날짜 집합으로 (date, ticker) 패널 데이터 슬라이싱"""
-    mask = df.index.get_level_values("date").isin(dates)
-    return df[mask]
+def build_panel(df: pd.DataFrame, features: list[str]) -> DatePanel:
+    """결측 행을 한 번만 제거한 연속 배열 + 날짜별 행 포인터.
+    WF 윈도우는 연속 기간이므로 panel.window(start, end)가 복사 없는 뷰를 돌려준다."""
+    panel = DatePanel.from_frame(df, features, target="target_next")
+    logger.info(f"학습 패널: {len(panel):,}행 × {len(features)}피처, {len(panel.dates)}일 "
+                f"({panel.X.nbytes / 2**20:.0f}MB)")
+    return panel
 
 
 # ─── 4. 모델 튜닝 ────────────────────────────────────────────
+# 검증 Rank IC를 XGBoost/LightGBM 커스텀 평가 지표로 등록 → 매 라운드 증분 예측으로 계산되어
+# EARLY_STOP_ROUNDS 동안 개선이 없으면 조기 종료, 최고 IC 라운드(best_iteration)를 trial에 기록.
+# IC_EVAL_EVERY 라운드마다 같은 지표를 trial에 보고 → pruner가 가망 없는 trial 조기 중단.
+# study는 SQLite(OPTUNA_STORAGE)에 윈도우별 이름으로 저장 → 중단 후 재개 시 남은 trial만 실행,
+# 다음 윈도우 study는 이전 윈도우 상위 trial 파라미터를 먼저 시도(warm-start).
+# 프로세스 풀에서는 직전 윈도우가 아직 실행 중인 경우가 많아, 가까운 이전 윈도우부터 거슬러 올라가
+# 완료 trial이 있는 첫 study를 쓴다.
+
+IC_EVAL_EVERY      = 25     # 검증 IC 보고 주기 (부스팅 라운드)
+EARLY_STOP_ROUNDS  = 50     # 검증 IC 개선 없이 허용하는 라운드 수
+WARM_START_TRIALS  = 5      # 이전 윈도우에서 가져올 상위 trial 수
+
+# 탐색 공간: 이름 → (종류, 하한, 상한[, log]) — 체크포인트 키에도 포함된다
+XGB_SPACE = {
+    "n_estimators":     ("int", 100, 500),
+    "max_depth":        ("int", 2, 5),              # PRD: ≤5
+    "min_child_weight": ("int", 50, 200),           # PRD: ≥50
+    "learning_rate":    ("float", 0.01, 0.1, True),
+    "subsample":        ("float", 0.6, 1.0),
+    "colsample_bytree": ("float", 0.6, 1.0),
+    "reg_alpha":        ("float", 1e-4, 1.0, True),
+    "reg_lambda":       ("float", 1e-4, 1.0, True),
+}
+LGB_SPACE = {
+    "n_estimators":      ("int", 100, 500),
+    "max_depth":         ("int", 2, 5),
+    "min_child_samples": ("int", 50, 200),
+    "learning_rate":     ("float", 0.01, 0.1, True),
+    "subsample":         ("float", 0.6, 1.0),
+    "colsample_bytree":  ("float", 0.6, 1.0),
+    "reg_alpha":         ("float", 1e-4, 1.0, True),
+    "reg_lambda":        ("float", 1e-4, 1.0, True),
+}
+RIDGE_ALPHAS = [float(a) for a in np.logspace(-2, 4, 25)]     # 충분통계량 solve라 촘촘해도 비용 無
+
+
+def _suggest(trial, space: dict) -> dict:
+    params = {}
+    for name, (kind, low, high, *log) in space.items():
+        if kind == "int":
+            params[name] = trial.suggest_int(name, low, high)
+        else:
+            params[name] = trial.suggest_float(name, low, high, log=bool(log and log[0]))
+    return params
+
+
+def _rank_ic_fn(y_va):
+    """검증 타겟 순위를 미리 계산해 두고 예측 순위와의 상관만 구하는 Rank IC (= spearmanr)"""
+    from scipy.stats import rankdata
+    ry = rankdata(y_va)
+    ry = (ry - ry.mean()) / np.linalg.norm(ry - ry.mean())
+
+    def rank_ic(pred) -> float:
+        rp = rankdata(pred)
+        rp = rp - rp.mean()
+        norm = np.linalg.norm(rp)
+        return float(rp @ ry / norm) if norm > 0 else 0.0
+    return rank_ic
+
+
+def _make_pruner():
+    import optuna
+    from config import OPTUNA_PRUNER
+    if OPTUNA_PRUNER == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=IC_EVAL_EVERY * 2, max_resource=500,
+                                              reduction_factor=3)
+    if OPTUNA_PRUNER == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=IC_EVAL_EVERY * 4)
+    return optuna.pruners.NopPruner()
+
+
+def _open_study(study_name: str | None, warm_from: str | list[str] | None):
+    """study 생성/재개. study_name이 없으면 인메모리(단발성 튜닝).
+    warm_from: warm-start 후보 study 이름 (가까운 윈도우 순) — 완료 trial이 있는 첫 study 사용."""
+    import optuna
+    from config import OPTUNA_STORAGE
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    storage = None
+    if study_name:
+        storage = optuna.storages.RDBStorage(
+            OPTUNA_STORAGE, engine_kwargs={"connect_args": {"timeout": 60}},  # 워커 간 잠금 대기
+        )
+    study = optuna.create_study(
+        study_name=study_name, storage=storage, load_if_exists=bool(study_name),
+        direction="minimize", sampler=optuna.samplers.TPESampler(seed=42),
+        pruner=_make_pruner(),
+    )
 
-def tune_xgboost(X_tr, y_tr, X_va, y_va) -> tuple:
+    if storage is not None and warm_from and not study.trials:
+        for name in [warm_from] if isinstance(warm_from, str) else warm_from:
+            try:
+                prev = optuna.load_study(study_name=name, storage=storage)
+            except KeyError:
+                continue
+            done = prev.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+            if not done:
+                continue                      # 아직 실행 중이거나 전부 가지치기됨 → 더 이전 윈도우
+            for t in sorted(done, key=lambda t: t.value)[:WARM_START_TRIALS]:
+                study.enqueue_trial(t.params)
+            logger.info(f"  [{study_name}] warm-start: {name} 상위 "
+                        f"{min(len(done), WARM_START_TRIALS)}개 trial 선투입")
+            break
+    return study
+
+
+def _run_study(study, objective, n_jobs: int) -> None:
+    """완료/가지치기된 trial 수를 제외한 나머지만 병렬 실행"""
+    import optuna
+    from config import OPTUNA_N_JOBS
+    finished = {optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED}
+    remaining = N_OPTUNA_TRIALS - sum(t.state in finished for t in study.trials)
+    if remaining > 0:
+        study.optimize(objective, n_trials=remaining,
+                       n_jobs=min(OPTUNA_N_JOBS, _threads(n_jobs)), show_progress_bar=False)
+
+
+def _threads(n_jobs: int) -> int:
+    return n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+
+
+def _trial_threads(n_jobs: int) -> int:
+    """병렬 trial 수만큼 fit당 스레드를 나눠 fit 하나에 배정된 CPU 예산 유지"""
+    from config import OPTUNA_N_JOBS
+    budget = _threads(n_jobs)
+    return max(1, budget // max(1, min(OPTUNA_N_JOBS, budget)))
+
+
+def _xgb_prune_callback(trial):
+    """eval 로그의 검증 Rank IC를 IC_EVAL_EVERY 라운드마다 trial에 보고"""
     import optuna
     import xgboost as xgb
-    optuna.logging.set_verbosity(optuna.logging.WARNING)
 
-    def objective(trial):
-        params = {
-            "n_estimators":     trial.suggest_int("n_estimators", 100, 500),
-            "max_depth":        trial.suggest_int("max_depth", 2, 5),           # PRD: ≤5
-            "min_child_weight": trial.suggest_int("min_child_weight", 50, 200), # PRD: ≥50
-            "learning_rate":    trial.suggest_float("learning_rate", 0.01, 0.1, log=True),
-            "subsample":        trial.suggest_float("subsample", 0.6, 1.0),
-            "colsample_bytree": trial.suggest_float("colsample_bytree", 0.6, 1.0),
-            "reg_alpha":        trial.suggest_float("reg_alpha", 1e-4, 1.0, log=True),
-            "reg_lambda":       trial.suggest_float("reg_lambda", 1e-4, 1.0, log=True),
-            "random_state": 42, "n_jobs": -1, "verbosity": 0,
-        }
-        m = xgb.XGBRegressor(**params)
-        m.fit(X_tr, y_tr, eval_set=[(X_va, y_va)], verbose=False)
-        ic, _ = spearmanr(m.predict(X_va), y_va)
-        return -ic
-
-    study = optuna.create_study(direction="minimize",
-                                sampler=optuna.samplers.TPESampler(seed=42))
-    study.optimize(objective, n_trials=N_OPTUNA_TRIALS, show_progress_bar=False)
+    class _ICReport(xgb.callback.TrainingCallback):
+        def after_iteration(self, model, epoch, evals_log):
+            step = epoch + 1
+            if step % IC_EVAL_EVERY:
+                return False
+            trial.report(-evals_log["val"]["rank_ic"][-1], step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+            return False
+
+    return _ICReport()
+
+
+def _lgb_prune_callback(trial):
+    import optuna
+
+    def _callback(env):
+        step = env.iteration + 1
+        if step % IC_EVAL_EVERY:
+            return
+        ic = next(v for _, name, v, _ in env.evaluation_result_list if name == "rank_ic")
+        trial.report(-ic, step)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+
+    return _callback
+
+
+# trial마다 학습 데이터를 다시 양자화/비닝하지 않도록 네이티브 데이터셋을 한 번만 만들어 재사용.
+# Optuna 병렬 trial(스레드)끼리 핸들을 공유하지 않도록 스레드별로 1개씩 보관.
+LGB_DATASET_PARAMS = {"feature_pre_filter": False, "verbose": -1}   # trial별 min_child_samples 변경 허용
+
+# 트리 구성 백엔드 (CPU histogram). calibrate_backend()가 실제 윈도우 크기로 max_bin /
+# LightGBM 스레딩 방식을 골라 덮어쓰고, 결과는 meta.json["training_backend"]에 기록.
+DEFAULT_BACKEND = {
+    "tree_method":   "hist",
+    "dtype":         "float32",    # 부스터 내부 정밀도와 동일 → 윈도우 배열 메모리 절반
+    "xgb_max_bin":   256,
+    "lgb_max_bin":   255,
+    "lgb_threading": "col_wise",   # "col_wise" | "row_wise" (LightGBM 자동 판별 오버헤드 제거)
+}
+# 학습 결과(트리)를 바꾸는 설정만 — 체크포인트 키에 포함. 스레딩 방식은 속도만 바꾸므로 제외.
+RESULT_BACKEND_KEYS = ("tree_method", "dtype", "xgb_max_bin", "lgb_max_bin")
+
+
+def _lgb_dataset_params(backend: dict) -> dict:
+    return {**LGB_DATASET_PARAMS, "max_bin": backend["lgb_max_bin"]}
+
+
+def _lgb_backend_params(backend: dict) -> dict:
+    return {f"force_{backend['lgb_threading']}": True}
+
+
+def _per_thread(build):
+    import threading
+    local = threading.local()
+
+    def get():
+        if not hasattr(local, "obj"):
+            local.obj = build()
+        return local.obj
+    return get
+
+
+def _xgb_native_params(p: dict, threads: int, backend: dict = DEFAULT_BACKEND) -> dict:
+    """XGBRegressor 파라미터 이름 → xgb.train 네이티브 파라미터"""
+    return {
+        "objective": "reg:squarederror",
+        "tree_method": backend["tree_method"], "max_bin": backend["xgb_max_bin"],
+        "max_depth": p["max_depth"], "min_child_weight": p["min_child_weight"],
+        "eta": p["learning_rate"], "subsample": p["subsample"],
+        "colsample_bytree": p["colsample_bytree"],
+        "alpha": p["reg_alpha"], "lambda": p["reg_lambda"],
+        "seed": 42, "nthread": threads, "verbosity": 0,
+    }
+
 
+def tune_xgboost(X_tr, y_tr, X_va, y_va, n_jobs: int = -1,
+                 study_name: str | None = None, warm_from: str | list[str] | None = None,
+                 cache_dir: str | None = None, backend: dict = DEFAULT_BACKEND) -> tuple:
+    import xgboost as xgb
+    threads = _trial_threads(n_jobs)
+    dtrain  = _per_thread(lambda: xgb.QuantileDMatrix(X_tr, y_tr, nthread=threads,
+                                                      max_bin=backend["xgb_max_bin"]))
+    dval    = _per_thread(lambda: xgb.DMatrix(X_va, y_va, nthread=threads))
+    rank_ic = _rank_ic_fn(y_va)
+
+    def objective(trial):
+        params  = _suggest(trial, XGB_SPACE)
+        booster = xgb.train(_xgb_native_params(params, threads, backend), dtrain(),
+                            num_boost_round=params["n_estimators"],
+                            evals=[(dval(), "val")], verbose_eval=False,
+                            custom_metric=lambda pred, d: ("rank_ic", rank_ic(pred)), maximize=True,
+                            early_stopping_rounds=EARLY_STOP_ROUNDS,
+                            callbacks=[_xgb_prune_callback(trial)])
+        trial.set_user_attr("best_iteration", booster.best_iteration + 1)
+        return -booster.best_score
+
+    study = _open_study(study_name, warm_from)
+    _run_study(study, objective, n_jobs)
+
+    # 최종 fit은 최고 IC 라운드까지만
     best = study.best_params
-    best.update({"random_state": 42, "n_jobs": -1, "verbosity": 0})
+    best["n_estimators"] = study.best_trial.user_attrs.get("best_iteration", best["n_estimators"])
+    best.update({"random_state": 42, "n_jobs": n_jobs, "verbosity": 0,
+                 "tree_method": backend["tree_method"], "max_bin": backend["xgb_max_bin"]})
     model = xgb.XGBRegressor(**best)
     model.fit(X_tr, y_tr)
     return model, -study.best_value
 
 
-def tune_lightgbm(X_tr, y_tr, X_va, y_va) -> tuple:
-    import optuna
+def tune_lightgbm(X_tr, y_tr, X_va, y_va, n_jobs: int = -1,
+                  study_name: str | None = None, warm_from: str | list[str] | None = None,
+                  cache_dir: str | None = None, backend: dict = DEFAULT_BACKEND) -> tuple:
     import lightgbm as lgb
-    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    threads   = _trial_threads(n_jobs)
+    ds_params = _lgb_dataset_params(backend)
+
+    # 비닝 결과를 바이너리로 저장 → 스레드별 Dataset은 바이너리에서 바로 로드
+    bin_path = os.path.join(cache_dir, "lgb_train.bin") if cache_dir else None
+    if bin_path and not os.path.exists(bin_path):
+        lgb.Dataset(X_tr, y_tr, params=ds_params).save_binary(bin_path)
+    rank_ic = _rank_ic_fn(y_va)
+
+    def _datasets():
+        train = (lgb.Dataset(bin_path, params=ds_params) if bin_path
+                 else lgb.Dataset(X_tr, y_tr, params=ds_params))
+        return train, lgb.Dataset(X_va, y_va, reference=train, params=ds_params)
+    datasets = _per_thread(_datasets)
 
     def objective(trial):
-        params = {
-            "n_estimators":      trial.suggest_int("n_estimators", 100, 500),
-            "max_depth":         trial.suggest_int("max_depth", 2, 5),
-            "min_child_samples": trial.suggest_int("min_child_samples", 50, 200),
-            "learning_rate":     trial.suggest_float("learning_rate", 0.01, 0.1, log=True),
-            "subsample":         trial.suggest_float("subsample", 0.6, 1.0),
-            "colsample_bytree":  trial.suggest_float("colsample_bytree", 0.6, 1.0),
-            "reg_alpha":         trial.suggest_float("reg_alpha", 1e-4, 1.0, log=True),
-            "reg_lambda":        trial.suggest_float("reg_lambda", 1e-4, 1.0, log=True),
-            "random_state": 42, "n_jobs": -1, "verbose": -1,
-        }
-        m = lgb.LGBMRegressor(**params)
-        m.fit(X_tr, y_tr, eval_set=[(X_va, y_va)])
-        ic, _ = spearmanr(m.predict(X_va), y_va)
-        return -ic
-
-    study = optuna.create_study(direction="minimize",
-                                sampler=optuna.samplers.TPESampler(seed=42))
-    study.optimize(objective, n_trials=N_OPTUNA_TRIALS, show_progress_bar=False)
+        params = _suggest(trial, LGB_SPACE)
+        # LightGBM은 LGBMRegressor와 같은 별칭 파라미터를 그대로 받는다
+        native  = {k: v for k, v in params.items() if k != "n_estimators"}
+        native.update({"objective": "regression", "metric": "None", "random_state": 42,
+                       "n_jobs": threads, "verbose": -1, **_lgb_backend_params(backend)})
+        dtrain, dval = datasets()
+        booster = lgb.train(native, dtrain, num_boost_round=params["n_estimators"],
+                            valid_sets=[dval], valid_names=["val"],
+                            feval=lambda pred, d: ("rank_ic", rank_ic(pred), True),
+                            callbacks=[lgb.early_stopping(EARLY_STOP_ROUNDS, verbose=False),
+                                       _lgb_prune_callback(trial)])
+        trial.set_user_attr("best_iteration", booster.best_iteration)
+        return -booster.best_score["val"]["rank_ic"]
+
+    study = _open_study(study_name, warm_from)
+    _run_study(study, objective, n_jobs)
 
     best = study.best_params
-    best.update({"random_state": 42, "n_jobs": -1, "verbose": -1})
+    best["n_estimators"] = study.best_trial.user_attrs.get("best_iteration", best["n_estimators"])
+    best.update({"random_state": 42, "n_jobs": n_jobs, "verbose": -1,
+                 "max_bin": backend["lgb_max_bin"], **_lgb_backend_params(backend)})
     model = lgb.LGBMRegressor(**best)
     model.fit(X_tr, y_tr)
     return model, -study.best_value
 
 
-def train_ridge(X_tr, y_tr, X_va, y_va) -> tuple:
+def train_ridge(X_tr, y_tr, X_va, y_va, n_jobs: int = 1,
+                moments: RidgeMoments | None = None, center=None, scale=None, **_) -> tuple:
+    """alpha 그리드 전체를 충분통계량 하나로 적합.
+    moments가 주어지면 (원본 X 기준 윈도우 통계 + 스케일러) → X_tr 없이 적합."""
+    if moments is None:
+        moments = RidgeMoments.from_arrays(X_tr, y_tr)
+    rank_ic = _rank_ic_fn(y_va)
     best_ic, best_model = -np.inf, None
-    for alpha in [0.01, 0.1, 1.0, 10.0, 100.0]:
-        m = Ridge(alpha=alpha)
-        m.fit(X_tr, y_tr)
-        ic, _ = spearmanr(m.predict(X_va), y_va)
+    for alpha in RIDGE_ALPHAS:
+        m  = moments.fit(alpha, center, scale)
+        ic = rank_ic(m.predict(X_va))
         if ic > best_ic:
             best_ic, best_model = ic, m
     return best_model, best_ic
 
 
-# ─── 5. Walk-Forward 실행 ─────────────────────────────────────
+# ─── 4-1. 학습 백엔드 보정 ────────────────────────────────────
+# 최신 윈도우 크기(학습 3년 + 검증 6개월)의 실제 패널로 고정 파라미터 부스팅을 짧게 돌려
+# 후보 설정별 시간/검증 IC를 측정 → IC 손실이 허용 범위인 가장 빠른 설정 선택.
+# 선택 결과는 CKPT_DIR/train_backend.json에 고정 저장 → 피처 구성이 같고 학습 행 수가 보정 당시의
+# 1/CALIB_RESIZE ~ CALIB_RESIZE배 안이면 재사용 (벽시계 잡음으로 실행마다 선택이 흔들리지 않게).
+# 재보정은 TRAIN_BACKEND_CALIBRATE=force 또는 큰 크기 변화 시에만.
 
-def run_walk_forward(df: pd.DataFrame, features: list[str]) -> list[dict]:
-    windows   = make_wf_splits(df)
-    wf_results = []
+CALIB_ROUNDS    = 60
+CALIB_MAX_BINS  = (63, 127, 255)
+CALIB_IC_TOL    = 0.002
+CALIB_RESIZE    = 2.0      # 학습 행 수가 이 배율 이상 변하면 재보정
+CALIB_PARAMS    = {"max_depth": 4, "min_child_weight": 100, "learning_rate": 0.05,
+                   "subsample": 0.8, "colsample_bytree": 0.8, "reg_alpha": 1e-3, "reg_lambda": 1e-3}
 
-    for i, w in enumerate(windows):
-        ckpt_path = CKPT_DIR / f"wf_step_{i:02d}.json"
-        if ckpt_path.exists():
-            logger.info(f"[{i+1}/{len(windows)}] 스킵 (체크포인트)")
-            with open(ckpt_path) as f:
-                wf_results.append(json.load(f))
-            continue
 
-        logger.info(f"[{i+1}/{len(windows)}] "
-                    f"train {w['train_start'].date()}~{w['train_end'].date()} | "
-                    f"val {w['val_start'].date()}~{w['val_end'].date()}")
+def _calibration_runs(X_tr, y_tr, X_va, y_va, threads: int) -> list[dict]:
+    import time
+    import lightgbm as lgb
+    import xgboost as xgb
+    rank_ic = _rank_ic_fn(y_va)
+    runs = []
+
+    for max_bin in CALIB_MAX_BINS:
+        backend = {**DEFAULT_BACKEND, "xgb_max_bin": max_bin}
+        t0 = time.perf_counter()
+        d  = xgb.QuantileDMatrix(X_tr, y_tr, max_bin=max_bin, nthread=threads)
+        bst = xgb.train(_xgb_native_params(CALIB_PARAMS, threads, backend), d, CALIB_ROUNDS)
+        runs.append({"lib": "xgboost", "max_bin": max_bin,
+                     "seconds": round(time.perf_counter() - t0, 3),
+                     "ic": round(rank_ic(bst.inplace_predict(X_va)), 5)})
+
+        for mode in ("col_wise", "row_wise"):
+            backend = {**DEFAULT_BACKEND, "lgb_max_bin": max_bin, "lgb_threading": mode}
+            params  = {"objective": "regression", "max_depth": 4, "min_child_samples": 100,
+                       "learning_rate": 0.05, "subsample": 0.8, "colsample_bytree": 0.8,
+                       "random_state": 42, "n_jobs": threads, "verbose": -1,
+                       **_lgb_backend_params(backend)}
+            t0 = time.perf_counter()
+            d  = lgb.Dataset(X_tr, y_tr, params=_lgb_dataset_params(backend))
+            bst = lgb.train(params, d, CALIB_ROUNDS)
+            runs.append({"lib": "lightgbm", "max_bin": max_bin, "threading": mode,
+                         "seconds": round(time.perf_counter() - t0, 3),
+                         "ic": round(rank_ic(bst.predict(X_va)), 5)})
+    return runs
+
+
+def _pick(runs: list[dict]) -> dict:
+    """검증 IC가 최고치 - CALIB_IC_TOL 이상인 설정 중 가장 빠른 것"""
+    best_ic = max(r["ic"] for r in runs)
+    return min((r for r in runs if r["ic"] >= best_ic - CALIB_IC_TOL), key=lambda r: r["seconds"])
+
+
+def _same_size(calibrated: dict, key: dict) -> bool:
+    """피처 수가 같고 학습 행 수가 보정 당시의 CALIB_RESIZE배 범위 안인지"""
+    if calibrated.get("n_features") != key["n_features"] or not calibrated.get("n_train"):
+        return False
+    ratio = key["n_train"] / calibrated["n_train"]
+    return 1 / CALIB_RESIZE < ratio < CALIB_RESIZE
+
+
+def calibrate_backend(panel: DatePanel) -> dict:
+    from config import TRAIN_BACKEND_CALIBRATE
+    if TRAIN_BACKEND_CALIBRATE == "0":
+        return dict(DEFAULT_BACKEND)
+
+    dates = panel.dates[-(WF_TRAIN_DAYS + WF_VAL_DAYS):]
+    X_tr, y_tr = panel.window(dates[0], dates[-WF_VAL_DAYS - 1])
+    X_va, y_va = panel.window(dates[-WF_VAL_DAYS], dates[-1])
+    key = {"n_train": int(len(y_tr)), "n_features": int(X_tr.shape[1])}
+
+    path = CKPT_DIR.parent / "train_backend.json"
+    if path.exists():
+        with open(path) as f:
+            cached = json.load(f)
+        if TRAIN_BACKEND_CALIBRATE != "force" and _same_size(cached.get("key", {}), key):
+            logger.info("학습 백엔드 (저장된 보정): " + ", ".join(
+                f"{k}={v}" for k, v in cached["backend"].items() if k != "calibration"))
+            return cached["backend"]
+
+    _, threads = cpu_plan(len(POOL_FAMILIES))            # WF fit 하나가 받는 스레드 수
+    dtype = DEFAULT_BACKEND["dtype"]
+    runs  = _calibration_runs(X_tr.astype(dtype), y_tr, X_va.astype(dtype), y_va, threads)
+    xgb_pick = _pick([r for r in runs if r["lib"] == "xgboost"])
+    lgb_pick = _pick([r for r in runs if r["lib"] == "lightgbm"])
+
+    backend = {
+        **DEFAULT_BACKEND,
+        "xgb_max_bin":   xgb_pick["max_bin"],
+        "lgb_max_bin":   lgb_pick["max_bin"],
+        "lgb_threading": lgb_pick["threading"],
+        "calibration":   {**key, "threads": threads, "rounds": CALIB_ROUNDS, "runs": runs},
+    }
+    logger.info(f"학습 백엔드 보정 ({key['n_train']:,}행): XGB max_bin={backend['xgb_max_bin']}, "
+                f"LGB max_bin={backend['lgb_max_bin']} {backend['lgb_threading']}")
+    with open(path, "w") as f:
+        json.dump({"key": key, "backend": backend}, f, indent=2)
+    return backend
+
+
+def pinned_backend() -> dict | None:
+    """직전 모델(models/trained/latest/meta.json)의 학습 백엔드 — 증분 모드에서 재보정 대신 사용.
+    보정 결과가 바뀌어도 과거 윈도우 체크포인트 키가 그대로 유지된다."""
+    meta_path = MODELS_DIR / "latest" / "meta.json"
+    if not meta_path.exists():
+        return None
+    with open(meta_path) as f:
+        backend = json.load(f).get("training_backend")
+    if not backend:
+        return None
+    logger.info("학습 백엔드 (직전 모델 고정): " + ", ".join(
+        f"{k}={v}" for k, v in backend.items() if k != "calibration"))
+    return {**DEFAULT_BACKEND, **backend}
+
+
+# ─── 5. Walk-Forward 실행 (윈도우 × 모델군 병렬 스케줄러) ─────
+
+MODEL_FAMILIES = {
+    "xgboost":  tune_xgboost,
+    "lightgbm": tune_lightgbm,
+    "ridge":    train_ridge,
+}
+POOL_FAMILIES = ("xgboost", "lightgbm")    # 프로세스 풀 작업 (Ridge는 충분통계량으로 메인에서 적합)
+
+
+def cpu_plan(n_tasks: int) -> tuple[int, int]:
+    """전역 CPU 예산을 동시 실행 fit 수와 fit당 스레드 수로 분할.
+    Returns: (워커 수, fit당 n_jobs)"""
+    from config import TRAIN_CPU_BUDGET, TRAIN_N_WORKERS
+    budget  = TRAIN_CPU_BUDGET or os.cpu_count() or 1
+    workers = TRAIN_N_WORKERS or max(1, budget // 2)      # 기본: fit당 2스레드
+    workers = max(1, min(workers, n_tasks, budget))
+    return workers, max(1, budget // workers)
+
+
+def _window_key(panel: DatePanel, w: dict, backend: dict) -> str:
+    """윈도우 체크포인트 키 = (기간, 피처, 탐색 공간·trial 수, 결과에 영향을 주는 백엔드 설정, 윈도우 데이터) 해시.
+    하나라도 바뀌면 다른 키 → 오래된 체크포인트/study를 조용히 재사용하지 않는다.
+    데이터 버전은 윈도우 구간 행(X, y, 종목)의 내용 해시 — 기간 밖 데이터 변경은 영향 없음."""
+    spec = {
+        "train":    [str(w["train_start"].date()), str(w["train_end"].date())],
+        "val":      [str(w["val_start"].date()), str(w["val_end"].date())],
+        "features": panel.features,
+        "space":    {"xgboost": XGB_SPACE, "lightgbm": LGB_SPACE, "ridge": RIDGE_ALPHAS},
+        "tuning":   [N_OPTUNA_TRIALS, EARLY_STOP_ROUNDS],
+        "backend":  {k: backend[k] for k in RESULT_BACKEND_KEYS},
+    }
+    h = hashlib.blake2b(json.dumps(spec, sort_keys=True).encode(), digest_size=8)
+    ticker_hash = pd.util.hash_array(np.asarray(panel.tickers, dtype=object))
+    for start, end in ((w["train_start"], w["train_end"]), (w["val_start"], w["val_end"])):
+        sl = panel.span(start, end)
+        h.update(np.diff(panel.indptr[panel.dates.searchsorted(start):
+                                      panel.dates.searchsorted(end, side="right") + 1]).tobytes())
+        h.update(ticker_hash[panel.ticker_codes[sl]].tobytes())
+        h.update(panel.X[sl].tobytes())
+        h.update(panel.y[sl].tobytes())
+    return h.hexdigest()
+
 
-        # TimeSeriesSplit이 만든 날짜 인덱스로 패널 슬라이싱
-        tr = slice_panel(df, w["train_dates"]).dropna(subset=features + ["target_next"])
-        va = slice_panel(df, w["val_dates"]).dropna(subset=features + ["target_next"])
+def _study_name(family: str, w: dict, key: str) -> str:
+    """윈도우 기간 + 체크포인트 키로 식별되는 Optuna study 이름"""
+    return f"{family}_{w['train_start']:%Y%m%d}_{w['val_end']:%Y%m%d}_{key}"
 
-        if len(tr) < 1000 or len(va) < 100:
-            logger.warning(f"  데이터 부족 (train={len(tr)}, val={len(va)}) → 스킵")
-            continue
 
-        X_tr, y_tr = tr[features].values, tr["target_next"].values
-        X_va, y_va = va[features].values, va["target_next"].values
+def _ckpt_path(key: str) -> Path:
+    return CKPT_DIR / f"wf_{key}.json"
 
-        # 스케일링: train 통계만 사용 (test leak 방지)
-        scaler = RobustScaler()
-        X_tr   = scaler.fit_transform(X_tr)
-        X_va   = scaler.transform(X_va)
 
-        logger.info("  XGBoost 튜닝...")
-        xgb_model, xgb_ic   = tune_xgboost(X_tr, y_tr, X_va, y_va)
+def _oos_path(key: str) -> Path:
+    return CKPT_DIR / f"wf_{key}_oos.parquet"
 
-        logger.info("  LightGBM 튜닝...")
-        lgb_model, lgb_ic   = tune_lightgbm(X_tr, y_tr, X_va, y_va)
 
-        ridge_model, ridge_ic = train_ridge(X_tr, y_tr, X_va, y_va)
+WINDOW_ARRAYS = ("X_tr", "y_tr", "X_va", "y_va")
 
-        model_scores = {"xgboost": xgb_ic, "lightgbm": lgb_ic, "ridge": ridge_ic}
-        logger.info(f"  IC — XGB:{xgb_ic:.4f}  LGB:{lgb_ic:.4f}  Ridge:{ridge_ic:.4f}")
 
-        # 앙상블: 상위 2개 동일가중
-        ranked    = sorted(model_scores.items(), key=lambda x: x[1], reverse=True)
-        top2      = [ranked[0][0], ranked[1][0]]
-        model_map = {"xgboost": xgb_model, "lightgbm": lgb_model, "ridge": ridge_model}
+def _load_window(cache_dir: str) -> dict:
+    """윈도우 배열을 읽기 전용 memmap으로 연결 (워커 간 페이지 캐시 공유, 복사 없음)"""
+    return {k: np.load(os.path.join(cache_dir, f"{k}.npy"), mmap_mode="r") for k in WINDOW_ARRAYS}
 
-        pred_va     = np.mean([model_map[m].predict(X_va) for m in top2], axis=0)
-        ensemble_ic, _ = spearmanr(pred_va, y_va)
-        logger.info(f"  앙상블({top2}) IC: {ensemble_ic:.4f}")
 
-        step = {
-            "step":        i,
-            "train_start": str(w["train_start"].date()),
-            "train_end":   str(w["train_end"].date()),
-            "val_start":   str(w["val_start"].date()),
-            "val_end":     str(w["val_end"].date()),
-            "model_ics":   model_scores,
-            "ensemble_ic": ensemble_ic,
-            "top2_models": top2,
-            "n_train":     int(len(tr)),
-            "n_val":       int(len(va)),
-        }
+def _fit_family(step: int, family: str, cache_dir: str, n_jobs: int,
+                study_name: str | None = None, warm_from: str | list[str] | None = None,
+                backend: dict = DEFAULT_BACKEND) -> tuple:
+    """워커 프로세스에서 실행되는 단위 작업: 한 윈도우의 한 모델군 튜닝.
+    배열은 pickle로 전달받지 않고 cache_dir의 .npy를 memmap으로 연결한다.
+    워커 내 계측 기록을 함께 반환 → 메인 프로파일러에 편입."""
+    prof = RunProfiler()
+    with prof.stage(f"optuna_{family}", window=step, family=family, study=study_name):
+        d = _load_window(cache_dir)
+        model, ic = MODEL_FAMILIES[family](d["X_tr"], d["y_tr"], d["X_va"], d["y_va"],
+                                           n_jobs=n_jobs, study_name=study_name,
+                                           warm_from=warm_from, cache_dir=cache_dir,
+                                           backend=backend)
+    with prof.stage("predict_val", window=step, family=family):
+        pred_va = model.predict(d["X_va"])
+    return step, family, model, ic, pred_va, prof.records()
 
-        with open(ckpt_path, "w") as f:
-            json.dump(step, f, indent=2)
-        wf_results.append(step)
 
-    return wf_results
+def _prepare_window(panel: DatePanel, key: str, w: dict, dtype: str = "float64") -> str | None:
+    """윈도우 슬라이스 → 스케일링 → WF_CACHE_DIR/{key}/*.npy 에 한 번만 기록.
+    Returns: 캐시 디렉터리 (데이터 부족이면 None)"""
+    # TimeSeriesSplit 윈도우는 연속 기간 → 날짜 오프셋으로 뷰 슬라이싱
+    X_tr, y_tr = panel.window(w["train_start"], w["train_end"])
+    X_va, y_va = panel.window(w["val_start"], w["val_end"])
+
+    if len(y_tr) < 1000 or len(y_va) < 100:
+        logger.warning(f"  데이터 부족 (train={len(y_tr)}, val={len(y_va)}) → 스킵")
+        return None
+
+    # 스케일링: train 통계만 사용 (test leak 방지)
+    scaler = RobustScaler()
+    arrays = {
+        "X_tr": scaler.fit_transform(X_tr).astype(dtype, copy=False), "y_tr": y_tr,
+        "X_va": scaler.transform(X_va).astype(dtype, copy=False),     "y_va": y_va,
+    }
+
+    cache_dir = WF_CACHE_DIR / key
+    shutil.rmtree(cache_dir, ignore_errors=True)     # 이전 실행의 바이너리 캐시 폐기
+    cache_dir.mkdir(parents=True)
+    for k, arr in arrays.items():
+        np.save(cache_dir / f"{k}.npy", np.ascontiguousarray(arr))
+    np.savez(cache_dir / "scaler.npz", center=scaler.center_, scale=scaler.scale_)
+    return str(cache_dir)
+
+
+def _fit_ridge_window(stats: RidgeStats, w: dict, cache_dir: str) -> dict:
+    """Ridge는 풀에 보내지 않고 메인 프로세스에서 적합 — 누적합 차이 + alpha별 k×k solve"""
+    d  = _load_window(cache_dir)
+    sc = np.load(os.path.join(cache_dir, "scaler.npz"))
+    model, ic = train_ridge(None, None, d["X_va"], d["y_va"],
+                            moments=stats.window(w["train_start"], w["train_end"]),
+                            center=sc["center"], scale=sc["scale"])
+    return {"model": model, "ic": ic, "pred_va": model.predict(d["X_va"])}
+
+
+def _finish_window(i: int, w: dict, key: str, cache_dir: str, fits: dict,
+                   index: pd.MultiIndex) -> dict:
+    """모델군 결과 3개가 모이면 앙상블 IC 계산 + 체크포인트/OOS 예측 기록 + 윈도우 캐시 삭제.
+    index: 검증 행의 (date, ticker) — pred_va와 같은 순서"""
+    data = _load_window(cache_dir)
+    model_scores = {f: fits[f]["ic"] for f in MODEL_FAMILIES}
+    logger.info(f"  [step {i}] IC — XGB:{model_scores['xgboost']:.4f}  "
+                f"LGB:{model_scores['lightgbm']:.4f}  Ridge:{model_scores['ridge']:.4f}")
+
+    # 앙상블: 상위 2개 동일가중
+    ranked = sorted(model_scores.items(), key=lambda x: x[1], reverse=True)
+    top2   = [ranked[0][0], ranked[1][0]]
+
+    pred_va     = np.mean([fits[m]["pred_va"] for m in top2], axis=0)
+    ensemble_ic, _ = spearmanr(pred_va, data["y_va"])
+    logger.info(f"  [step {i}] 앙상블({top2}) IC: {ensemble_ic:.4f}")
+
+    step = {
+        "step":        i,
+        "key":         key,
+        "train_start": str(w["train_start"].date()),
+        "train_end":   str(w["train_end"].date()),
+        "val_start":   str(w["val_start"].date()),
+        "val_end":     str(w["val_end"].date()),
+        "model_ics":   model_scores,
+        # 조기 종료로 정해진 부스팅 라운드 수 (최종 모델 크기 산정용)
+        "best_iterations": {f: int(fits[f]["model"].n_estimators)
+                            for f in ("xgboost", "lightgbm")},
+        # best_iteration이 나온 trial의 학습률 (최종 모델 학습률로 라운드 환산)
+        "learning_rates":  {f: float(fits[f]["model"].get_params()["learning_rate"])
+                            for f in ("xgboost", "lightgbm")},
+        "ridge_alpha": float(fits["ridge"]["model"].alpha),
+        "ensemble_ic": ensemble_ic,
+        "top2_models": top2,
+        "n_train":     int(len(data["y_tr"])),
+        "n_val":       int(len(data["y_va"])),
+    }
+
+    preds = {**{f: fits[f]["pred_va"] for f in MODEL_FAMILIES}, "ensemble": pred_va}
+    n = len(index)
+    pd.DataFrame({
+        "date":   np.tile(index.get_level_values("date"), len(preds)),
+        "ticker": np.tile(index.get_level_values("ticker"), len(preds)),
+        "model":  np.repeat(list(preds), n),
+        "score":  np.concatenate(list(preds.values())).astype(np.float32),
+    }).to_parquet(_oos_path(key), index=False)
+
+    with open(_ckpt_path(key), "w") as f:
+        json.dump(step, f, indent=2)
+    del data
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return step
+
+
+def run_walk_forward(panel: DatePanel, dates: pd.DatetimeIndex,
+                     backend: dict = DEFAULT_BACKEND, mode: str = "full",
+                     prof: RunProfiler | None = None) -> list[dict]:
+    """키가 일치하는 체크포인트가 없는 윈도우만 (윈도우 × 모델군) 단위로 프로세스 풀에 분배.
+    동시에 준비해 두는 윈도우 수는 워커 수로 제한해 메모리 사용을 묶는다."""
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    prof = prof or RunProfiler()
+
+    with prof.stage("split"):
+        windows = make_wf_splits(dates, mode)
+        keys    = [_window_key(panel, w, backend) for w in windows]
+    wf_results = []
+    pending    = []
+
+    for i, key in enumerate(keys):
+        ckpt_path = _ckpt_path(key)
+        if ckpt_path.exists():
+            logger.info(f"[{i+1}/{len(windows)}] 스킵 (체크포인트 {key})")
+            with open(ckpt_path) as f:
+                wf_results.append({**json.load(f), "step": i})
+        else:
+            pending.append(i)
+
+    logger.info(f"WF 체크포인트: 재사용 {len(wf_results)}개 / 신규 학습 {len(pending)}개")
+    if not pending:
+        return sorted(wf_results, key=lambda r: r["step"])
+
+    n_workers, n_jobs = cpu_plan(len(pending) * len(POOL_FAMILIES))
+    logger.info(f"WF 스케줄: {len(pending)}개 윈도우 × {len(POOL_FAMILIES)}개 모델군, "
+                f"워커 {n_workers} × fit당 {n_jobs}스레드")
+
+    with prof.stage("ridge_stats"):
+        stats = RidgeStats.from_panel(panel)
+    in_flight: dict[int, dict] = {}     # step → {"cache_dir", "fits"}
+    futures = set()
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        while pending or futures:
+            # 준비된 윈도우가 워커 수보다 적으면 다음 윈도우 투입
+            while pending and len(in_flight) < n_workers:
+                i = pending.pop(0)
+                w = windows[i]
+                logger.info(f"[{i+1}/{len(windows)}] "
+                            f"train {w['train_start'].date()}~{w['train_end'].date()} | "
+                            f"val {w['val_start'].date()}~{w['val_end'].date()}")
+                with prof.stage(f"window_{i:02d}", window=i):
+                    with prof.stage("scale", window=i):
+                        cache_dir = _prepare_window(panel, keys[i], w, backend["dtype"])
+                    if cache_dir is None:
+                        continue
+                    with prof.stage("ridge", window=i):
+                        ridge = _fit_ridge_window(stats, w, cache_dir)
+                in_flight[i] = {"cache_dir": cache_dir, "fits": {"ridge": ridge}}
+                for family in POOL_FAMILIES:
+                    futures.add(pool.submit(
+                        _fit_family, i, family, cache_dir, n_jobs,
+                        _study_name(family, w, keys[i]),
+                        [_study_name(family, windows[j], keys[j]) for j in range(i - 1, -1, -1)],
+                        backend,
+                    ))
+
+            if not futures:
+                break
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i, family, model, ic, pred_va, records = fut.result()
+                prof.merge(records, parent=[*prof.current_path(), f"window_{i:02d}"])
+                slot = in_flight[i]
+                slot["fits"][family] = {"model": model, "ic": ic, "pred_va": pred_va}
+                if len(slot["fits"]) == len(MODEL_FAMILIES):
+                    w = windows[i]
+                    with prof.stage(f"window_{i:02d}", window=i), prof.stage("finish", window=i):
+                        wf_results.append(_finish_window(
+                            i, w, keys[i], slot["cache_dir"], slot["fits"],
+                            panel.index(panel.span(w["val_start"], w["val_end"])),
+                        ))
+                    del in_flight[i]
+
+    return sorted(wf_results, key=lambda r: r["step"])
+
+
+OOS_TABLE = "oos_predictions"
+
+
+def save_oos_predictions(wf_results: list[dict]) -> pd.DataFrame | None:
+    """현재 윈도우들의 OOS 예측 파일 → storage 테이블 1개 (window = WF step)"""
+    parts = []
+    for r in wf_results:
+        path = _oos_path(r.get("key", ""))
+        if not path.exists():
+            logger.warning(f"  [step {r['step']}] OOS 예측 없음 (구버전 체크포인트) → 제외")
+            continue
+        part = pd.read_parquet(path)
+        part["window"] = np.int16(r["step"])
+        parts.append(part)
+    if not parts:
+        return None
+
+    oos = pd.concat(parts, ignore_index=True)[["date", "ticker", "model", "window", "score"]]
+    get_storage().save(oos, OOS_TABLE)
+    logger.info(f"OOS 예측 저장: {OOS_TABLE} ({len(parts)}개 윈도우, {len(oos):,}행)")
+    return oos
 
 
 # ─── 6. 최종 모델 학습 (전체 데이터) ─────────────────────────
 
-def train_final_model(df: pd.DataFrame, features: list[str], wf_results: list[dict]):
+FINAL_DEFAULT_ROUNDS  = 300    # WF 기록이 없을 때(구버전 체크포인트)의 부스팅 라운드
+FINAL_LEARNING_RATE   = 0.05   # 최종 모델 학습률
+
+
+def final_rounds(wf_results: list[dict]) -> dict[str, int]:
+    """윈도우별 조기 종료 라운드의 중앙값 → 최종 모델 n_estimators.
+    trial 학습률(0.01~0.1)이 윈도우마다 달라 라운드 × (trial 학습률 / FINAL_LEARNING_RATE)로
+    최종 학습률 기준 라운드로 환산한 뒤 중앙값 (학습률 기록이 없는 구버전 체크포인트는 환산 없음)."""
+    rounds = {}
+    for family in ("xgboost", "lightgbm"):
+        its = [r["best_iterations"][family]
+               * r.get("learning_rates", {}).get(family, FINAL_LEARNING_RATE) / FINAL_LEARNING_RATE
+               for r in wf_results if "best_iterations" in r]
+        rounds[family] = max(1, int(round(np.median(its)))) if its else FINAL_DEFAULT_ROUNDS
+    logger.info(f"최종 부스팅 라운드 (WF 조기 종료 중앙값, 학습률 {FINAL_LEARNING_RATE} 환산): {rounds}")
+    return rounds
+
+
+def final_ridge_alpha(wf_results: list[dict]) -> float:
+    """윈도우별 최적 alpha의 (로그) 중앙값 → 최종 Ridge alpha"""
+    alphas = [r["ridge_alpha"] for r in wf_results if "ridge_alpha" in r]
+    return float(np.exp(np.median(np.log(alphas)))) if alphas else 1.0
+
+
+def train_final_model(panel: DatePanel, wf_results: list[dict], backend: dict = DEFAULT_BACKEND,
+                      prof: RunProfiler | None = None):
     import xgboost as xgb
     import lightgbm as lgb
+    prof = prof or RunProfiler()
 
     # WF 전체에서 가장 자주 선정된 앙상블 조합
     combo_count: dict[tuple, int] = {}
@@ -289,54 +908,65 @@ def train_final_model(df: pd.DataFrame, features: list[str], wf_results: list[di
     best_combo = max(combo_count, key=combo_count.get)
     logger.info(f"최종 앙상블: {list(best_combo)} ({combo_count[best_combo]}/{len(wf_results)}회)")
 
-    clean   = df.dropna(subset=features + ["target_next"])
-    X       = clean[features].values
-    y       = clean["target_next"].values
+    _, n_jobs = cpu_plan(1)      # 최종 fit은 단독 실행 → 전체 CPU 예산 사용
+    n_rounds  = final_rounds(wf_results)
+    X, y    = panel.X, panel.y
     scaler  = RobustScaler()
-    X_sc    = scaler.fit_transform(X)
+    with prof.stage("scale"):
+        X_sc = scaler.fit_transform(X)
 
     trained: dict = {}
     if "xgboost" in best_combo:
-        m = xgb.XGBRegressor(n_estimators=300, max_depth=4, min_child_weight=100,
-                              learning_rate=0.05, random_state=42, n_jobs=-1, verbosity=0)
-        m.fit(X_sc, y)
+        m = xgb.XGBRegressor(n_estimators=n_rounds["xgboost"], max_depth=4, min_child_weight=100,
+                              learning_rate=FINAL_LEARNING_RATE, random_state=42, n_jobs=n_jobs, verbosity=0,
+                              tree_method=backend["tree_method"], max_bin=backend["xgb_max_bin"])
+        with prof.stage("fit_xgboost", n_estimators=n_rounds["xgboost"]):
+            m.fit(X_sc, y)
         trained["xgboost"] = m
 
     if "lightgbm" in best_combo:
-        m = lgb.LGBMRegressor(n_estimators=300, max_depth=4, min_child_samples=100,
-                               learning_rate=0.05, random_state=42, n_jobs=-1, verbose=-1)
-        m.fit(X_sc, y)
+        m = lgb.LGBMRegressor(n_estimators=n_rounds["lightgbm"], max_depth=4, min_child_samples=100,
+                               learning_rate=FINAL_LEARNING_RATE, random_state=42, n_jobs=n_jobs, verbose=-1,
+                               max_bin=backend["lgb_max_bin"], **_lgb_backend_params(backend))
+        with prof.stage("fit_lightgbm", n_estimators=n_rounds["lightgbm"]):
+            m.fit(X_sc, y)
         trained["lightgbm"] = m
 
-    if "ridge" in best_combo:
-        m = Ridge(alpha=1.0)
-        m.fit(X_sc, y)
-        trained["ridge"] = m
+    # Ridge 통계는 번들에도 저장 → 하루치 통계를 더해 재적합하는 일일 갱신 가능
+    with prof.stage("fit_ridge"):
+        moments = RidgeMoments.from_arrays(X, y)
+        if "ridge" in best_combo:
+            trained["ridge"] = moments.fit(final_ridge_alpha(wf_results),
+                                           scaler.center_, scaler.scale_)
 
-    return trained, scaler, list(best_combo)
+    return trained, scaler, list(best_combo), moments
 
 
 # ─── 7. 모델 저장 ─────────────────────────────────────────────
 
 def save_models(trained: dict, scaler, features: list[str],
-                best_combo: list[str], wf_results: list[dict]):
+                best_combo: list[str], wf_results: list[dict],
+                normalization: dict | None = None, backend: dict | None = None,
+                mode: str = "full", ridge_moments: RidgeMoments | None = None,
+                universe: list[str] | None = None):
     now_str     = datetime.now().strftime("v1_%Y%m%d_%H%M")
     version_dir = MODELS_DIR / now_str
     version_dir.mkdir(parents=True, exist_ok=True)
 
-    for name, model in trained.items():
-        with open(version_dir / f"{name}.pkl", "wb") as f:
-            pickle.dump(model, f)
-
-    with open(version_dir / "scaler.pkl", "wb") as f:
-        pickle.dump(scaler, f)
+    # 네이티브 번들: 부스터 .ubj/.txt + Ridge/스케일러 배열 + manifest.json
+    from services.model_bundle import save_bundle
+    save_bundle(str(version_dir), trained, scaler, features, best_combo, ridge_moments)
 
     avg_ic = float(np.mean([r["ensemble_ic"] for r in wf_results]))
     meta = {
         "version":          now_str,
         "features":         features,
+        "normalization":    normalization,
+        "universe":         universe,          # 빌드 유니버스 — 라이브 팩터 계산 종목 집합
         "ensemble":         best_combo,
-        "split_strategy":   "TimeSeriesSplit(max_train_size=756, test_size=126, gap=0)",
+        "training_backend": backend,
+        "split_strategy":   ("TimeSeriesSplit(max_train_size=756, test_size=126, gap=0)"
+                             if mode == "full" else "AnchoredGrid(train=756, val=126, step=126, gap=0)"),
         "wf_steps":         len(wf_results),
         "avg_ensemble_ic":  avg_ic,
         "trained_at":       datetime.now().isoformat(),
@@ -367,18 +997,42 @@ def save_models(trained: dict, scaler, features: list[str],
 # ─── 8. 메인 ─────────────────────────────────────────────────
 
 def main():
-    df, features = load_features()
-
-    wf_results = run_walk_forward(df, features)
+    from config import TRAIN_MODE, TRAIN_PROFILE_FOLDED
+    prof = RunProfiler()
+    with prof.stage("load"):
+        df, features, normalization, universe = load_features()
+
+    # 패널 배열 구성 후 원본 DataFrame 해제 (피크 메모리 절감)
+    with prof.stage("panel"):
+        dates = df.index.get_level_values("date").unique()
+        panel = build_panel(df, features)
+        del df
+
+    with prof.stage("calibrate"):
+        backend = (TRAIN_MODE == "incremental" and pinned_backend()) or calibrate_backend(panel)
+    with prof.stage("walk_forward"):
+        wf_results = run_walk_forward(panel, dates, backend, TRAIN_MODE, prof)
     if not wf_results:
         logger.error("WF 결과 없음")
         return
 
+    with prof.stage("save_oos"):
+        save_oos_predictions(wf_results)
+
     avg_ic = np.mean([r["ensemble_ic"] for r in wf_results])
     logger.info(f"\n=== Walk-Forward 완료: {len(wf_results)}스텝, 평균 IC {avg_ic:.4f} ===")
 
-    trained, scaler, best_combo = train_final_model(df, features, wf_results)
-    version_dir = save_models(trained, scaler, features, best_combo, wf_results)
+    with prof.stage("final"):
+        trained, scaler, best_combo, moments = train_final_model(panel, wf_results, backend, prof)
+    with prof.stage("save"):
+        version_dir = save_models(trained, scaler, features, best_combo, wf_results,
+                                  normalization, backend, TRAIN_MODE, moments, universe)
+
+    report = prof.write(version_dir, folded=bool(TRAIN_PROFILE_FOLDED), version=version_dir.name)
+    for row in prof.summary()[:8]:
+        logger.info(f"  {row['stage']:<16} wall {row['wall_s']:>9.1f}s  cpu {row['cpu_s']:>9.1f}s  "
+                    f"peak {row['peak_rss_mb']:>8.0f}MB  ×{row['count']}")
+    logger.info(f"실행 보고서: {report}")
 
     print(f"\n{'='*55}")
     print(f"✅ P4 ML 학습 완료")
@@ -0,0 +1,343 @@
+"""
+BacktestEngine — 행렬 기반 월별 리밸런싱 백테스트 커널
+
+run_single_backtest의 일별 파이썬 루프를 배열 연산으로 대체:
+  1. prepare_inputs : 파라미터와 무관한 입력을 한 번만 계산
+                      (일별 수익률 행렬, 레짐 배수, 리밸런싱일 점수/순위, 손절 마스크, 변동성 역수)
+  2. simulate       : (ml_weight, top_n, rule_weight, cost) 하나에 대한 일별 포트폴리오 수익률
+       - 리밸런싱일 (K × N) 점수 행렬에서 argpartition 기반 top-N 마스크를 한 번에 산출
+       - 변동성 역가중 + 레짐 배수 브로드캐스트 → 리밸런싱 비중 행렬
+       - 리밸런싱 사이 구간은 비중을 그대로 유지 → 구간별 행렬곱으로 일별 수익률
+       - 회전율 비용은 리밸런싱 비중 차분의 절댓값 합
+  3. simulate_family: 같은 혼합 점수를 쓰는 전략군(top_n × cost)을 (전략 × 날짜 × 종목) 텐서로 일괄 평가
+       - 리밸런싱일마다 정렬 1회 → 모든 top_n 컷오프를 순위 비교로 동시에 산출
+       - 비용 수준은 회전율에만 곱해지므로 총수익률 위에 브로드캐스트
+
+기존 루프와 같은 규칙:
+  - 리밸런싱일 비중은 그날 수익률부터 적용, 첫날 수익률은 0
+  - 유효 점수가 top_n 미만인 리밸런싱일은 직전 비중 유지 (비용 0)
+  - 손절: 22거래일 수익률 < STOP_LOSS_1M 종목 제외, 남는 종목이 3개 미만이면 손절 무시
+  - 동점은 종목 열 순서가 앞선 쪽 우선 (Series.nlargest keep="first"와 동일)
+"""
+
+from __future__ import annotations
+import os
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+# ─── 거래비용 설정 (PRD) ────────────────────────────────────
+SLIPPAGE    = 0.001   # 슬리피지 0.1%
+COMMISSION  = 0.0005  # 수수료 0.05%
+
+# ─── 레짐 필터 임계값 (mdd-improvement v2 — 균형 조정) ──────────
+# VIX > 20이 28% 빈도 → 과포지션 축소 문제 → VIX 기준 25 복원
+# SPY 200MA는 추가 조건으로 온건하게 적용 (×0.80)
+VIX_BEAR_THRESHOLD    = 25.0   # VIX > 25: bear 공포 구간 (기존 유지)
+VIX_EXTREME_THRESHOLD = 32.0   # VIX > 32: 극단적 공포 (추가 축소)
+T10Y2Y_THRESHOLD      = 0.0    # 장단기금리차 < 0: 추가 축소
+STOP_LOSS_1M          = -0.10  # 개별 손절: 1개월 수익률 < -10%
+SPY_MA_WINDOW         = 200    # SPY 200일 이평 윈도우
+
+STOP_LOOKBACK  = 22     # 손절 판단 수익률 기간 (거래일)
+MIN_AFTER_STOP = 3      # 손절 후 최소 후보 수 (미만이면 손절 무시)
+DEFAULT_VOL    = 0.2    # vol_20 결측 시 가정 변동성
+DEFAULT_COST   = SLIPPAGE + COMMISSION
+
+
+# ─── 레짐 필터 ────────────────────────────────────────────────
+
+def get_regime_multiplier(
+    macro: pd.DataFrame,
+    dates: pd.DatetimeIndex,
+    close: pd.DataFrame | None = None,
+) -> pd.Series:
+    """날짜별 포지션 크기 배수 (3단계 레짐 — mdd-improvement)
+
+    1단계: VIX > 20 or SPY < 200MA → 1/3 축소 (0.333)
+    2단계: T10Y2Y < 0               → 추가 25% 축소 (*0.75)
+    3단계: VIX > 25                 → 현금 30% 확보 (*0.70)
+    """
+    macro_aligned = macro.reindex(dates, method="ffill")
+    mult = pd.Series(1.0, index=dates)
+
+    vix    = macro_aligned["VIXCLS"]    if "VIXCLS" in macro_aligned.columns else None
+    t10y2y = macro_aligned["T10Y2Y"]   if "T10Y2Y" in macro_aligned.columns else None
+
+    # SPY 200일 이평 조건
+    spy_below_ma200 = pd.Series(False, index=dates)
+    if close is not None and "SPY" in close.columns:
+        spy = close["SPY"].reindex(dates, method="ffill")
+        ma200 = spy.rolling(SPY_MA_WINDOW, min_periods=100).mean()
+        spy_below_ma200 = spy < ma200
+
+    # 1단계: SPY < 200MA → 20% 축소 (온건한 추가 방어)
+    mult[spy_below_ma200] *= 0.80
+
+    # 2단계: VIX > 25 → 50% 축소 (공포 구간 기존 수준 유지)
+    if vix is not None:
+        mult[vix > VIX_BEAR_THRESHOLD] *= 0.50
+
+    # 3단계: T10Y2Y < 0 → 추가 15% 축소 (완화: 기존 25% → 15%)
+    if t10y2y is not None:
+        mult[t10y2y < T10Y2Y_THRESHOLD] *= 0.85
+
+    # 4단계: VIX > 32 → 극단적 공포, 추가 30% 축소 (코로나 같은 구간)
+    if vix is not None:
+        mult[vix > VIX_EXTREME_THRESHOLD] *= 0.70
+
+    return mult.clip(upper=1.0)
+
+
+# ─── 1. 파라미터 무관 입력 ────────────────────────────────────
+
+@dataclass
+class BacktestInputs:
+    dates:     pd.DatetimeIndex   # (D,) 백테스트 거래일
+    tickers:   pd.Index           # (N,)
+    returns:   np.ndarray         # (D, N) 일별 수익률 (첫날·결측 0)
+    regime:    np.ndarray         # (D,)   레짐 배수
+    rebal_idx: np.ndarray         # (K,)   리밸런싱일 위치 (월 첫 거래일)
+    ml:        np.ndarray         # (K, N) 리밸런싱일 ML 점수 원값
+    ml_rank:   np.ndarray         # (K, N) ML 점수 단면 백분위
+    rule_rank: np.ndarray | None  # (K, N) 룰 점수 단면 백분위
+    stop_ok:   np.ndarray         # (K, N) 손절 통과 (True = 후보 유지)
+    inv_vol:   np.ndarray         # (K, N) 1 / vol_20
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return len(self.dates), len(self.rebal_idx), len(self.tickers)
+
+    def save(self, cache_dir: str) -> None:
+        """필드별 .npy 기록 — 스윕 워커가 memmap으로 공유 (복사·pickle 없음)"""
+        os.makedirs(cache_dir, exist_ok=True)
+        for f in fields(self):
+            arr = getattr(self, f.name)
+            if arr is None:
+                continue
+            if f.name == "tickers":
+                arr = np.asarray(arr, dtype=str)
+            np.save(os.path.join(cache_dir, f"{f.name}.npy"), np.ascontiguousarray(arr))
+
+    def fingerprint(self) -> str:
+        """입력 내용 해시 (16hex) — 가격·매크로·신호 중 무엇이 바뀌어도 달라지는 데이터 버전"""
+        import hashlib
+        h = hashlib.blake2b(digest_size=8)
+        for f in fields(self):
+            arr = getattr(self, f.name)
+            if arr is None:
+                h.update(f"{f.name}:none".encode())
+                continue
+            if f.name == "tickers":
+                arr = np.asarray(arr, dtype=str)
+            arr = np.ascontiguousarray(arr.asi8 if f.name == "dates" else arr)
+            h.update(f"{f.name}:{arr.dtype}:{arr.shape}".encode())
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    @classmethod
+    def load(cls, cache_dir: str) -> "BacktestInputs":
+        """save()로 기록한 입력을 읽기 전용 memmap으로 연결"""
+        def _get(name):
+            path = os.path.join(cache_dir, f"{name}.npy")
+            return np.load(path, mmap_mode="r") if os.path.exists(path) else None
+        arrays = {f.name: _get(f.name) for f in fields(cls)}
+        arrays["dates"]   = pd.DatetimeIndex(arrays["dates"])
+        arrays["tickers"] = pd.Index(arrays["tickers"])
+        return cls(**arrays)
+
+
+def rebalance_positions(dates: pd.DatetimeIndex) -> np.ndarray:
+    """월 첫 거래일(및 첫날) 위치"""
+    months = pd.PeriodIndex(dates, freq="M")
+    return np.flatnonzero(np.concatenate([[True], months[1:] != months[:-1]]))
+
+
+def prepare_inputs(
+    scores: pd.DataFrame,
+    close: pd.DataFrame,
+    factors: pd.DataFrame,
+    macro: pd.DataFrame,
+    rule_scores: pd.DataFrame | None = None,
+    start: str = "2017-01-01",
+) -> BacktestInputs:
+    """(date × ticker) 점수 + 가격/팩터/매크로 → BacktestInputs (파라미터 스윕 간 공유)"""
+    dates   = scores.index[scores.index >= start]
+    tickers = scores.columns
+    rebal   = rebalance_positions(dates)
+    rdates  = dates[rebal]
+
+    cc = close.reindex(columns=tickers).reindex(dates).ffill().to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.zeros_like(cc)
+        returns[1:] = cc[1:] / cc[:-1] - 1
+        # 손절: 22거래일 전 대비 수익률 (그 이전 리밸런싱일은 손절 없음)
+        stop_ok = np.ones((len(rebal), len(tickers)), dtype=bool)
+        has_lb  = rebal >= STOP_LOOKBACK
+        ret_1m  = cc[rebal[has_lb]] / cc[rebal[has_lb] - STOP_LOOKBACK] - 1
+    returns = np.where(np.isnan(returns), 0.0, returns)
+    stop_ok[has_lb] = np.where(np.isnan(ret_1m), 0.0, ret_1m) >= STOP_LOSS_1M
+
+    regime = get_regime_multiplier(macro, dates, close=close).to_numpy(dtype=np.float64)
+
+    ml = scores.reindex(rdates)
+    rule_rank = None
+    if rule_scores is not None:
+        rule_rank = (rule_scores.reindex(index=rdates, columns=tickers)
+                                .rank(axis=1, pct=True).to_numpy(dtype=np.float64))
+
+    if "vol_20" in factors.columns:
+        on_rebal = factors.index.get_level_values("date").isin(rdates)
+        vol = (factors.loc[on_rebal, "vol_20"].unstack(level="ticker")
+                      .reindex(index=rdates, columns=tickers))
+        vol = vol.fillna(DEFAULT_VOL).clip(lower=1e-4).to_numpy(dtype=np.float64)
+    else:
+        vol = np.full((len(rebal), len(tickers)), DEFAULT_VOL)
+
+    return BacktestInputs(
+        dates=dates, tickers=tickers, returns=returns, regime=regime, rebal_idx=rebal,
+        ml=ml.to_numpy(dtype=np.float64),
+        ml_rank=ml.rank(axis=1, pct=True).to_numpy(dtype=np.float64),
+        rule_rank=rule_rank, stop_ok=stop_ok, inv_vol=1.0 / vol,
+    )
+
+
+# ─── 2. 커널 ──────────────────────────────────────────────────
+
+def mix_key(inp: BacktestInputs, ml_weight: float, rule_weight: float = 0.0):
+    """혼합 점수 식별자 — 같은 키면 순위 혼합이 같다 (ml:rule 비율). ML 원점수 모드는 None."""
+    total_w = ml_weight + (rule_weight if inp.rule_rank is not None else 0.0)
+    if inp.rule_rank is not None and rule_weight > 0.0 and total_w > 0:
+        return round(ml_weight / total_w, 12)
+    return None
+
+
+def mix_scores(inp: BacktestInputs, ml_weight: float, rule_weight: float = 0.0) -> np.ndarray:
+    """리밸런싱일 혼합 점수 (K × N): 퍼센타일 순위 가중합, 룰 가중 0이면 ML 원점수.
+    가중치는 비율(mix_key)로 정규화 — 비율이 같은 조합은 비트 단위로 같은 점수(같은 동점 처리)."""
+    r = mix_key(inp, ml_weight, rule_weight)
+    if r is None:
+        return inp.ml
+    return r * inp.ml_rank + (1.0 - r) * inp.rule_rank
+
+
+def top_n_mask(S: np.ndarray, cand: np.ndarray, top_n: int) -> np.ndarray:
+    """행별 후보(cand) 중 점수 상위 top_n 마스크. 경계 동점은 앞선 열 우선.
+    후보가 top_n 미만이면 후보 전체."""
+    N = S.shape[1]
+    top_n = min(top_n, N)
+    Sm  = np.where(cand, S, -np.inf)
+    kth = np.partition(Sm, N - top_n, axis=1)[:, N - top_n][:, None]    # top_n번째 큰 값
+    gt  = Sm > kth
+    eq  = (Sm == kth) & cand
+    need = top_n - gt.sum(axis=1, keepdims=True)
+    return gt | (eq & (np.cumsum(eq, axis=1) <= need))
+
+
+def _candidates(S: np.ndarray, inp: BacktestInputs) -> tuple[np.ndarray, np.ndarray]:
+    """(유효 점수 마스크, 손절 반영 후보 마스크) — 손절 후 후보가 너무 적으면 손절 무시"""
+    valid = ~np.isnan(S)
+    cand  = valid & inp.stop_ok
+    few   = cand.sum(axis=1) < MIN_AFTER_STOP
+    cand[few] = valid[few]
+    return valid, cand
+
+
+def _finalize_weights(sel: np.ndarray, enough: np.ndarray, inp: BacktestInputs) -> np.ndarray:
+    """선택 마스크 (..., K, N) → 변동성 역가중 × 레짐, 유효 점수 부족한 날은 직전 비중 유지"""
+    w = np.where(sel, inp.inv_vol, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w /= w.sum(axis=-1, keepdims=True)
+    w *= inp.regime[inp.rebal_idx][:, None]
+
+    # 직전 유효 리밸런싱 비중으로 채우기 (최초 이전은 0)
+    K = w.shape[-2]
+    padded = np.concatenate([np.zeros_like(w[..., :1, :]), w], axis=-2)
+    src    = np.maximum.accumulate(np.where(enough, np.arange(1, K + 1), 0), axis=-1)
+    return np.take_along_axis(padded, src[..., None], axis=-2)
+
+
+def rebalance_weights(S: np.ndarray, inp: BacktestInputs, top_n: int) -> np.ndarray:
+    """리밸런싱일 비중 행렬 (K × N) — 유효 점수 부족한 날은 직전 비중 유지"""
+    valid, cand = _candidates(S, inp)
+    enough = valid.sum(axis=1) >= top_n
+    return _finalize_weights(top_n_mask(S, cand, top_n), enough, inp)
+
+
+def rebalance_weights_multi(S: np.ndarray, inp: BacktestInputs, top_ns) -> np.ndarray:
+    """여러 top_n의 리밸런싱 비중 텐서 (T × K × N) — 날짜별 안정 정렬 1회로 모든 컷오프 산출.
+    동점 처리(앞선 열 우선)는 top_n_mask와 같다."""
+    valid, cand = _candidates(S, inp)
+    Sm    = np.where(cand, S, -np.inf)
+    order = np.argsort(-Sm, axis=1, kind="stable")
+    pos   = np.empty_like(order)
+    np.put_along_axis(pos, order, np.arange(S.shape[1])[None, :].repeat(len(S), 0), axis=1)
+
+    top_ns = np.asarray(top_ns)
+    sel    = (pos[None] < top_ns[:, None, None]) & cand[None]           # (T, K, N)
+    enough = valid.sum(axis=1)[None] >= top_ns[:, None]                  # (T, K)
+    return _finalize_weights(sel, enough, inp)
+
+
+def portfolio_returns(inp: BacktestInputs, W: np.ndarray, cost: float = DEFAULT_COST) -> np.ndarray:
+    """리밸런싱 비중 (K × N) → 일별 포트폴리오 수익률 (D,) (회전율 × cost 차감)"""
+    D = len(inp.dates)
+    turnover = np.abs(np.diff(W, axis=0, prepend=0.0)).sum(axis=1)
+
+    port = np.empty(D)
+    bounds = np.append(inp.rebal_idx, D)
+    for k in range(len(inp.rebal_idx)):
+        a, b = bounds[k], bounds[k + 1]
+        port[a:b] = inp.returns[a:b] @ W[k]
+    port[inp.rebal_idx] -= turnover * cost
+    port[0] = 0.0
+    return port
+
+
+def portfolio_returns_multi(inp: BacktestInputs, W: np.ndarray, costs,
+                            with_turnover: bool = False):
+    """비중 텐서 (T × K × N) × 비용 수준 (C,) → 일별 수익률 (T × C × D)
+    with_turnover=True면 (수익률, 리밸런싱 회전율 (T × K))"""
+    T, D  = len(W), len(inp.dates)
+    costs = np.asarray(costs, dtype=np.float64)
+    turnover = np.abs(np.diff(W, axis=1, prepend=0.0)).sum(axis=2)       # (T, K)
+
+    gross  = np.empty((T, D))
+    bounds = np.append(inp.rebal_idx, D)
+    for k in range(len(inp.rebal_idx)):
+        a, b = bounds[k], bounds[k + 1]
+        gross[:, a:b] = (inp.returns[a:b] @ W[:, k, :].T).T
+
+    port = np.repeat(gross[:, None, :], len(costs), axis=1)
+    port[:, :, inp.rebal_idx] -= turnover[:, None, :] * costs[None, :, None]
+    port[:, :, 0] = 0.0
+    return (port, turnover) if with_turnover else port
+
+
+def simulate_family(inp: BacktestInputs, ml_weight: float, rule_weight: float,
+                    top_ns, costs=(DEFAULT_COST,), with_turnover: bool = False):
+    """혼합 점수 1개를 공유하는 전략군 → 일별 수익률 (T × C × D)
+    with_turnover=True면 (수익률, 리밸런싱 회전율 (T × K))"""
+    S = mix_scores(inp, ml_weight, rule_weight)
+    return portfolio_returns_multi(inp, rebalance_weights_multi(S, inp, top_ns), costs, with_turnover)
+
+
+def simulate_array(inp: BacktestInputs, ml_weight: float, top_n: int,
+                   rule_weight: float = 0.0, cost: float = DEFAULT_COST) -> np.ndarray:
+    """파라미터 조합 1개 → 일별 포트폴리오 수익률 배열 (D,)"""
+    W = rebalance_weights(mix_scores(inp, ml_weight, rule_weight), inp, top_n)
+    return portfolio_returns(inp, W, cost)
+
+
+def simulate(inp: BacktestInputs, ml_weight: float, top_n: int,
+             rule_weight: float = 0.0, cost: float = DEFAULT_COST) -> pd.Series:
+    """파라미터 조합 1개 → 일별 포트폴리오 수익률 Series"""
+    return pd.Series(simulate_array(inp, ml_weight, top_n, rule_weight, cost),
+                     index=inp.dates, name="return")
+
+
+def summary_metrics(ret: np.ndarray, dates=None) -> dict:
+    """일별 수익률 배열 1개 → 요약 지표 dict (services.metrics.compute_metrics, 소수 4자리)"""
+    from services.metrics import compute_metrics, records
+    return records(compute_metrics(ret, dates=dates))[0]
@@ -0,0 +1,340 @@
+"""
+BacktestJobs — API 프로세스 상주 비동기 백테스트 작업 큐
+
+  jobs = get_job_manager()
+  job, dup = jobs.submit(param_grid(ml_weights=[...], top_ns=[...], costs=[...]))
+  jobs.get(job.id).view(since=0)      # 상태 + 진행률 + 완료된 부분 결과
+  jobs.cancel(job.id)
+
+  - 요청 스레드는 작업 등록만 하고 즉시 반환 → 실행은 디스패처 스레드(BACKTEST_JOB_CONCURRENCY개)
+  - 계산은 상주 프로세스 풀 (spawn — API 프로세스의 스케줄러 스레드를 fork하지 않음)
+      입력 준비(데이터 로드 + 신호 + prepare_inputs)도 워커에서 실행해 .npy로 기록,
+      워커는 backtest_sweep.run_family로 memmap 연결 (입력 디렉터리가 바뀔 때만 재연결)
+  - 입력은 원천 파일(팩터/가격/매크로/OOS, latest 모델) 수정 시각이 바뀌었을 때만 다시 준비
+  - 결과 캐시(BacktestStore) 적중분은 즉시 부분 결과로, 나머지는 전략군(혼합 점수) 단위로
+    완료되는 대로 추가 → 폴링(view(since)) / 스트리밍 응답이 진행 중 결과를 읽음
+  - 같은 그리드가 대기·실행 중이면 새 작업 대신 기존 작업 반환 (중복 제거)
+  - 취소: 대기 중인 전략군 future 취소, 이미 계산된 결과는 저장소에 남김
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ("queued", "preparing", "running")
+FINAL_STATES  = ("done", "failed", "cancelled")
+MAX_JOBS_KEPT = 100      # 메모리에 남기는 최근 작업 수
+FLUSH_ROWS    = 200      # 저장소 기록 단위 (결과 테이블 재기록 횟수 제한)
+
+INPUT_TABLES  = ("factors", "ohlcv", "macro", "oos_predictions")
+
+
+def grid_hash(grid: list[dict]) -> str:
+    """그리드 식별자 — 순서·표기와 무관 (중복 작업 판정용)"""
+    from services.backtest_store import canonical_params
+    canon = sorted(json.dumps(canonical_params(p), sort_keys=True) for p in grid)
+    return hashlib.blake2b("\n".join(canon).encode(), digest_size=8).hexdigest()
+
+
+def _prepare_inputs(cache_dir: str) -> tuple[str, str]:
+    """(워커 프로세스) 백테스트 입력 준비 → cache_dir 기록. Returns: (모델 버전, 데이터 버전)"""
+    from scripts.run_backtest import build_inputs
+    inp, version = build_inputs()
+    inp.save(cache_dir)
+    return version, inp.fingerprint()
+
+
+@dataclass
+class InputContext:
+    cache_dir:     str
+    model_version: str
+    data_version:  str
+    stamp:         tuple
+    inputs:        object          # BacktestInputs (memmap)
+
+
+@dataclass
+class BacktestJob:
+    id:         str
+    grid:       list[dict]
+    grid_hash:  str
+    status:     str = "queued"
+    cached:     int = 0
+    error:      str | None = None
+    model_version: str | None = None
+    data_version:  str | None = None
+    created_at:  str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    finished_at: str | None = None
+    results:    list[dict] = field(default_factory=list)     # 완료 순, 각 결과의 "index" = grid 위치
+    _cancel:    threading.Event = field(default_factory=threading.Event, repr=False)
+    _futures:   list = field(default_factory=list, repr=False)
+    _lock:      threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def total(self) -> int:
+        return len(self.grid)
+
+    def add(self, items: list[dict]) -> None:
+        with self._lock:
+            self.results.extend(items)
+
+    def finish(self, status: str, error: str | None = None) -> None:
+        self.status, self.error = status, error
+        self.finished_at = datetime.now().isoformat(timespec="seconds")
+
+    def view(self, since: int = 0) -> dict:
+        """상태 + 진행률 + results[since:] (next = 다음 폴링 커서)"""
+        with self._lock:
+            done, new = len(self.results), self.results[since:]
+        return {
+            "id":            self.id,
+            "status":        self.status,
+            "total":         self.total,
+            "done":          done,
+            "cached":        self.cached,
+            "progress":      round(done / max(self.total, 1), 4),
+            "model_version": self.model_version,
+            "data_version":  self.data_version,
+            "created_at":    self.created_at,
+            "finished_at":   self.finished_at,
+            "error":         self.error,
+            "results":       new,
+            "next":          since + len(new),
+        }
+
+
+class BacktestJobManager:
+
+    def __init__(self, concurrency: int | None = None, n_workers: int | None = None):
+        from concurrent.futures import ThreadPoolExecutor
+        from config import BACKTEST_JOB_CONCURRENCY
+        from services.backtest_store import BacktestStore
+        from services.backtest_sweep import _n_workers
+
+        self.store      = BacktestStore()
+        self.n_workers  = n_workers or _n_workers(os.cpu_count() or 1)
+        self._jobs:     OrderedDict[str, BacktestJob] = OrderedDict()
+        self._inflight: dict[str, str] = {}                  # grid_hash → job id
+        self._lock      = threading.Lock()
+        self._ctx:      InputContext | None = None
+        self._ctx_lock  = threading.Lock()
+        self._stale:    list[str] = []                       # 교체된 입력 디렉터리 (작업 종료 후 삭제)
+        self._active    = 0
+        self._pool      = None
+        self._dispatch  = ThreadPoolExecutor(max_workers=concurrency or BACKTEST_JOB_CONCURRENCY,
+                                             thread_name_prefix="backtest-job")
+
+    # ── 작업 등록 / 조회 ───────────────────────────────────────
+
+    def submit(self, grid: list[dict]) -> tuple[BacktestJob, bool]:
+        """작업 등록 → (작업, 중복 여부). 같은 그리드가 진행 중이면 기존 작업 반환."""
+        h = grid_hash(grid)
+        with self._lock:
+            running = self._jobs.get(self._inflight.get(h, ""))
+            if running is not None and running.status in ACTIVE_STATES:
+                return running, True
+            job = BacktestJob(id=uuid.uuid4().hex[:12], grid=list(grid), grid_hash=h)
+            self._jobs[job.id] = job
+            self._inflight[h]  = job.id
+            self._evict()
+        self._dispatch.submit(self._run, job)
+        logger.info(f"백테스트 작업 등록: {job.id} ({job.total}개 조합)")
+        return job, False
+
+    def get(self, job_id: str) -> BacktestJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [{k: v for k, v in j.view(j.total).items() if k not in ("results", "next")}
+                for j in reversed(jobs)]
+
+    def cancel(self, job_id: str) -> BacktestJob | None:
+        job = self.get(job_id)
+        if job is None or job.status in FINAL_STATES:
+            return job
+        job._cancel.set()
+        for fut in job._futures:
+            fut.cancel()
+        if job.status == "queued":
+            job.finish("cancelled")
+        logger.info(f"백테스트 작업 취소 요청: {job_id}")
+        return job
+
+    def _evict(self) -> None:
+        """오래된 종료 작업부터 정리 (MAX_JOBS_KEPT 초과분)"""
+        for jid in list(self._jobs):
+            if len(self._jobs) <= MAX_JOBS_KEPT:
+                break
+            if self._jobs[jid].status in FINAL_STATES:
+                del self._jobs[jid]
+
+    # ── 입력 / 프로세스 풀 ─────────────────────────────────────
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(max_workers=self.n_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    @staticmethod
+    def _input_stamp() -> tuple:
+        """원천 데이터·모델 수정 시각 — 바뀌면 입력 재준비"""
+        from config import BASE_DIR, DATA_PROCESSED
+        paths = [os.path.join(DATA_PROCESSED, f"{t}.parquet") for t in INPUT_TABLES]
+        paths.append(os.path.join(BASE_DIR, "models", "trained", "latest", "meta.json"))
+        return tuple((os.path.realpath(p), os.path.getmtime(p)) if os.path.exists(p) else (p, None)
+                     for p in paths)
+
+    def _context(self) -> InputContext:
+        from config import DATA_CHECKPOINTS
+        from services.backtest_engine import BacktestInputs
+
+        stamp = self._input_stamp()
+        with self._ctx_lock:
+            if self._ctx is not None and self._ctx.stamp == stamp:
+                return self._ctx
+            os.makedirs(DATA_CHECKPOINTS, exist_ok=True)
+            cache_dir = tempfile.mkdtemp(prefix="bt_inputs_", dir=DATA_CHECKPOINTS)
+            try:
+                version, data_version = self._executor().submit(_prepare_inputs, cache_dir).result()
+            except Exception:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                raise
+            if self._ctx is not None:
+                self._stale.append(self._ctx.cache_dir)
+            self._ctx = InputContext(cache_dir, version, data_version, stamp,
+                                     BacktestInputs.load(cache_dir))
+            logger.info(f"백테스트 입력 준비: {version} / {data_version}")
+            return self._ctx
+
+    def _cleanup_stale(self) -> None:
+        with self._lock:
+            if self._active:
+                return
+            stale, self._stale = self._stale, []
+        for d in stale:
+            shutil.rmtree(d, ignore_errors=True)
+
+    # ── 실행 ─────────────────────────────────────────────────
+
+    def _run(self, job: BacktestJob) -> None:
+        if job._cancel.is_set():
+            return
+        with self._lock:
+            self._active += 1
+        try:
+            self._execute(job)
+        except Exception as e:
+            logger.exception(f"백테스트 작업 실패: {job.id}")
+            job.finish("failed", str(e))
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._cleanup_stale()
+
+    def _execute(self, job: BacktestJob) -> None:
+        from concurrent.futures import as_completed
+        from services.backtest_store import cost_model, metrics_version, result_key, result_row
+        from services.backtest_sweep import families, run_family
+
+        job.status = "preparing"
+        ctx = self._context()
+        job.model_version, job.data_version = ctx.model_version, ctx.data_version
+
+        # 1) 캐시 적중분 즉시 반영
+        costs = cost_model()
+        mver  = metrics_version()
+        keys  = [result_key(ctx.model_version, ctx.data_version, p, costs, mver) for p in job.grid]
+        hits  = self.store.lookup(keys)
+        job.add([{"index": i, **p, **hits[k]} for i, (k, p) in enumerate(zip(keys, job.grid)) if k in hits])
+        job.cached = len(job.results)
+
+        # 2) 나머지를 전략군 단위로 프로세스 풀에 분배 (그리드 내 중복 키는 1회 계산)
+        pending: dict[str, list[int]] = {}
+        for i, k in enumerate(keys):
+            if k not in hits:
+                pending.setdefault(k, []).append(i)
+        todo_keys = list(pending)
+        todo = [job.grid[pending[k][0]] for k in todo_keys]
+        job.status = "running"
+        if job._cancel.is_set():
+            job.finish("cancelled")
+            return
+
+        pool = self._executor()
+        futs = {pool.submit(run_family, ctx.cache_dir, [todo[j] for j in idx], True): idx
+                for idx in families(ctx.inputs, todo)}
+        job._futures = list(futs)
+
+        rows, curves = [], {}
+        try:
+            for fut in as_completed(futs):
+                if job._cancel.is_set() or fut.cancelled():
+                    break
+                for j, r in zip(futs[fut], fut.result()):
+                    k   = todo_keys[j]
+                    row = result_row(k, todo[j], r, ctx.model_version, ctx.data_version, ctx.inputs.dates)
+                    rows.append(row)
+                    curves[k] = r["equity"]
+                    job.add([{"index": i, **job.grid[i], **row} for i in pending[k]])
+                if len(rows) >= FLUSH_ROWS:
+                    self.store.put(rows, ctx.inputs.dates, curves)
+                    rows, curves = [], {}
+        finally:
+            for fut in futs:
+                fut.cancel()
+            self.store.put(rows, ctx.inputs.dates, curves)     # 취소·실패 시에도 계산분은 보존
+
+        job.finish("cancelled" if job._cancel.is_set() else "done")
+        logger.info(f"백테스트 작업 {job.status}: {job.id} ({len(job.results)}/{job.total}, "
+                    f"캐시 {job.cached})")
+
+    def shutdown(self) -> None:
+        for job in list(self._jobs.values()):
+            if job.status in ACTIVE_STATES:
+                self.cancel(job.id)
+        self._dispatch.shutdown(wait=False, cancel_futures=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._ctx is not None:
+            self._stale.append(self._ctx.cache_dir)
+        for d in self._stale:
+            shutil.rmtree(d, ignore_errors=True)
+
+
+_manager: BacktestJobManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> BacktestJobManager:
+    """프로세스 단일 작업 관리자 (최초 접근 시 생성)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = BacktestJobManager()
+        return _manager
+
+
+def shutdown_job_manager() -> None:
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
@@ -0,0 +1,259 @@
+"""
+BacktestStore — 내용 주소 기반 백테스트 결과 저장소
+
+  store   = BacktestStore()
+  results = cached_sweep(inp, grid, model_version, store)     # 이미 평가한 조합은 즉시 반환
+  curves  = store.curves([r["key"] for r in results])         # 누적 수익 곡선 (EquityCurves)
+
+  - 결과 키 = hash(모델 버전, 데이터 버전, 파라미터, 비용 모델) 16hex
+      모델 버전 : 신호 출처 + 학습 버전 (예: "oos:20250101_020000")
+      데이터 버전: BacktestInputs.fingerprint() — 가격·매크로·신호 내용 해시
+      비용 모델 : 엔진의 거래비용·레짐·손절 상수 (규칙이 바뀌면 키도 바뀜)
+      지표 버전 : services.metrics 지표 정의·bootstrap 설정 (지표가 추가·변경되면 키도 바뀜)
+  - 지표는 결과 테이블 "backtest_results" (행 = 결과 키) — 기록마다 새 행만 파트로 추가(add_part),
+    같은 키가 다시 기록되면 읽을 때 마지막 행 사용. 이전 데이터 버전 정리 때만 전체 재기록(압축)
+  - 곡선은 기록 묶음별 열 저장 "backtest_curves_{데이터 버전}_{묶음}" (day int64 + 결과 키별 float32 열),
+    결과 행의 curve_batch가 묶음을 가리킴 → 긴 스윕의 주기적 기록도 새 곡선만 쓴다
+    (curve_batch가 빈 행은 예전 형식 "backtest_curves_{데이터 버전}")
+  - 캐시에 없는 조합만 run_sweep으로 계산해 추가 → 반복 스윕·UI 요청은 재계산 없음
+  - 쓰기는 호출 프로세스(스크립트 / API 메인)에서만 — 스윕 워커는 계산 결과만 반환
+  - 쓰기는 프로세스 간 잠금(storage.lock) 안에서 저장본을 다시 읽어 병합 → run_backtest CLI와
+    API 작업이 동시에 기록해도 서로의 행을 덮어쓰지 않는다
+  - 최근 BACKTEST_KEEP_DATA_VERSIONS개 데이터 버전만 보존 — 그 이전 버전의 행·곡선 테이블은 삭제
+    (더 이상 어떤 행도 가리키지 않는 곡선 묶음도 함께 삭제)
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from services.backtest_engine import BacktestInputs
+from services.equity_curve import EquityCurves, to_days
+from services.metrics import SUMMARY_KEYS
+
+logger = logging.getLogger(__name__)
+
+RESULTS_TABLE = "backtest_results"
+CURVES_TABLE  = "backtest_curves_{data_version}"
+STORE_LOCK    = "backtest_store"
+BATCH_COL     = "curve_batch"
+PARAM_KEYS    = ("ml_weight", "rule_weight", "top_n", "cost")
+METRIC_KEYS   = (*SUMMARY_KEYS, "annual_turnover")
+
+
+def cost_model() -> dict:
+    """결과에 영향을 주는 엔진 규칙 상수 (파라미터 외)"""
+    from services import backtest_engine as eng
+    return {
+        "cost_basis":      "turnover",       # 비용 = 리밸런싱 회전율 × cost
+        "slippage":        eng.SLIPPAGE,
+        "commission":      eng.COMMISSION,
+        "vix_bear":        eng.VIX_BEAR_THRESHOLD,
+        "vix_extreme":     eng.VIX_EXTREME_THRESHOLD,
+        "t10y2y":          eng.T10Y2Y_THRESHOLD,
+        "stop_loss_1m":    eng.STOP_LOSS_1M,
+        "stop_lookback":   eng.STOP_LOOKBACK,
+        "min_after_stop":  eng.MIN_AFTER_STOP,
+        "spy_ma_window":   eng.SPY_MA_WINDOW,
+        "default_vol":     eng.DEFAULT_VOL,
+    }
+
+
+def metrics_version() -> dict:
+    """저장 지표를 결정하는 설정 (지표 목록 + bootstrap 재표본 수·블록·시드)"""
+    from config import BACKTEST_BOOTSTRAP
+    from services import metrics
+    return {
+        "keys":       list(METRIC_KEYS),
+        "n_boot":     BACKTEST_BOOTSTRAP,
+        "boot_block": metrics.BOOT_BLOCK,
+        "boot_alpha": metrics.BOOT_ALPHA,
+        "boot_seed":  metrics.BOOT_SEED,
+    }
+
+
+def canonical_params(params: dict) -> dict:
+    """키 계산용 파라미터 정규화 (int/float 표기 차이 제거)"""
+    return {
+        "ml_weight":   float(params["ml_weight"]),
+        "rule_weight": float(params.get("rule_weight", 0.0)),
+        "top_n":       int(params["top_n"]),
+        "cost":        float(params["cost"]),
+    }
+
+
+def result_key(model_version: str, data_version: str, params: dict, costs: dict | None = None,
+               metrics: dict | None = None) -> str:
+    payload = json.dumps({
+        "model":   model_version,
+        "data":    data_version,
+        "params":  canonical_params(params),
+        "cost":    costs if costs is not None else cost_model(),
+        "metrics": metrics if metrics is not None else metrics_version(),
+    }, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def result_row(key: str, params: dict, metrics: dict, model_version: str, data_version: str,
+               dates: pd.DatetimeIndex, created_at: str | None = None) -> dict:
+    """결과 테이블 1행"""
+    return {
+        "key": key, "model_version": model_version, "data_version": data_version,
+        **canonical_params(params), **{m: metrics[m] for m in METRIC_KEYS},
+        "start_date": str(dates[0].date()), "end_date": str(dates[-1].date()),
+        "created_at": created_at or datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+class BacktestStore:
+
+    def __init__(self, storage=None):
+        if storage is None:
+            from services.storage import get_storage
+            storage = get_storage()
+        self.storage  = storage
+        self._lock    = threading.Lock()
+        self._results: pd.DataFrame | None = None     # 결과 테이블 (key 인덱스)
+
+    # ── 조회 ─────────────────────────────────────────────────
+
+    def _load_results(self) -> pd.DataFrame:
+        if not self.storage.exists(RESULTS_TABLE):
+            return pd.DataFrame(index=pd.Index([], name="key"), columns=[BATCH_COL])
+        df = pd.concat(list(self.storage.iter_parts(RESULTS_TABLE)), ignore_index=True)
+        if BATCH_COL not in df.columns:
+            df[BATCH_COL] = ""
+        df[BATCH_COL] = df[BATCH_COL].fillna("")
+        return df.drop_duplicates("key", keep="last").set_index("key")     # 다시 기록된 키는 마지막 행
+
+    def results(self) -> pd.DataFrame:
+        with self._lock:
+            if self._results is None:
+                self._results = self._load_results()
+            return self._results
+
+    def lookup(self, keys: list[str]) -> dict[str, dict]:
+        """저장된 결과 {key: 행 dict} — 없는 키는 빠짐, 결측 지표(NaN)는 None"""
+        res = self.results().drop(columns=BATCH_COL)
+        hit = res.index.intersection(pd.Index(keys))
+        rows = res.loc[hit].astype(object).where(res.loc[hit].notna(), None)
+        return {k: {"key": k, **row} for k, row in rows.to_dict("index").items()}
+
+    def curves(self, keys: list[str]) -> EquityCurves | None:
+        """결과 키들의 누적 수익 곡선 (열 이름 = 키). 모두 같은 데이터 버전이어야 하며 없는 키는 빠짐."""
+        res  = self.results()
+        rows = res.loc[res.index.intersection(pd.Index(keys))]
+        if rows.empty:
+            return None
+        versions = set(rows["data_version"])
+        if len(versions) > 1:
+            raise ValueError(f"데이터 버전이 다른 곡선은 함께 읽을 수 없음: {sorted(versions)}")
+        version = versions.pop()
+        days, values = None, {}
+        for batch, group in rows.groupby(BATCH_COL):
+            try:
+                stored = EquityCurves.load(self.storage, _curve_table(version, batch))
+            except FileNotFoundError:                  # 없음 / 다른 프로세스가 정리한 이전 버전
+                continue
+            days = stored.days
+            values.update({k: stored.values[k] for k in group.index if k in stored.values})
+        names = [k for k in keys if k in values]
+        return EquityCurves(days, {k: values[k] for k in names}) if names else None
+
+    # ── 기록 ─────────────────────────────────────────────────
+
+    def put(self, rows: list[dict], dates: pd.DatetimeIndex, curves: dict[str, np.ndarray]) -> None:
+        """결과 행 + 곡선 추가 (같은 키는 교체). 곡선은 모두 같은 데이터 버전(dates)이어야 한다.
+        새 곡선은 새 묶음 테이블 하나로, 새 행은 결과 테이블 파트 하나로만 기록 → 기록량은 추가분에 비례.
+        프로세스 간 잠금 안에서 저장본을 다시 읽어 병합 → 다른 프로세스가 그사이 쓴 행도 보존."""
+        if not rows:
+            return
+        new     = _typed(pd.DataFrame(rows)).set_index("key")
+        version = new["data_version"].iloc[0]
+        with self._lock, self.storage.lock(STORE_LOCK):
+            batch = uuid.uuid4().hex[:12] if curves else ""
+            if curves:                                 # 곡선 먼저 기록 → 결과 행이 아직 없는 테이블을 가리키는 순간이 없음
+                EquityCurves(to_days(dates), {k: np.asarray(v, dtype=np.float32)
+                                              for k, v in curves.items()}
+                             ).save(self.storage, _curve_table(version, batch))
+            new[BATCH_COL] = [batch if k in curves else "" for k in new.index]
+
+            current = self._load_results()
+            merged  = new if current.empty else \
+                pd.concat([current[~current.index.isin(new.index)], new])
+            merged, stale = _prune(merged, version)
+            if stale:                                  # 행 삭제 → 결과 테이블 압축 재기록
+                self.storage.save(merged.reset_index(), RESULTS_TABLE)
+            else:
+                self.storage.add_part(new.reset_index(), RESULTS_TABLE)
+            self._results = merged
+
+            # 더 이상 어떤 행도 가리키지 않는 곡선 테이블 삭제 (정리된 데이터 버전 / 모든 키가 다시 기록된 묶음)
+            before = set(zip(current["data_version"], current[BATCH_COL])) if not current.empty else set()
+            after  = set(zip(merged["data_version"], merged[BATCH_COL]))
+            for v, b in before - after:
+                self.storage.delete(_curve_table(v, b))
+        logger.info(f"백테스트 결과 저장: {len(rows)}개 (누적 {len(merged)}개)"
+                    + (f", 이전 데이터 버전 {len(stale)}개 정리" if stale else ""))
+
+
+def _curve_table(data_version: str, batch: str) -> str:
+    table = CURVES_TABLE.format(data_version=data_version)
+    return f"{table}_{batch}" if batch else table
+
+
+def _typed(rows: pd.DataFrame) -> pd.DataFrame:
+    """파트 간 열 타입 고정 (결측 지표 None → NaN float)"""
+    return rows.astype({**{m: np.float64 for m in METRIC_KEYS}, "top_n": np.int64,
+                        **{p: np.float64 for p in PARAM_KEYS if p != "top_n"}})
+
+
+def _prune(results: pd.DataFrame, current: str) -> tuple[pd.DataFrame, list[str]]:
+    """최근 기록 순 BACKTEST_KEEP_DATA_VERSIONS개(+ 현재) 데이터 버전만 남김 → (남은 행, 삭제할 버전)"""
+    from config import BACKTEST_KEEP_DATA_VERSIONS
+    if BACKTEST_KEEP_DATA_VERSIONS <= 0 or results.empty:
+        return results, []
+    latest = results.groupby("data_version")["created_at"].max().sort_values(ascending=False)
+    keep   = set(latest.index[:BACKTEST_KEEP_DATA_VERSIONS]) | {current}
+    stale  = [v for v in latest.index if v not in keep]
+    return results[results["data_version"].isin(keep)], stale
+
+
+def cached_sweep(
+    inp: BacktestInputs,
+    grid: list[dict],
+    model_version: str,
+    store: BacktestStore | None = None,
+    n_workers: int | None = None,
+) -> list[dict]:
+    """run_sweep + 결과 캐시. 반환: grid 순서의 [{key, 파라미터, 지표, ...}]"""
+    from services.backtest_sweep import run_sweep
+
+    store = store or BacktestStore()
+    data_version = inp.fingerprint()
+    costs = cost_model()
+    mver  = metrics_version()
+    keys  = [result_key(model_version, data_version, p, costs, mver) for p in grid]
+    hits  = store.lookup(keys)
+
+    todo = [(k, p) for k, p in zip(keys, grid) if k not in hits]
+    todo = list({k: p for k, p in todo}.items())                  # 그리드 내 중복 제거
+    logger.info(f"백테스트 캐시: {len(grid)}개 중 {len(grid) - len(todo)}개 적중, {len(todo)}개 계산")
+
+    if todo:
+        done = run_sweep(inp, [p for _, p in todo], n_workers, curves=True)
+        created = datetime.now().isoformat(timespec="seconds")
+        rows   = [result_row(k, p, r, model_version, data_version, inp.dates, created)
+                  for (k, p), r in zip(todo, done)]
+        curves = {k: r["equity"] for (k, _), r in zip(todo, done)}
+        store.put(rows, inp.dates, curves)
+        hits.update({row["key"]: row for row in rows})
+
+    return [{**p, **hits[k]} for k, p in zip(keys, grid)]
@@ -0,0 +1,139 @@
+"""
+BacktestSweep — 파라미터 그리드 병렬 백테스트
+
+  inp     = prepare_inputs(scores, close, factors, macro, rule_scores)   # 공통 입력 1회
+  grid    = param_grid(ml_weights=[...], rule_weights=[...], top_ns=[...], costs=[...])
+  results = run_sweep(inp, grid)                                         # [{파라미터 + 지표}, ...]
+
+  - 파라미터 무관 입력(수익률 행렬, 순위, 레짐, 손절 마스크, 변동성 역수)은 한 번만 계산해
+    캐시 디렉터리에 .npy로 기록 → 워커는 memmap으로 연결 (프로세스 간 복사 없음)
+  - 그리드는 혼합 점수(ml:rule 비율)별 전략군으로 묶어 평가 — 전략군 하나가 정렬 1회 +
+    (top_n × 날짜 × 종목) 텐서 연산 1회라 top_n/cost 축은 사실상 무료
+  - 지표(Sortino·Calmar·Sharpe 신뢰구간 등)도 전략군의 수익률 행렬 전체를 services.metrics로 한 번에
+  - 전략군은 배치 단위로 프로세스 풀에 분배, 워커 수는 BACKTEST_SWEEP_WORKERS (0 = 자동)
+  - 전략군이 적거나 워커 1개면 같은 커널을 프로세스 안에서 순차 실행
+"""
+
+from __future__ import annotations
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from services.backtest_engine import DEFAULT_COST, BacktestInputs, mix_key, simulate_family
+from services.metrics import compute_metrics, records
+
+logger = logging.getLogger(__name__)
+
+SWEEP_KEYS     = ("ml_weight", "rule_weight", "top_n", "cost")
+MIN_PARALLEL   = 4       # 전략군이 이보다 적으면 순차 실행
+BATCHES_PER_WORKER = 4
+
+_inputs: BacktestInputs | None = None      # 워커 프로세스 전역 (memmap)
+_inputs_dir: str | None = None
+
+
+def param_grid(
+    ml_weights=(0.5,),
+    rule_weights=(0.0,),
+    top_ns=(10,),
+    costs=(DEFAULT_COST,),
+) -> list[dict]:
+    """임의 그리드의 데카르트 곱 → 파라미터 dict 목록"""
+    return [dict(zip(SWEEP_KEYS, combo))
+            for combo in itertools.product(ml_weights, rule_weights, top_ns, costs)]
+
+
+def families(inp: BacktestInputs, grid: list[dict]) -> list[list[int]]:
+    """혼합 점수가 같은 조합끼리 묶은 grid 인덱스 목록 (첫 등장 순)"""
+    groups: dict = {}
+    for i, p in enumerate(grid):
+        groups.setdefault(mix_key(inp, p["ml_weight"], p["rule_weight"]), []).append(i)
+    return list(groups.values())
+
+
+def _evaluate(inp: BacktestInputs, family: list[dict], curves: bool = False) -> list[dict]:
+    """전략군 1개 일괄 평가 — 대표 조합의 혼합 점수로 모든 top_n × cost를 한 번에,
+    지표도 (top_n × cost) 수익률 행렬 전체에 compute_metrics 1회.
+    curves=True면 결과마다 "equity" (float32 누적 수익 곡선) 포함."""
+    top_ns = sorted({int(p["top_n"]) for p in family})
+    costs  = sorted({p["cost"] for p in family})
+    rets, turnover = simulate_family(inp, family[0]["ml_weight"], family[0]["rule_weight"],
+                                     top_ns, costs, with_turnover=True)
+    T, C, D = rets.shape
+    R      = rets.reshape(T * C, D)
+    stats  = records(compute_metrics(R, dates=inp.dates,
+                                     turnover=np.repeat(turnover, C, axis=0)))
+    t_idx  = {n: i for i, n in enumerate(top_ns)}
+    c_idx  = {c: i for i, c in enumerate(costs)}
+    out = []
+    for p in family:
+        row = t_idx[int(p["top_n"])] * C + c_idx[p["cost"]]
+        r   = {**p, **stats[row]}
+        if curves:
+            r["equity"] = np.cumprod(1 + R[row]).astype(np.float32)
+        out.append(r)
+    return out
+
+
+def _attach(cache_dir: str) -> None:
+    global _inputs, _inputs_dir
+    _inputs, _inputs_dir = BacktestInputs.load(cache_dir), cache_dir
+
+
+def run_family(cache_dir: str, family: list[dict], curves: bool = False) -> list[dict]:
+    """상주 프로세스 풀용 작업 단위 — 입력 디렉터리가 바뀌었을 때만 memmap 재연결"""
+    if _inputs_dir != cache_dir:
+        _attach(cache_dir)
+    return _evaluate(_inputs, family, curves)
+
+
+def _run_batch(batch: list[list[dict]], curves: bool = False) -> list[list[dict]]:
+    return [_evaluate(_inputs, family, curves) for family in batch]
+
+
+def _n_workers(n_tasks: int) -> int:
+    from config import BACKTEST_SWEEP_WORKERS
+    workers = BACKTEST_SWEEP_WORKERS or os.cpu_count() or 1
+    return max(1, min(workers, n_tasks))
+
+
+def run_sweep(inp: BacktestInputs, grid: list[dict], n_workers: int | None = None,
+              curves: bool = False) -> list[dict]:
+    """그리드 전체 평가. 결과 순서는 grid 순서와 같다. curves=True면 누적 곡선("equity") 포함."""
+    groups    = families(inp, grid)
+    tasks     = [[grid[i] for i in idx] for idx in groups]
+    n_workers = n_workers or _n_workers(len(tasks))
+    if n_workers <= 1 or len(tasks) < MIN_PARALLEL:
+        done = [_evaluate(inp, family, curves) for family in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from config import DATA_CHECKPOINTS
+
+        n_batches = min(len(tasks), n_workers * BATCHES_PER_WORKER)
+        batches   = [tasks[i::n_batches] for i in range(n_batches)]     # 라운드로빈 → 비용 균등
+        os.makedirs(DATA_CHECKPOINTS, exist_ok=True)
+        cache_dir = tempfile.mkdtemp(prefix="sweep_", dir=DATA_CHECKPOINTS)
+        try:
+            inp.save(cache_dir)
+            logger.info(f"스윕: {len(grid)}개 조합 / 전략군 {len(tasks)}개, "
+                        f"워커 {n_workers} × 배치 {n_batches}")
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_attach,
+                                     initargs=(cache_dir,)) as pool:
+                per_batch = list(pool.map(_run_batch, batches, itertools.repeat(curves)))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        # 라운드로빈 분할을 전략군 순서로 복원
+        done = [None] * len(tasks)
+        for b, batch_results in enumerate(per_batch):
+            done[b::n_batches] = batch_results
+
+    # 전략군 → grid 순서로 펼치기
+    results = [None] * len(grid)
+    for idx, family_results in zip(groups, done):
+        for i, r in zip(idx, family_results):
+            results[i] = r
+    return results
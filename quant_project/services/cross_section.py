@@ -0,0 +1,249 @@
+"""
+CrossSection — 날짜별 단면 정규화 + 중립화 (벡터화)
+
+처리 순서 (날짜마다 독립, 전부 (date × ticker × factor) 3차원 배열 연산):
+  1. 윈저라이징 : 단면 평균 ± winsor × 표준편차로 클리핑
+  2. 변환       : "zscore" (단면 표준화) | "rank" (단면 백분위 → 중심화)
+  3. 중립화     : 섹터 더미 + 베타 노출에 대한 날짜별 최소제곱 잔차 (배치 solve)
+  4. 재표준화   : 잔차를 다시 단면 z-score
+
+build_factors 마지막 단계에서 {factor}_cs 컬럼으로 원본 팩터와 함께 저장되고,
+라이브 추론(latest 단면)에도 같은 함수가 적용된다 — 정규화는 단면 내 통계만 쓰므로 무상태.
+단면 통계가 같은 종목 집합에서 나오도록 빌드 유니버스는 정규화 스펙("universe")에 함께 저장된다.
+"""
+
+from __future__ import annotations
+import logging
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CS_SUFFIX = "_cs"
+
+DEFAULT_PARAMS = {
+    "method":      "zscore",            # "zscore" | "rank"
+    "winsor":      3.0,                 # 표준편차 배수 (0이면 미적용)
+    "neutralize":  ["sector", "beta"],  # 중립화 대상 노출
+    "beta_window": 60,                  # 롤링 베타 윈도우 (거래일)
+}
+
+DATE_CHUNK = 250    # 3차원 배열 메모리 제한용 날짜 블록
+
+
+def cs_name(feature: str) -> str:
+    return feature + CS_SUFFIX
+
+
+# ─── 노출 데이터 ──────────────────────────────────────────────
+
+def load_sectors() -> pd.Series:
+    """constituents CSV 기반 ticker → sector (없으면 빈 Series)"""
+    from config import DATA_CONSTITUENTS
+    path = os.path.join(DATA_CONSTITUENTS, "sp500_tickers.csv")
+    if not os.path.exists(path):
+        return pd.Series(dtype=object)
+    df = pd.read_csv(path, usecols=["ticker", "sector"])
+    return df.drop_duplicates("ticker").set_index("ticker")["sector"]
+
+
+def live_beta(close: pd.DataFrame, window: int = 60, market: str = "SPY") -> pd.Series:
+    """빌드 유니버스의 후행 종가 (load_ohlcv_window — 윈도우 시작에 걸친 거래 정지는 직전 가격으로 채운 ffill)
+    → 마지막 날 베타. 빌드(rolling_beta(전체 이력 ffill 종가))와 같은 종목·시장 정의.
+    남은 앞쪽 결측(윈도우 이전 상장 폐지 — 빌드에선 가격 유지 = 수익률 0)은 상수로 채워 같은 수익률을 만든다.
+    (유니버스 종목은 결측 비율 기준상 후행 윈도우 이전에 상장한 종목)"""
+    return rolling_beta(close.bfill().fillna(1.0), window, market).iloc[-1]
+
+
+def rolling_beta(close: pd.DataFrame, window: int = 60, market: str = "SPY") -> pd.DataFrame:
+    """date × ticker 롤링 베타. market 종목이 없으면 동일가중 평균 수익률 사용."""
+    ret = close.pct_change()
+    mkt = ret[market] if market in ret.columns else ret.mean(axis=1)
+    mean_r = ret.rolling(window).mean()
+    mean_m = mkt.rolling(window).mean()
+    cov    = ret.mul(mkt, axis=0).rolling(window).mean() - mean_r.mul(mean_m, axis=0)
+    var    = mkt.rolling(window).var(ddof=0)
+    return cov.div(var.replace(0, np.nan), axis=0)
+
+
+# ─── 핵심: 3차원 배열 정규화 ─────────────────────────────────
+
+def _standardize(Y: np.ndarray) -> np.ndarray:
+    mu, sd = _moments(Y)
+    return (Y - mu) / np.where(sd > 0, sd, 1.0)
+
+
+def _moments(Y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """단면(axis=1) 평균/표준편차 — 전부 NaN인 단면은 경고 없이 NaN"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(Y, axis=1, keepdims=True), np.nanstd(Y, axis=1, keepdims=True)
+
+
+def _average_ranks(Y: np.ndarray) -> np.ndarray:
+    """단면(axis=1) 0-기준 순위, 동점은 평균 순위 (scipy.stats.rankdata(method="average") - 1)"""
+    order = np.argsort(Y, axis=1, kind="stable")
+    S     = np.take_along_axis(Y, order, axis=1)
+    N     = Y.shape[1]
+    pos   = np.broadcast_to(np.arange(N)[None, :, None], S.shape)
+    first = np.ones(S.shape, dtype=bool)
+    first[:, 1:] = S[:, 1:] != S[:, :-1]                     # 동점 구간 시작
+    last  = np.ones(S.shape, dtype=bool)
+    last[:, :-1] = first[:, 1:]                              # 동점 구간 끝
+    start = np.maximum.accumulate(np.where(first, pos, 0), axis=1)
+    end   = np.flip(np.minimum.accumulate(np.flip(np.where(last, pos, N - 1), axis=1), axis=1), axis=1)
+    ranks = np.empty(Y.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, (start + end) / 2, axis=1)
+    return ranks
+
+
+def normalize_panel(
+    Y: np.ndarray,
+    exposures: np.ndarray | None = None,
+    method: str = "zscore",
+    winsor: float = 3.0,
+) -> np.ndarray:
+    """(D, N, K) 팩터 배열 → 날짜별 단면 정규화/중립화 결과 (NaN 위치 보존)
+
+    exposures: (D, N, P) 중립화 노출 (섹터 더미, 베타 …). NaN 행은 회귀에서 제외.
+    """
+    Y = np.array(Y, dtype=np.float64)
+    valid = ~np.isnan(Y)
+
+    # 1. 윈저라이징
+    if winsor and winsor > 0:
+        mu, sd = _moments(Y)
+        Y  = np.clip(Y, mu - winsor * sd, mu + winsor * sd)
+
+    # 2. 변환
+    if method == "rank":
+        ranks = _average_ranks(np.where(valid, Y, np.inf))
+        count = valid.sum(axis=1, keepdims=True)
+        Y = np.where(valid, (ranks + 0.5) / np.maximum(count, 1) - 0.5, np.nan)
+    elif method == "zscore":
+        Y = _standardize(Y)
+    else:
+        raise ValueError(f"알 수 없는 정규화 방식: {method}")
+
+    # 3. 중립화: 날짜 × 팩터별 최소제곱을 배치로 풀이
+    if exposures is not None and exposures.shape[-1] > 0:
+        X  = np.nan_to_num(exposures)                                 # (D, N, P)
+        ok = valid & ~np.isnan(exposures).any(axis=2, keepdims=True)  # (D, N, K)
+        W  = ok.astype(np.float64)
+        Y0 = np.where(ok, Y, 0.0)
+        Xt  = X.transpose(0, 2, 1)                                    # (D, P, N)
+        # 팩터별 유효 종목 마스크가 달라 K번의 배치 matmul로 X'WX 구성
+        XtX = np.stack([(Xt * W[:, None, :, k]) @ X for k in range(Y.shape[2])], axis=1)
+        XtY = (Xt @ Y0).transpose(0, 2, 1)                            # (D, K, P)
+        P   = X.shape[-1]
+        XtX += 1e-8 * np.eye(P)       # 빈 섹터 등 특이행렬 방지
+        coef  = np.linalg.solve(XtX, XtY[..., None])[..., 0]          # (D, K, P)
+        resid = Y0 - X @ coef.transpose(0, 2, 1)
+        Y = np.where(ok, resid, np.where(valid, Y, np.nan))
+
+        # 4. 재표준화
+        Y = _standardize(Y)
+
+    return Y
+
+
+def _exposures(
+    dates: pd.Index,
+    tickers: pd.Index,
+    params: dict,
+    sectors: pd.Series | None,
+    beta: pd.DataFrame | None,
+) -> np.ndarray | None:
+    neutralize = params.get("neutralize") or []
+    if not neutralize:
+        return None
+
+    D, N = len(dates), len(tickers)
+    cols: list[np.ndarray] = []
+
+    if "sector" in neutralize and sectors is not None and len(sectors):
+        sec = sectors.reindex(tickers).fillna("Unknown").to_numpy()
+        onehot = (sec[:, None] == np.unique(sec)[None, :]).astype(np.float64)   # (N, S)
+        cols.append(np.broadcast_to(onehot, (D, N, onehot.shape[1])))
+    else:
+        cols.append(np.ones((D, N, 1)))                                         # 절편
+
+    if "beta" in neutralize and beta is not None:
+        b = beta.reindex(index=dates, columns=tickers).to_numpy(dtype=np.float64)
+        # 베타 결측 → 해당 날짜 단면 평균으로 대체
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            fill = np.nanmean(b, axis=1, keepdims=True)
+        b = np.where(np.isnan(b), np.nan_to_num(fill, nan=1.0), b)
+        cols.append(b[:, :, None])
+
+    return np.concatenate(cols, axis=2)
+
+
+def normalize_long(
+    df: pd.DataFrame,
+    features: list[str],
+    params: dict | None = None,
+    sectors: pd.Series | None = None,
+    beta: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """(date, ticker) 롱 포맷 팩터 → {factor}_cs 컬럼 DataFrame (같은 인덱스)"""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    d_codes, d_uni = pd.factorize(df.index.get_level_values("date"))
+    t_codes, t_uni = pd.factorize(df.index.get_level_values("ticker"))
+    values = df[features].to_numpy(dtype=np.float64)
+    out    = np.full_like(values, np.nan)
+
+    for lo in range(0, len(d_uni), DATE_CHUNK):
+        hi   = min(lo + DATE_CHUNK, len(d_uni))
+        rows = np.flatnonzero((d_codes >= lo) & (d_codes < hi))
+        Y = np.full((hi - lo, len(t_uni), len(features)), np.nan)
+        Y[d_codes[rows] - lo, t_codes[rows]] = values[rows]
+        X = _exposures(d_uni[lo:hi], t_uni, params, sectors, beta)
+        Z = normalize_panel(Y, X, method=params["method"], winsor=params["winsor"])
+        out[rows] = Z[d_codes[rows] - lo, t_codes[rows]]
+
+    return pd.DataFrame(out, index=df.index, columns=[cs_name(f) for f in features])
+
+
+def normalize_cross_section(
+    xs: pd.DataFrame,
+    features: list[str],
+    params: dict | None = None,
+    sectors: pd.Series | None = None,
+    beta: pd.Series | None = None,
+) -> pd.DataFrame:
+    """단일 날짜 단면 (ticker × feature) → {factor}_cs 컬럼 (라이브 추론용)"""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    date = pd.Index([pd.Timestamp(0)])
+    beta_df = beta.to_frame().T.set_axis(date) if beta is not None else None
+    Y = xs[features].to_numpy(dtype=np.float64)[None]
+    X = _exposures(date, xs.index, params, sectors, beta_df)
+    Z = normalize_panel(Y, X, method=params["method"], winsor=params["winsor"])
+    return pd.DataFrame(Z[0], index=xs.index, columns=[cs_name(f) for f in features])
+
+
+# ─── 라이브 추론 ─────────────────────────────────────────────
+
+def load_latest_normalized(
+    features: list[str],
+    params: dict | None = None,
+    extra: list[str] | None = None,
+) -> tuple[pd.Timestamp, pd.DataFrame]:
+    """최신 원본 팩터 단면 + 동일 정규화 적용 → raw 컬럼과 {factor}_cs 컬럼 함께 반환.
+    params["universe"](빌드 유니버스)가 있으면 같은 종목 집합에서 윈저라이징·표준화·순위 통계 계산,
+    베타도 빌드처럼 유니버스 전체 종가(SPY 없으면 유니버스 동일가중 시장)로 계산."""
+    from services import factor_registry
+
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    wanted = features + [f for f in (extra or []) if f not in features]
+    n_rows = max(factor_registry.required_rows(wanted), params["beta_window"] + 1) + 20
+    tail, close = factor_registry.load_ohlcv_window(n_rows, universe=params.get("universe"))
+
+    xs   = factor_registry.latest_cross_section(factor_registry.live_inputs(tail, close), wanted)
+    beta = live_beta(close, params["beta_window"])           # 팩터 종목이 아닌 빌드 유니버스 전체 기준
+    norm = normalize_cross_section(xs, features, params, load_sectors(), beta)
+    return close.index[-1], pd.concat([xs, norm], axis=1)
@@ -0,0 +1,181 @@
+"""
+EquityCurves — 누적 수익 곡선의 압축 표현 (공통 날짜 축 1개 + 열별 float32 배열)
+
+  curves = EquityCurves.from_returns(dates, {"equity": ret, "spy": spy_ret})
+  curves.save(storage, "equity_curve")            # 열 저장: day(int64) + 곡선별 float32
+  EquityCurves.load(storage, "equity_curve").to_delta_json()
+
+  - 날짜는 1970-01-01 기준 일수(int64), 값은 float32 → 곡선당 Python 객체 0개
+  - delta JSON: 날짜·값(×VALUE_SCALE 정수화)을 차분 → 대부분 한두 자리 정수, decode_delta로 복원
+  - Arrow IPC: 같은 열 구조 그대로의 바이너리 스트림 (pyarrow)
+  - 예전 형식(DatetimeIndex 인덱스 + 열) 테이블도 from_frame으로 읽는다
+  - downsample(max_points): LTTB(Largest-Triangle-Three-Buckets) + 곡선별 최대 낙폭 고점·저점 보존
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+DAY_COL     = "day"
+VALUE_SCALE = 1_000_000      # delta JSON 값 정밀도 (소수 6자리 — 기존 round(6)과 동일)
+
+
+def to_days(dates) -> np.ndarray:
+    """날짜 → 1970-01-01 기준 일수 (int64)"""
+    return np.asarray(pd.DatetimeIndex(dates).values.astype("datetime64[D]").astype(np.int64))
+
+
+@dataclass
+class EquityCurves:
+    days:   np.ndarray                 # (D,) int64
+    values: dict[str, np.ndarray]      # 이름 → (D,) float32
+
+    @classmethod
+    def from_returns(cls, dates, returns: dict[str, np.ndarray]) -> "EquityCurves":
+        """일별 수익률 → 누적 곡선 (시작 = 1 + 첫날 수익률)"""
+        return cls(to_days(dates), {name: np.cumprod(1 + np.asarray(r, dtype=np.float64)).astype(np.float32)
+                                    for name, r in returns.items()})
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.days.astype("datetime64[D]"), name="date")
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.values)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def with_returns(self, name: str, ret: np.ndarray) -> "EquityCurves":
+        """같은 날짜 축의 수익률 곡선 1개 추가"""
+        curve = np.cumprod(1 + np.asarray(ret, dtype=np.float64)).astype(np.float32)
+        return EquityCurves(self.days, {**self.values, name: curve})
+
+    def select(self, names: list[str]) -> "EquityCurves":
+        return EquityCurves(self.days, {n: self.values[n] for n in names})
+
+    def take(self, idx: np.ndarray) -> "EquityCurves":
+        return EquityCurves(self.days[idx], {n: v[idx] for n, v in self.values.items()})
+
+    def tail(self, n: int) -> "EquityCurves":
+        return self.take(np.arange(max(len(self) - n, 0), len(self)))
+
+    def downsample(self, max_points: int) -> "EquityCurves":
+        """화면 표시용 축소 — 결과는 최대 max_points점.
+        우선순위: 첫 곡선의 첫·끝 점과 최대 낙폭 (고점, 저점) → 나머지 곡선의 (고점, 저점) → 첫 곡선 기준 LTTB.
+        LTTB는 첫·끝 점을 다시 고르므로 남은 예산 + 2개를 요청해도 합집합이 max_points를 넘지 않는다."""
+        if max_points <= 0 or len(self) <= max_points:
+            return self
+        primary, *rest = self.values.values()
+        cand = np.concatenate([drawdown_extremes(primary)[[0, 3, 1, 2]],
+                               *(drawdown_extremes(v)[1:3] for v in rest)])
+        _, pos = np.unique(cand, return_index=True)
+        keep   = cand[np.sort(pos)][:max_points]
+        budget = max_points - len(keep)
+        if budget <= 0:
+            return self.take(np.sort(keep))
+        return self.take(np.union1d(lttb_indices(self.days, primary, budget + 2), keep))
+
+    # ── 열 저장 ───────────────────────────────────────────────
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({DAY_COL: self.days, **self.values})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "EquityCurves":
+        if DAY_COL in df.columns:
+            days = df[DAY_COL].to_numpy(dtype=np.int64)
+            cols = [c for c in df.columns if c != DAY_COL]
+        else:                                          # 예전 형식: 날짜 인덱스
+            days = to_days(pd.to_datetime(df.index))
+            cols = list(df.columns)
+        return cls(days, {str(c): df[c].to_numpy(dtype=np.float32) for c in cols})
+
+    def save(self, storage, table: str) -> None:
+        storage.save(self.to_frame(), table)
+
+    @classmethod
+    def load(cls, storage, table: str) -> "EquityCurves":
+        return cls.from_frame(storage.load(table))
+
+    # ── 응답 인코딩 ───────────────────────────────────────────
+
+    def to_lists(self) -> dict:
+        """기존 JSON 형식 {"dates": [...], 이름: [...]}"""
+        return {"dates": np.datetime_as_string(self.days.astype("datetime64[D]")).tolist(),
+                **{n: np.round(v.astype(np.float64), 6).tolist() for n, v in self.values.items()}}
+
+    def to_delta_json(self) -> dict:
+        """차분 인코딩 JSON — 값 = (first + cumsum(deltas)) / scale, 날짜 = start_day + cumsum(day_deltas)"""
+        series = {}
+        for n, v in self.values.items():
+            q = np.round(v.astype(np.float64) * VALUE_SCALE).astype(np.int64)
+            series[n] = {"first": int(q[0]) if len(q) else 0, "deltas": np.diff(q).tolist()}
+        return {
+            "encoding":   "delta",
+            "scale":      VALUE_SCALE,
+            "start_day":  int(self.days[0]) if len(self.days) else 0,
+            "day_deltas": np.diff(self.days).tolist(),
+            "series":     series,
+        }
+
+    def to_arrow_ipc(self) -> bytes:
+        import pyarrow as pa
+        table = pa.table({DAY_COL: pa.array(self.days, pa.int64()),
+                          **{n: pa.array(v, pa.float32()) for n, v in self.values.items()}})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 선택 인덱스 (첫·끝 점 포함, n_out개).
+    버킷마다 (직전 선택점, 현재 버킷 점, 다음 버킷 평균) 삼각형 넓이가 최대인 점을 고른다."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)     # 가운데 n_out-2개 버킷 경계
+
+    # 다음 버킷 평균 (마지막 버킷의 다음 = 끝 점)
+    csx, csy = np.concatenate([[0.0], np.cumsum(x)]), np.concatenate([[0.0], np.cumsum(y)])
+    nxt_lo = np.append(edges[1:-1], n - 1)
+    nxt_hi = np.append(edges[2:], n)
+    cnt    = np.maximum(nxt_hi - nxt_lo, 1)
+    avg_x  = (csx[nxt_hi] - csx[nxt_lo]) / cnt
+    avg_y  = (csy[nxt_hi] - csy[nxt_lo]) / cnt
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[b]) * (by - y[a]) - (x[a] - bx) * (avg_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def drawdown_extremes(v: np.ndarray) -> np.ndarray:
+    """최대 낙폭 구간의 (직전 고점, 저점) 인덱스 + 첫·끝 점"""
+    v = np.asarray(v, dtype=np.float64)
+    if not len(v):
+        return np.empty(0, dtype=np.int64)
+    peak   = np.maximum.accumulate(v)
+    trough = int(np.argmin(v / peak))
+    top    = int(np.argmax(v[: trough + 1]))
+    return np.array([0, top, trough, len(v) - 1], dtype=np.int64)
+
+
+def decode_delta(payload: dict) -> EquityCurves:
+    """to_delta_json 역변환"""
+    days = np.cumsum([payload["start_day"], *payload["day_deltas"]]).astype(np.int64)
+    values = {n: (np.cumsum([s["first"], *s["deltas"]]) / payload["scale"]).astype(np.float32)
+              for n, s in payload["series"].items()}
+    return EquityCurves(days, values)
@@ -0,0 +1,385 @@
+"""
+FactorRegistry — 선언형 팩터 레지스트리 + 의존성 DAG 엔진
+
+각 노드(중간값/팩터/타겟)는 입력 노드와 자체 lookback(window)을 선언한다.
+엔진은 요청된 팩터에서 역으로 DAG를 풀어 필요한 노드만 위상 순서로 계산하고,
+공유 중간값(ret, ma50, ma200 …)은 한 번만 계산해 모든 팩터가 재사용한다.
+
+입력 노드: close, high, low, volume (종목별 Series 또는 date × ticker DataFrame)
+  → 모든 노드 함수는 pandas 연산만 사용하므로 Series/DataFrame 양쪽에서 동작
+
+팩터 추가 방법:
+  @factor("new_factor", inputs=("ret",), window=10, group="모멘텀")
+  def _new_factor(ret):
+      return ret.rolling(10).mean()
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+BASE_INPUTS = ("close", "high", "low", "volume")
+
+# EWM 기반 지표(RSI)의 워밍업 행 수 — alpha=1/14 기준 (13/14)^100 ≈ 6e-4
+EWM_WARMUP = 100
+
+# 유니버스 기준 (build_factors와 라이브 추론 공통)
+UNIVERSE_MAX_MISSING = 0.3     # 전체 기간 종가 결측 비율 이상이면 제외
+UNIVERSE_MIN_ROWS    = 60      # 첫 종가 이후 행 수가 이보다 적으면(상장 직후) 제외
+
+
+@dataclass(frozen=True)
+class FactorNode:
+    name:   str
+    func:   Callable
+    inputs: tuple[str, ...]
+    window: int = 0            # 입력 대비 추가로 필요한 과거 행 수
+    kind:   str = "intermediate"   # "intermediate" | "factor" | "target"
+    group:  str | None = None
+
+
+_NODES: dict[str, FactorNode] = {}
+
+
+def _register(name: str, inputs: tuple[str, ...], window: int, kind: str, group: str | None):
+    def deco(func: Callable) -> Callable:
+        if name in _NODES or name in BASE_INPUTS:
+            raise ValueError(f"중복 노드 등록: {name}")
+        for dep in inputs:
+            if dep not in _NODES and dep not in BASE_INPUTS:
+                raise ValueError(f"[{name}] 미등록 입력 노드: {dep}")
+        _NODES[name] = FactorNode(name, func, tuple(inputs), window, kind, group)
+        return func
+    return deco
+
+
+def node(name: str, inputs: tuple[str, ...], window: int = 0):
+    """공유 중간값 등록"""
+    return _register(name, inputs, window, "intermediate", None)
+
+
+def factor(name: str, inputs: tuple[str, ...], window: int = 0, group: str | None = None):
+    """학습/추론용 팩터 등록"""
+    return _register(name, inputs, window, "factor", group)
+
+
+def target(name: str, inputs: tuple[str, ...]):
+    """타겟 등록 (미래 값 참조 — lookback 계산에서 제외)"""
+    return _register(name, inputs, 0, "target", None)
+
+
+# ─── 중간값 ───────────────────────────────────────────────────
+
+@node("ret", inputs=("close",), window=1)
+def _ret(close):
+    return close.pct_change()
+
+
+@node("ma20", inputs=("close",), window=19)
+def _ma20(close):
+    return close.rolling(20).mean()
+
+
+@node("ma50", inputs=("close",), window=49)
+def _ma50(close):
+    return close.rolling(50).mean()
+
+
+@node("ma200", inputs=("close",), window=199)
+def _ma200(close):
+    return close.rolling(200).mean()
+
+
+@node("true_range", inputs=("high", "low", "close"), window=1)
+def _true_range(high, low, close):
+    # fmax: 세 값이 모두 NaN인 경우만 NaN (pd.concat(...).max(axis=1)와 동일)
+    prev_c = close.shift()
+    return np.fmax(np.fmax(high - low, (high - prev_c).abs()), (low - prev_c).abs())
+
+
+@node("vol_mean_20", inputs=("volume",), window=19)
+def _vol_mean_20(volume):
+    return volume.rolling(20).mean()
+
+
+@node("vol_std_20", inputs=("volume",), window=19)
+def _vol_std_20(volume):
+    return volume.rolling(20).std()
+
+
+# ─── 모멘텀 ───────────────────────────────────────────────────
+
+@factor("ret_1m", inputs=("close",), window=21, group="모멘텀")
+def _ret_1m(close):
+    return close.pct_change(21)
+
+
+@factor("ret_3m", inputs=("close",), window=63, group="모멘텀")
+def _ret_3m(close):
+    return close.pct_change(63)
+
+
+@factor("mom_gap", inputs=("ma50", "ma200"), group="모멘텀")
+def _mom_gap(ma50, ma200):
+    return (ma50 - ma200) / ma200          # 50일 MA와 200일 MA 괴리
+
+
+# ─── 변동성 ───────────────────────────────────────────────────
+
+@factor("vol_20", inputs=("ret",), window=19, group="변동성")
+def _vol_20(ret):
+    return ret.rolling(20).std() * np.sqrt(252)
+
+
+@factor("downside_vol", inputs=("ret",), window=19, group="변동성")
+def _downside_vol(ret):
+    return ret.clip(upper=0).rolling(20).std() * np.sqrt(252)
+
+
+@factor("natr", inputs=("true_range", "close"), window=13, group="변동성")
+def _natr(true_range, close):
+    return true_range.rolling(14).mean() / close     # Normalized ATR
+
+
+@factor("skew", inputs=("ret",), window=59, group="변동성")
+def _skew(ret):
+    return ret.rolling(60).skew()
+
+
+@factor("kurt", inputs=("ret",), window=59, group="변동성")
+def _kurt(ret):
+    return ret.rolling(60).kurt()
+
+
+# ─── 유동성 ───────────────────────────────────────────────────
+
+@factor("dol_vol", inputs=("close", "volume"), window=19, group="유동성")
+def _dol_vol(close, volume):
+    return (close * volume).rolling(20).mean()    # 달러 거래량 (20일 평균)
+
+
+@factor("vol_zscore", inputs=("volume", "vol_mean_20", "vol_std_20"), group="유동성")
+def _vol_zscore(volume, vol_mean_20, vol_std_20):
+    return (volume - vol_mean_20) / (vol_std_20 + 1e-9)
+
+
+@factor("mfi", inputs=("high", "low", "close", "volume"), window=14, group="유동성")
+def _mfi(high, low, close, volume):
+    """Money Flow Index (14) — ta.volume.MFIIndicator(fillna=False)와 동일 수식"""
+    tp      = (high + low + close) / 3.0
+    prev_tp = tp.shift(1)
+    up_down = (tp > prev_tp).astype(float) - (tp < prev_tp).astype(float)
+    mfr     = tp * volume * up_down
+    pos_mf  = mfr.clip(lower=0).rolling(14).sum()
+    neg_mf  = (-mfr.clip(upper=0)).rolling(14).sum()
+    return 100 - (100 / (1 + pos_mf / neg_mf))
+
+
+# ─── 추세/반전 ────────────────────────────────────────────────
+
+@factor("rsi", inputs=("close",), window=EWM_WARMUP, group="추세/반전")
+def _rsi(close):
+    """RSI (14) — ta.momentum.RSIIndicator(fillna=False)와 동일 수식"""
+    diff  = close.diff(1)
+    # 상장 전(close NaN) 구간은 NaN 유지 → EWM이 첫 유효 행부터 시작
+    up    = diff.where(diff > 0, 0.0).where(close.notna())
+    down  = -diff.where(diff < 0, 0.0).where(close.notna())
+    ema_up = up.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    ema_dn = down.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    rsi = 100 - (100 / (1 + ema_up / ema_dn))
+    return rsi.mask(ema_dn == 0, 100.0)
+
+
+@factor("disparity_20", inputs=("close", "ma20"), group="추세/반전")
+def _disparity_20(close, ma20):
+    return (close / ma20 - 1) * 100    # 이격도
+
+
+@factor("ma_cross", inputs=("ma50", "ma200"), group="추세/반전")
+def _ma_cross(ma50, ma200):
+    return (ma50 > ma200).astype(float)    # 골든크로스 1, 데스크로스 0
+
+
+# ─── 타겟 ─────────────────────────────────────────────────────
+
+@target("target_next", inputs=("ret",))
+def _target_next(ret):
+    return ret.shift(-1)                    # 익일 수익률 (학습 타겟)
+
+
+@target("target_smooth", inputs=("target_next",))
+def _target_smooth(target_next):
+    return target_next.rolling(5).mean()    # EDA 전용 — 학습 금지
+
+
+# ─── 조회 ─────────────────────────────────────────────────────
+
+def factor_names() -> list[str]:
+    """등록 순서대로 팩터 이름 반환"""
+    return [n.name for n in _NODES.values() if n.kind == "factor"]
+
+
+def target_names() -> list[str]:
+    return [n.name for n in _NODES.values() if n.kind == "target"]
+
+
+def get_node(name: str) -> FactorNode:
+    if name not in _NODES:
+        raise KeyError(f"미등록 팩터/노드: {name}")
+    return _NODES[name]
+
+
+def lookback(name: str) -> int:
+    """해당 노드의 최신 값 1개를 계산하는 데 필요한 과거 행 수 (현재 행 제외)"""
+    if name in BASE_INPUTS:
+        return 0
+    n = get_node(name)
+    if n.kind == "target":
+        return max((lookback(d) for d in n.inputs), default=0)
+    return n.window + max((lookback(d) for d in n.inputs), default=0)
+
+
+def max_lookback(names: list[str]) -> int:
+    return max((lookback(n) for n in names), default=0)
+
+
+def resolve(targets: list[str]) -> list[str]:
+    """요청 노드 계산에 필요한 노드만 위상 정렬해 반환 (입력 노드 제외)"""
+    order: list[str] = []
+    seen:  set[str]  = set()
+
+    def visit(name: str):
+        if name in seen or name in BASE_INPUTS:
+            return
+        for dep in get_node(name).inputs:
+            visit(dep)
+        seen.add(name)
+        order.append(name)
+
+    for t in targets:
+        visit(t)
+    return order
+
+
+# ─── 엔진 ─────────────────────────────────────────────────────
+
+def compute(
+    inputs: dict[str, pd.Series | pd.DataFrame],
+    targets: list[str] | None = None,
+) -> dict[str, pd.Series | pd.DataFrame]:
+    """DAG 순서로 요청 노드만 계산. 중간값은 캐시에 한 번만 저장해 재사용.
+
+    inputs : {"close": ..., "high": ..., "low": ..., "volume": ...}
+    targets: 계산할 팩터/타겟 이름 (None이면 전체 팩터 + 타겟)
+    """
+    if targets is None:
+        targets = factor_names() + target_names()
+
+    cache: dict[str, pd.Series | pd.DataFrame] = dict(inputs)
+    for name in resolve(targets):
+        n = get_node(name)
+        missing = [d for d in n.inputs if d not in cache]
+        if missing:
+            raise KeyError(f"[{name}] 입력 누락: {missing}")
+        cache[name] = n.func(*(cache[d] for d in n.inputs))
+
+    return {t: cache[t] for t in targets}
+
+
+# ─── 라이브 추론: 최신 단면만 최소 윈도우로 계산 ──────────────
+
+def required_rows(features: list[str]) -> int:
+    """최신 1개 날짜 단면 계산에 필요한 최소 OHLCV 행 수"""
+    return max_lookback(features) + 1
+
+
+def latest_cross_section(
+    inputs: dict[str, pd.DataFrame],
+    features: list[str],
+) -> pd.DataFrame:
+    """date × ticker 입력 → 마지막 날짜의 (ticker × feature) 단면"""
+    out = compute(inputs, targets=features)
+    df = pd.DataFrame({name: frame.iloc[-1] for name, frame in out.items()})
+    df.index.name = "ticker"
+    return df[features]
+
+
+def price_universe(close: pd.DataFrame) -> list[str]:
+    """전체 기간 종가 (date × ticker) → 결측 비율 기준을 통과한 종목 (build_factors.load_price_data)"""
+    valid = close.isna().mean() < UNIVERSE_MAX_MISSING
+    return valid[valid].index.tolist()
+
+
+def load_ohlcv_window(n_rows: int, universe: list[str] | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """ohlcv 마지막 n_rows 행만 읽음 (storage.load_tail — 전체 이력 로드 없음).
+    Returns: (후행 ohlcv 원본, universe(빌드 시 price_universe, 주어지면) 종가 ffill — 라이브 종목 필터 전)"""
+    from services.storage import get_storage
+
+    storage = get_storage()
+    index = storage.load_index("ohlcv").sort_values()
+    n_rows = min(max(n_rows, UNIVERSE_MIN_ROWS), len(index))
+    tail = storage.load_range("ohlcv", index[-n_rows], index[-1]).iloc[-n_rows:]
+    tickers = tail["Close"].columns if universe is None else pd.Index(universe)
+    tail = _seed_halted(storage, tail, index[:-n_rows], tickers)
+    tail.index = pd.to_datetime(tail.index)
+    close = tail["Close"]
+    if universe is not None:
+        close = close[close.columns.intersection(pd.Index(universe), sort=False)]
+    return tail, close.ffill()
+
+
+def _seed_halted(storage, tail: pd.DataFrame, before: pd.Index, tickers: pd.Index) -> pd.DataFrame:
+    """윈도우 첫 행이 결측이지만 윈도우 안에 값이 있는 종목(윈도우 시작에 걸친 거래 정지)은
+    윈도우 이전의 마지막 유효 OHLCV를 첫 행에 채움 — 빌드의 전체 이력 ffill과 같은 가격·수익률.
+    이전 구간을 윈도우 길이부터 두 배씩 넓히며 읽고, 모두 찾거나 이력 시작에 닿으면 멈춘다 (없으면 상장 전)."""
+    first = tail.iloc[0]
+    cols  = [c for c in tail.columns
+             if c[1] in tickers and pd.isna(first[c]) and tail[c].notna().any()]
+    hi, span = len(before), len(tail)
+    tail = tail.copy()
+    while cols and hi > 0:
+        lo   = max(hi - span, 0)
+        prev = storage.load_range("ohlcv", before[lo], before[hi - 1]).reindex(columns=cols)
+        last = prev.ffill().iloc[-1] if len(prev) else pd.Series(np.nan, index=cols)
+        for c in cols:
+            if pd.notna(last[c]):
+                tail.iloc[0, tail.columns.get_loc(c)] = last[c]
+        cols = [c for c in cols if pd.isna(last[c])]
+        hi, span = lo, span * 2
+    return tail
+
+
+def live_inputs(tail: pd.DataFrame, close: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """load_ohlcv_window 결과 → 엔진 입력(dict). 빌드와 같은 종목 기준:
+    유니버스 ∩ 기준일 종가 보유 ∩ 첫 종가 이후 UNIVERSE_MIN_ROWS행 이상
+    (창 ≥ UNIVERSE_MIN_ROWS이므로 후행 윈도우로 판정 가능)."""
+    live = close.columns[close.iloc[-1].notna() & (close.notna().sum() >= UNIVERSE_MIN_ROWS)]
+    return {
+        "close":  close[live],
+        "high":   tail["High"][live].ffill(),
+        "low":    tail["Low"][live].ffill(),
+        "volume": tail["Volume"][live].ffill().fillna(0).where(close[live].notna()),
+    }
+
+
+def load_ohlcv_tail(n_rows: int, universe: list[str] | None = None) -> dict[str, pd.DataFrame]:
+    """ohlcv 마지막 n_rows 행만 읽어 엔진 입력(dict) 구성 (load_ohlcv_window + live_inputs)"""
+    return live_inputs(*load_ohlcv_window(n_rows, universe))
+
+
+def load_latest_factors(
+    features: list[str],
+    extra_rows: int = 20,
+    universe: list[str] | None = None,
+) -> tuple[pd.Timestamp, pd.DataFrame]:
+    """ohlcv의 후행 윈도우(최대 lookback + 여유분)만 사용해 최신 팩터 단면 계산.
+
+    factors.parquet 전체 빌드를 기다리지 않고 새 봉 도착 즉시 신호 재계산용.
+    universe: 모델의 빌드 유니버스 (meta.json "universe") — load_latest_normalized와 같은 종목 집합
+    Returns: (기준일, ticker × feature DataFrame)
+    """
+    inputs = load_ohlcv_tail(required_rows(features) + extra_rows, universe=universe)
+    return inputs["close"].index[-1], latest_cross_section(inputs, features)
@@ -0,0 +1,204 @@
+"""
+Metrics — 벡터화 성과 지표 (수익률 행렬 P × D → 지표별 (P,) 배열)
+
+  m = compute_metrics(R, dates=dates)          # R: (P, D) 일별 수익률, 스윕 전체를 한 번에
+  records(m)                                   # [{지표: 값}, ...] (소수 4자리, NaN → None)
+
+  - 요약: 총수익, CAGR, 변동성, Sharpe, Sortino, MDD, Calmar, 일 승률, 월 적중률,
+          최장 낙폭 기간(거래일), 현재 낙폭 기간, 연 회전율(회전율 입력 시)
+  - Sharpe 신뢰구간: stationary block bootstrap (Politis–Romano) — 평균 블록 길이 BOOT_BLOCK,
+    모든 시계열이 같은 재표본 인덱스를 공유 (같은 스윕 안에서 구간 폭 비교 가능, 시드 고정)
+  - 시계열: rolling_sharpe / rolling_vol / rolling_drawdown / drawdown — (P, D), 창 미만 구간 NaN
+  - 정의는 기존 _calc_metrics와 같다: Sharpe = mean / (std(ddof=1) + 1e-9) × √252,
+    CAGR = 최종 누적^(1/max(연수, 0.1)) - 1
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+PERIODS      = 252
+BOOT_BLOCK   = 21          # 평균 블록 길이 (거래일, 약 1개월)
+BOOT_ALPHA   = 0.05        # 95% 구간
+BOOT_SEED    = 0
+
+SUMMARY_KEYS = (
+    "total_return", "cagr", "vol", "sharpe", "sortino", "max_drawdown", "calmar",
+    "win_rate", "monthly_hit_rate", "max_dd_days", "current_dd_days",
+    "sharpe_ci_lo", "sharpe_ci_hi",
+)
+
+
+def _2d(R) -> np.ndarray:
+    R = np.asarray(R, dtype=np.float64)
+    return R[None, :] if R.ndim == 1 else R
+
+
+def _sharpe(R: np.ndarray, axis: int = -1) -> np.ndarray:
+    std = R.std(axis=axis, ddof=1) if R.shape[axis] > 1 else np.zeros(R.shape[:-1])
+    return R.mean(axis=axis) / (std + 1e-9) * np.sqrt(PERIODS)
+
+
+# ─── 1. 낙폭 ──────────────────────────────────────────────────
+
+def drawdown(R) -> np.ndarray:
+    """수중 곡선 (P, D): 누적 / 누적 고점 - 1"""
+    cum = np.cumprod(1 + _2d(R), axis=1)
+    return cum / np.maximum.accumulate(cum, axis=1) - 1
+
+
+def drawdown_durations(R) -> tuple[np.ndarray, np.ndarray]:
+    """(최장 낙폭 기간, 현재 낙폭 기간) — 직전 고점 이후 경과 거래일"""
+    under = drawdown(R) < 0
+    t     = np.arange(under.shape[1])
+    last_peak = np.maximum.accumulate(np.where(under, 0, t), axis=1)
+    dur   = t - last_peak
+    return dur.max(axis=1), dur[:, -1]
+
+
+# ─── 2. 롤링 ──────────────────────────────────────────────────
+
+def _rolling_sums(R: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    c1 = np.concatenate([np.zeros((len(R), 1)), np.cumsum(R, axis=1)], axis=1)
+    c2 = np.concatenate([np.zeros((len(R), 1)), np.cumsum(R * R, axis=1)], axis=1)
+    return c1[:, window:] - c1[:, :-window], c2[:, window:] - c2[:, :-window]
+
+
+def _pad(X: np.ndarray, window: int) -> np.ndarray:
+    return np.concatenate([np.full((len(X), window - 1), np.nan), X], axis=1)
+
+
+def rolling_vol(R, window: int = PERIODS) -> np.ndarray:
+    """연환산 롤링 변동성 (P, D)"""
+    R = _2d(R)
+    if R.shape[1] < window:
+        return np.full(R.shape, np.nan)
+    s1, s2 = _rolling_sums(R, window)
+    var = np.maximum(s2 - s1 * s1 / window, 0) / (window - 1)
+    return _pad(np.sqrt(var * PERIODS), window)
+
+
+def rolling_sharpe(R, window: int = PERIODS) -> np.ndarray:
+    """롤링 Sharpe (P, D)"""
+    R = _2d(R)
+    if R.shape[1] < window:
+        return np.full(R.shape, np.nan)
+    s1, s2 = _rolling_sums(R, window)
+    std = np.sqrt(np.maximum(s2 - s1 * s1 / window, 0) / (window - 1))
+    return _pad(s1 / window / (std + 1e-9) * np.sqrt(PERIODS), window)
+
+
+def rolling_drawdown(R, window: int = PERIODS) -> np.ndarray:
+    """롤링 낙폭 (P, D): 누적 / 최근 window일 고점 - 1"""
+    from numpy.lib.stride_tricks import sliding_window_view
+    R = _2d(R)
+    if R.shape[1] < window:
+        return np.full(R.shape, np.nan)
+    cum  = np.cumprod(1 + R, axis=1)
+    peak = sliding_window_view(cum, window, axis=1).max(axis=2)
+    return _pad(cum[:, window - 1:] / peak - 1, window)
+
+
+# ─── 3. Bootstrap ─────────────────────────────────────────────
+
+def stationary_bootstrap_blocks(n: int, n_boot: int, block: float = BOOT_BLOCK,
+                                seed: int = BOOT_SEED) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """stationary bootstrap 재표본의 블록 구성 — 블록 길이 ~ Geometric(1/block), 시작점 균등, 원형 연결.
+    Returns: (시작 인덱스, 길이, 재표본별 첫 블록 위치) — 블록은 재표본 순으로 나열"""
+    rng    = np.random.default_rng(seed)
+    starts = rng.integers(0, n, size=(n_boot, n))
+    new    = rng.random((n_boot, n)) < 1.0 / block
+    new[:, 0] = True
+    flat   = np.flatnonzero(new)
+    b, t   = np.divmod(flat, n)
+    t_next = np.where(np.append(b[1:], n_boot) == b, np.append(t[1:], n), n)
+    return starts.ravel()[flat], t_next - t, np.flatnonzero(t == 0)
+
+
+def stationary_bootstrap_indices(n: int, n_boot: int, block: float = BOOT_BLOCK,
+                                 seed: int = BOOT_SEED) -> np.ndarray:
+    """재표본 인덱스 (n_boot, n) — stationary_bootstrap_blocks를 펼친 것 (같은 시드면 같은 재표본)"""
+    origin, length, _ = stationary_bootstrap_blocks(n, n_boot, block, seed)
+    offset = np.arange(n_boot * n) - np.repeat(np.cumsum(length) - length, length)
+    return ((np.repeat(origin, length) + offset) % n).reshape(n_boot, n)
+
+
+def bootstrap_sharpe(R, n_boot: int, block: float = BOOT_BLOCK, alpha: float = BOOT_ALPHA,
+                     seed: int = BOOT_SEED) -> tuple[np.ndarray, np.ndarray]:
+    """Sharpe 백분위 신뢰구간 (lo, hi) — (P,) 각각. n_boot = 0이면 NaN.
+    재표본을 펼치지 않고 블록 합(원형 누적합 차분)만 더해 평균·분산 계산 → 비용 ∝ 블록 수 (≈ D / block)"""
+    R = _2d(R)
+    P, D = R.shape
+    if n_boot <= 0 or D < 2:
+        return np.full(P, np.nan), np.full(P, np.nan)
+    origin, length, first = stationary_bootstrap_blocks(D, n_boot, block, seed)
+    RR    = np.concatenate([R, R], axis=1)                                  # 원형 연결
+    zero  = np.zeros((P, 1))
+    c1    = np.concatenate([zero, np.cumsum(RR, axis=1)], axis=1)
+    c2    = np.concatenate([zero, np.cumsum(RR * RR, axis=1)], axis=1)
+    s1    = np.add.reduceat(c1[:, origin + length] - c1[:, origin], first, axis=1)   # (P, n_boot)
+    s2    = np.add.reduceat(c2[:, origin + length] - c2[:, origin], first, axis=1)
+    std   = np.sqrt(np.maximum(s2 - s1 * s1 / D, 0) / (D - 1))
+    boots = s1 / D / (std + 1e-9) * np.sqrt(PERIODS)
+    lo, hi = np.quantile(boots, [alpha / 2, 1 - alpha / 2], axis=1)
+    return lo, hi
+
+
+# ─── 4. 요약 ──────────────────────────────────────────────────
+
+def monthly_hit_rate(R, dates) -> np.ndarray:
+    """월 수익률 > 0 비율 (P,)"""
+    import pandas as pd
+    R      = _2d(R)
+    month  = pd.DatetimeIndex(dates).to_period("M").asi8
+    starts = np.flatnonzero(np.r_[True, month[1:] != month[:-1]])
+    monthly = np.expm1(np.add.reduceat(np.log1p(R), starts, axis=1))
+    return (monthly > 0).mean(axis=1)
+
+
+def compute_metrics(R, dates=None, turnover=None, n_boot: int | None = None) -> dict[str, np.ndarray]:
+    """수익률 행렬 (P, D) → {지표: (P,) 배열}.
+    dates: 월 적중률용 (없으면 NaN) / turnover: 리밸런싱 회전율 (P, K) → annual_turnover 추가
+    n_boot: bootstrap 횟수 (None → config.BACKTEST_BOOTSTRAP, 0 → 신뢰구간 NaN)"""
+    if n_boot is None:
+        from config import BACKTEST_BOOTSTRAP
+        n_boot = BACKTEST_BOOTSTRAP
+    R     = _2d(R)
+    P, D  = R.shape
+    years = max(D / PERIODS, 0.1)
+    cum   = np.cumprod(1 + R, axis=1)
+    final = cum[:, -1]
+    mdd   = (cum / np.maximum.accumulate(cum, axis=1) - 1).min(axis=1)
+    cagr  = final ** (1 / years) - 1
+    down  = np.sqrt((np.minimum(R, 0) ** 2).mean(axis=1))
+    std   = R.std(axis=1, ddof=1) if D > 1 else np.zeros(P)
+    max_dd_days, cur_dd_days = drawdown_durations(R)
+    ci_lo, ci_hi = bootstrap_sharpe(R, n_boot)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = {
+            "total_return":     final - 1,
+            "cagr":             cagr,
+            "vol":              std * np.sqrt(PERIODS),
+            "sharpe":           _sharpe(R),
+            "sortino":          np.where(down > 0, R.mean(axis=1) / down * np.sqrt(PERIODS), np.nan),
+            "max_drawdown":     mdd,
+            "calmar":           np.where(mdd < 0, cagr / np.abs(mdd), np.nan),
+            "win_rate":         (R > 0).mean(axis=1),
+            "monthly_hit_rate": monthly_hit_rate(R, dates) if dates is not None else np.full(P, np.nan),
+            "max_dd_days":      max_dd_days.astype(np.float64),
+            "current_dd_days":  cur_dd_days.astype(np.float64),
+            "sharpe_ci_lo":     ci_lo,
+            "sharpe_ci_hi":     ci_hi,
+        }
+    if turnover is not None:
+        out["annual_turnover"] = np.asarray(turnover, dtype=np.float64).reshape(P, -1).sum(axis=1) / years
+    return out
+
+
+def records(metrics: dict[str, np.ndarray], decimals: int = 4) -> list[dict]:
+    """지표 배열 → 시계열별 dict 목록 (반올림, NaN → None — JSON 직렬화 가능)"""
+    keys = list(metrics)
+    cols = [np.round(np.asarray(metrics[k], dtype=np.float64), decimals) for k in keys]
+    return [{k: (None if np.isnan(v) else float(v)) for k, v in zip(keys, row)}
+            for row in zip(*cols)]
@@ -0,0 +1,199 @@
+"""
+ModelBundle — 네이티브 모델 번들 저장 + 앙상블 예측기
+
+번들 구성 (models/trained/v{...}/):
+  manifest.json  : 포맷 버전, 피처 순서, 앙상블 구성, 모델별 파일
+  xgboost.ubj    : XGBoost 네이티브 부스터 (UBJSON)
+  lightgbm.txt   : LightGBM 네이티브 부스터 (텍스트)
+  ridge.npz      : Ridge 계수/절편
+  scaler.npz     : RobustScaler center/scale
+  ridge_stats.npz: Ridge 충분통계량 (선택 — 하루치 통계를 더해 Ridge만 일일 재적합할 때 사용)
+
+EnsemblePredictor는 번들을 한 번 로드해 두고 predict(X) 한 번으로 앙상블 평균을 반환한다.
+  - 스케일러는 배열 연산 1회, Ridge는 스케일러와 합성한 아핀 변환 1회(X @ w + b)
+  - 부스터는 inplace_predict / 네이티브 predict (pickle·sklearn 래퍼 없음)
+  - 로드 후 상태를 바꾸지 않으므로 여러 스레드에서 동시에 호출 가능
+    (LightGBM 예측만 부스터별 락으로 직렬화)
+
+구버전 디렉터리(*.pkl만 있는 경우)는 pickle 폴백으로 같은 인터페이스를 제공한다.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = 1
+MANIFEST      = "manifest.json"
+
+MODEL_FILES = {
+    "xgboost":  "xgboost.ubj",
+    "lightgbm": "lightgbm.txt",
+    "ridge":    "ridge.npz",
+}
+
+
+# ─── 저장 ─────────────────────────────────────────────────────
+
+def save_bundle(
+    version_dir: str,
+    trained: dict,
+    scaler,
+    features: list[str],
+    ensemble: list[str],
+    ridge_moments=None,
+) -> dict:
+    """학습된 sklearn 래퍼 모델 → 네이티브 번들 파일 + manifest.json"""
+    os.makedirs(version_dir, exist_ok=True)
+    files = {}
+    for name, model in trained.items():
+        path = os.path.join(version_dir, MODEL_FILES[name])
+        if name == "xgboost":
+            model.get_booster().save_model(path)
+        elif name == "lightgbm":
+            model.booster_.save_model(path)
+        elif name == "ridge":
+            np.savez(path, coef=np.asarray(model.coef_, dtype=np.float64),
+                     intercept=np.float64(model.intercept_))
+        else:
+            raise ValueError(f"지원하지 않는 모델: {name}")
+        files[name] = MODEL_FILES[name]
+
+    np.savez(os.path.join(version_dir, "scaler.npz"),
+             center=np.asarray(scaler.center_, dtype=np.float64),
+             scale=np.asarray(scaler.scale_, dtype=np.float64))
+
+    manifest = {
+        "format":   BUNDLE_FORMAT,
+        "features": list(features),
+        "ensemble": list(ensemble),
+        "models":   files,
+        "scaler":   "scaler.npz",
+    }
+    if ridge_moments is not None:
+        ridge_moments.save(os.path.join(version_dir, "ridge_stats.npz"))
+        manifest["ridge_stats"] = "ridge_stats.npz"
+    with open(os.path.join(version_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# ─── 예측기 ───────────────────────────────────────────────────
+
+class EnsemblePredictor:
+    """번들 1개를 메모리에 상주시키는 스레드 안전 앙상블 예측기"""
+
+    def __init__(self, features: list[str], center: np.ndarray, scale: np.ndarray,
+                 boosters: dict, linear: dict[str, tuple[np.ndarray, float]], path: str = ""):
+        self.features = list(features)
+        self.path     = path
+        self.center   = center
+        self.scale    = scale
+        self.boosters = boosters                       # name → 예측 함수 (스케일된 X → 예측)
+        self.names    = list(boosters) + list(linear)
+
+        # 스케일러 ∘ Ridge = 원본 X에 대한 아핀 변환 하나로 합성
+        if linear:
+            W = np.stack([coef / scale for coef, _ in linear.values()], axis=1)      # (K, L)
+            b = np.array([icpt - (center / scale) @ coef for coef, icpt in linear.values()])
+            self._W, self._b = W, b
+        else:
+            self._W = self._b = None
+
+    def __repr__(self) -> str:
+        return f"EnsemblePredictor({self.names}, {len(self.features)} features, {self.path!r})"
+
+    def _matrix(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[self.features].to_numpy(dtype=np.float64)
+        return np.ascontiguousarray(X, dtype=np.float64)
+
+    def predict_models(self, X) -> dict[str, np.ndarray]:
+        """모델별 예측 (원본 피처 X → {모델명: 예측})"""
+        X   = self._matrix(X)
+        out = {}
+        if self.boosters:
+            X_sc = (X - self.center) / self.scale
+            for name, fn in self.boosters.items():
+                out[name] = fn(X_sc)
+        if self._W is not None:
+            lin = X @ self._W + self._b
+            for j, name in enumerate(self.names[len(self.boosters):]):
+                out[name] = lin[:, j]
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        """앙상블 동일가중 평균"""
+        preds = self.predict_models(X)
+        return np.mean(np.column_stack(list(preds.values())), axis=1)
+
+
+def _xgb_predictor(path: str):
+    import xgboost as xgb
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return lambda X: booster.inplace_predict(X)        # inplace_predict는 스레드 안전
+
+
+def _lgb_predictor(path: str):
+    import lightgbm as lgb
+    booster = lgb.Booster(model_file=path)
+    lock    = threading.Lock()
+
+    def predict(X):
+        with lock:
+            return booster.predict(X)
+    return predict
+
+
+def _load_legacy(model_dir: str, meta: dict) -> EnsemblePredictor:
+    """번들 이전(pickle) 버전 디렉터리 로드"""
+    import pickle
+    with open(os.path.join(model_dir, "scaler.pkl"), "rb") as f:
+        scaler = pickle.load(f)
+    boosters, linear = {}, {}
+    for name in meta["ensemble"]:
+        with open(os.path.join(model_dir, f"{name}.pkl"), "rb") as f:
+            model = pickle.load(f)
+        if name == "ridge":
+            linear[name] = (np.asarray(model.coef_, dtype=np.float64), float(model.intercept_))
+        else:
+            boosters[name] = model.predict
+    return EnsemblePredictor(meta["features"], scaler.center_, scaler.scale_,
+                             boosters, linear, path=model_dir)
+
+
+def load_predictor(model_dir: str) -> EnsemblePredictor:
+    """models/trained/{버전 | latest} → EnsemblePredictor"""
+    manifest_path = os.path.join(model_dir, MANIFEST)
+    if not os.path.exists(manifest_path):
+        with open(os.path.join(model_dir, "meta.json")) as f:
+            return _load_legacy(model_dir, json.load(f))
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"지원하지 않는 번들 포맷: {manifest.get('format')}")
+
+    sc = np.load(os.path.join(model_dir, manifest["scaler"]))
+    boosters, linear = {}, {}
+    for name in manifest["ensemble"]:
+        path = os.path.join(model_dir, manifest["models"][name])
+        if name == "xgboost":
+            boosters[name] = _xgb_predictor(path)
+        elif name == "lightgbm":
+            boosters[name] = _lgb_predictor(path)
+        elif name == "ridge":
+            z = np.load(path)
+            linear[name] = (z["coef"], float(z["intercept"]))
+        else:
+            raise ValueError(f"지원하지 않는 모델: {name}")
+
+    return EnsemblePredictor(manifest["features"], sc["center"], sc["scale"],
+                             boosters, linear, path=os.path.realpath(model_dir))
@@ -0,0 +1,180 @@
+"""
+ModelServer — API 프로세스 상주 모델 레지스트리 (핫 리로드 + 롤백)
+
+  - 최초 접근 시 models/trained/latest 번들을 한 번 로드해 메모리에 유지
+  - refresh(): latest 심볼릭 링크 대상 또는 model_registry.json 수정 시각이 바뀌었을 때만
+               새 버전을 (락 밖에서) 로드한 뒤 참조를 원자적으로 교체
+  - 직전 버전은 메모리에 남겨 rollback()으로 즉시 복귀
+  - predict(frame[, model]): 모든 라우터가 쓰는 단일 예측 진입점 → 요청당 모델 파일 I/O 없음
+
+refresh()는 backend/main.py의 APScheduler 주기 작업(MODEL_RELOAD_SEC)이 호출한다.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from services.model_bundle import EnsemblePredictor, load_predictor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    version:   str
+    path:      str
+    predictor: EnsemblePredictor
+    meta:      dict = field(default_factory=dict)
+    loaded_at: str = ""
+
+    @property
+    def normalization(self) -> dict | None:
+        return self.meta.get("normalization")
+
+    @property
+    def universe(self) -> list[str] | None:
+        """빌드 유니버스 (라이브 팩터 계산 종목 집합, 예전 모델은 정규화 스펙에서)"""
+        return self.meta.get("universe") or (self.normalization or {}).get("universe")
+
+    @property
+    def features(self) -> list[str]:
+        """모델 입력 피처 (단면 정규화 모델이면 {factor}_cs)"""
+        return self.predictor.features
+
+    @property
+    def raw_features(self) -> list[str]:
+        """팩터 계산에 필요한 원본 팩터 이름"""
+        if not self.normalization:
+            return self.features
+        from services.cross_section import CS_SUFFIX
+        return [f[: -len(CS_SUFFIX)] if f.endswith(CS_SUFFIX) else f for f in self.features]
+
+    def summary(self) -> dict:
+        return {
+            "version":   self.version,
+            "path":      self.path,
+            "models":    self.predictor.names,
+            "features":  len(self.features),
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelServer:
+
+    def __init__(self, models_dir: str, registry_path: str):
+        self.models_dir    = models_dir
+        self.registry_path = registry_path
+        self._lock     = threading.Lock()      # 교체/롤백 직렬화 (예측 경로는 락 없음)
+        self._current:  ModelVersion | None = None
+        self._previous: ModelVersion | None = None
+        self._stamp:    tuple | None = None
+
+    # ── 버전 감시 ────────────────────────────────────────────
+
+    def _latest_path(self) -> str:
+        return os.path.realpath(os.path.join(self.models_dir, "latest"))
+
+    def _watch_stamp(self) -> tuple:
+        """(latest 대상 경로, model_registry.json mtime) — 둘 중 하나라도 바뀌면 새 버전"""
+        try:
+            reg_mtime = os.path.getmtime(self.registry_path)
+        except OSError:
+            reg_mtime = None
+        return self._latest_path(), reg_mtime
+
+    def _load(self, path: str) -> ModelVersion:
+        meta = {}
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        return ModelVersion(
+            version=meta.get("version", os.path.basename(path)),
+            path=path,
+            predictor=load_predictor(path),
+            meta=meta,
+            loaded_at=datetime.now().isoformat(timespec="seconds"),
+        )
+
+    def refresh(self, force: bool = False) -> bool:
+        """새 버전이 있으면 로드 후 교체. Returns: 교체 여부"""
+        stamp = self._watch_stamp()
+        if not force and stamp == self._stamp:
+            return False
+
+        path = stamp[0]
+        if not os.path.isdir(path):
+            return False
+        if not force and self._current is not None and self._current.path == path:
+            self._stamp = stamp                  # 레지스트리만 갱신됨 (같은 버전)
+            return False
+
+        try:
+            new = self._load(path)               # 로드는 락 밖에서 — 서빙 중단 없음
+        except Exception as e:
+            logger.error(f"모델 로드 실패 ({path}): {e} — 현재 버전 유지")
+            return False
+
+        with self._lock:
+            if self._current is not None and self._current.path != new.path:
+                self._previous = self._current
+            self._current = new
+            self._stamp   = stamp
+        logger.info(f"모델 교체: {new.version} ({new.predictor.names})")
+        return True
+
+    def rollback(self) -> ModelVersion:
+        """직전 버전으로 즉시 복귀 (latest 링크가 다시 바뀔 때까지 유지)"""
+        with self._lock:
+            if self._previous is None:
+                raise RuntimeError("롤백할 이전 버전 없음")
+            self._current, self._previous = self._previous, self._current
+            current = self._current
+        logger.warning(f"모델 롤백: {current.version}")
+        return current
+
+    # ── 서빙 ─────────────────────────────────────────────────
+
+    def current(self) -> ModelVersion | None:
+        if self._current is None:
+            self.refresh()
+        return self._current
+
+    def predict(self, frame: pd.DataFrame, model: ModelVersion | None = None) -> pd.Series:
+        """ticker × feature 프레임 → 앙상블 신호 Series (결측 피처는 0).
+        model: 호출자가 피처 계산에 쓴 버전 스냅샷 (생략 시 현재 버전) — 도중 교체가 있어도 같은 버전으로 예측"""
+        model = model or self.current()
+        if model is None:
+            raise RuntimeError("서빙 가능한 모델 없음")
+        X = frame.reindex(columns=model.features).fillna(0).to_numpy(dtype=np.float64)
+        return pd.Series(model.predictor.predict(X), index=frame.index, name="signal")
+
+    def status(self) -> dict:
+        return {
+            "current":  self._current.summary() if self._current else None,
+            "previous": self._previous.summary() if self._previous else None,
+        }
+
+
+_server: ModelServer | None = None
+_server_lock = threading.Lock()
+
+
+def get_model_server() -> ModelServer:
+    """프로세스 전역 ModelServer (models/trained, models/model_registry.json 감시)"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            from config import BASE_DIR
+            _server = ModelServer(
+                models_dir=os.path.join(BASE_DIR, "models", "trained"),
+                registry_path=os.path.join(BASE_DIR, "models", "model_registry.json"),
+            )
+        return _server
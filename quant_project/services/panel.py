@@ -0,0 +1,86 @@
+"""
+DatePanel — 날짜 오프셋(CSR) 기반 (date, ticker) 학습 패널
+
+롱 포맷 팩터 DataFrame을 한 번만 정리(dropna)해 C-연속 NumPy 배열로 보관하고,
+날짜별 행 시작 위치(indptr, CSR row pointer)를 함께 저장한다.
+패널이 날짜 순으로 정렬돼 있으므로 연속 기간 윈도우는 배열의 연속 구간 →
+isin 마스크 / dropna 복사 없이 뷰(zero-copy) 슬라이스로 꺼낼 수 있다.
+
+  panel = DatePanel.from_frame(df, features)
+  X_tr, y_tr = panel.window(train_start, train_end)   # 뷰
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class DatePanel:
+    dates:        pd.DatetimeIndex   # 고유 날짜 (오름차순)
+    indptr:       np.ndarray         # (D+1,) 날짜 d의 행 = [indptr[d], indptr[d+1])
+    X:            np.ndarray         # (rows, K) 피처 — 결측 행 제거 완료
+    y:            np.ndarray         # (rows,)   타겟
+    ticker_codes: np.ndarray         # (rows,)   tickers 인덱스
+    tickers:      pd.Index
+    features:     list[str]
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        features: list[str],
+        target: str = "target_next",
+        dtype=np.float64,
+    ) -> "DatePanel":
+        """(date, ticker) 인덱스 패널 → DatePanel. 피처/타겟 중 하나라도 NaN인 행은 제외."""
+        if not df.index.get_level_values("date").is_monotonic_increasing:
+            df = df.sort_index(level="date", sort_remaining=False)
+
+        d_codes, dates   = pd.factorize(df.index.get_level_values("date"), sort=True)
+        t_codes, tickers = pd.factorize(df.index.get_level_values("ticker"))
+
+        X = df[features].to_numpy(dtype=dtype)
+        y = df[target].to_numpy(dtype=dtype)
+        keep = ~np.isnan(X).any(axis=1) & ~np.isnan(y)
+
+        counts = np.bincount(d_codes[keep], minlength=len(dates))
+        indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        return cls(
+            dates=pd.DatetimeIndex(dates),
+            indptr=indptr,
+            X=np.ascontiguousarray(X[keep]),
+            y=np.ascontiguousarray(y[keep]),
+            ticker_codes=t_codes[keep].astype(np.int32),
+            tickers=pd.Index(tickers),
+            features=list(features),
+        )
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def span(self, start, end) -> slice:
+        """[start, end] 날짜 구간(양끝 포함)의 행 슬라이스"""
+        a = self.dates.searchsorted(pd.Timestamp(start), side="left")
+        b = self.dates.searchsorted(pd.Timestamp(end),   side="right")
+        return slice(int(self.indptr[a]), int(self.indptr[b]))
+
+    def window(self, start, end) -> tuple[np.ndarray, np.ndarray]:
+        """[start, end] 구간의 (X, y) 뷰 — 복사 없음"""
+        sl = self.span(start, end)
+        return self.X[sl], self.y[sl]
+
+    def row_dates(self, sl: slice = slice(None)) -> pd.DatetimeIndex:
+        """행별 날짜 (예측 결과를 (date, ticker)로 되돌릴 때 사용)"""
+        counts = np.diff(self.indptr)
+        return self.dates.repeat(counts)[sl]
+
+    def index(self, sl: slice = slice(None)) -> pd.MultiIndex:
+        """행 슬라이스의 (date, ticker) MultiIndex"""
+        return pd.MultiIndex.from_arrays(
+            [self.row_dates(sl), self.tickers[self.ticker_codes[sl]]],
+            names=["date", "ticker"],
+        )
@@ -0,0 +1,153 @@
+"""
+RidgeStats — 충분통계량 기반 Ridge (윈도우 적합 = k×k solve 1회)
+
+Ridge(fit_intercept=True)의 해는 (n, Σx, Σy, XᵀX, Xᵀy)만으로 결정된다.
+날짜별 충분통계량을 한 번 누적해 두면:
+  - 임의 기간 [start, end]의 통계 = 누적합 차이 (O(K²))
+  - alpha별 해 = K×K 선형계 solve 1회 → 촘촘한 alpha 그리드도 사실상 무료
+  - 스케일러(center/scale)는 아핀 변환이라 통계를 다시 읽지 않고 해에 반영
+  - 하루치 통계를 더하면(RidgeMoments + RidgeMoments.from_arrays(X_day, y_day)) 최종 모델 일일 갱신
+
+  stats = RidgeStats.from_panel(panel)
+  m     = stats.window(train_start, train_end)
+  fit   = m.fit(alpha=10.0, center=scaler.center_, scale=scaler.scale_)   # sklearn Ridge와 동일 해
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+class RidgeFit:
+    """충분통계량으로 구한 Ridge 해 (save_bundle이 쓰는 coef_/intercept_ 인터페이스)"""
+
+    def __init__(self, coef: np.ndarray, intercept: float, alpha: float):
+        self.coef_      = coef
+        self.intercept_ = intercept
+        self.alpha      = alpha
+
+    def __repr__(self) -> str:
+        return f"RidgeFit(alpha={self.alpha}, k={len(self.coef_)})"
+
+    def predict(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+@dataclass
+class RidgeMoments:
+    """한 기간의 충분통계량. 수치 안정성을 위해 shift(패널 평균)를 뺀 값으로 누적."""
+    n:     float
+    sx:    np.ndarray      # (K,)   Σ(x - shift_x)
+    sy:    float           #        Σ(y - shift_y)
+    xx:    np.ndarray      # (K, K) Σ(x - shift_x)(x - shift_x)ᵀ
+    xy:    np.ndarray      # (K,)   Σ(x - shift_x)(y - shift_y)
+    shift_x: np.ndarray
+    shift_y: float
+
+    @classmethod
+    def from_arrays(cls, X, y, shift_x=None, shift_y=None) -> "RidgeMoments":
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        shift_x = X.mean(axis=0) if shift_x is None else np.asarray(shift_x, dtype=np.float64)
+        shift_y = float(y.mean()) if shift_y is None else float(shift_y)
+        Xc, yc = X - shift_x, y - shift_y
+        return cls(n=float(len(y)), sx=Xc.sum(axis=0), sy=float(yc.sum()),
+                   xx=Xc.T @ Xc, xy=Xc.T @ yc, shift_x=shift_x, shift_y=shift_y)
+
+    def __add__(self, other: "RidgeMoments") -> "RidgeMoments":
+        """두 기간 통계 합 (other는 같은 shift 기준이어야 함 — 다르면 재기준화)"""
+        other = other.rebase(self.shift_x, self.shift_y)
+        return RidgeMoments(self.n + other.n, self.sx + other.sx, self.sy + other.sy,
+                            self.xx + other.xx, self.xy + other.xy, self.shift_x, self.shift_y)
+
+    def rebase(self, shift_x, shift_y: float) -> "RidgeMoments":
+        """shift 기준 변경: x' = x - a, a = 새 shift - 기존 shift"""
+        a = np.asarray(shift_x, dtype=np.float64) - self.shift_x
+        b = float(shift_y) - self.shift_y
+        if not a.any() and b == 0:
+            return self
+        sx = self.sx - self.n * a
+        sy = self.sy - self.n * b
+        xx = self.xx - np.outer(self.sx, a) - np.outer(a, self.sx) + self.n * np.outer(a, a)
+        xy = self.xy - a * self.sy - self.sx * b + self.n * a * b
+        return RidgeMoments(self.n, sx, sy, xx, xy, np.asarray(shift_x, dtype=np.float64), float(shift_y))
+
+    def fit(self, alpha: float, center=None, scale=None) -> RidgeFit:
+        """Ridge(alpha).fit((X - center) / scale, y) 와 같은 해.
+        반환 계수는 스케일된 입력 기준 (save_bundle / EnsemblePredictor 규약)."""
+        k     = len(self.sx)
+        mx    = self.sx / self.n                               # shift 기준 평균
+        my    = self.sy / self.n
+        C     = self.xx - self.n * np.outer(mx, mx)            # 중심화 scatter
+        cxy   = self.xy - self.n * mx * my
+        scale = np.ones(k) if scale is None else np.asarray(scale, dtype=np.float64)
+        center = np.zeros(k) if center is None else np.asarray(center, dtype=np.float64)
+
+        # Z = (X - center) / scale → Z 중심화 scatter = C / (s sᵀ), Zᵀy = cxy / s
+        A    = C / np.outer(scale, scale) + alpha * np.eye(k)
+        coef = np.linalg.solve(A, cxy / scale)
+        mean_z = (mx + self.shift_x - center) / scale
+        intercept = float(my + self.shift_y - mean_z @ coef)
+        return RidgeFit(coef, intercept, alpha)
+
+    def save(self, path: str) -> None:
+        np.savez(path, n=self.n, sx=self.sx, sy=self.sy, xx=self.xx, xy=self.xy,
+                 shift_x=self.shift_x, shift_y=self.shift_y)
+
+    @classmethod
+    def load(cls, path: str) -> "RidgeMoments":
+        z = np.load(path)
+        return cls(float(z["n"]), z["sx"], float(z["sy"]), z["xx"], z["xy"],
+                   z["shift_x"], float(z["shift_y"]))
+
+
+@dataclass
+class RidgeStats:
+    """날짜별 충분통계량의 누적합 (prefix sum) — 기간 통계를 O(K²)로 꺼낸다"""
+    dates:   pd.DatetimeIndex
+    n:       np.ndarray     # (D+1,)
+    sx:      np.ndarray     # (D+1, K)
+    sy:      np.ndarray     # (D+1,)
+    xx:      np.ndarray     # (D+1, K, K)
+    xy:      np.ndarray     # (D+1, K)
+    shift_x: np.ndarray
+    shift_y: float
+
+    @classmethod
+    def from_panel(cls, panel) -> "RidgeStats":
+        """DatePanel → 날짜별 통계 누적 (날짜 블록마다 K×K 행렬곱 1회)"""
+        X, y   = panel.X, panel.y
+        D, K   = len(panel.dates), X.shape[1]
+        shift_x = X.mean(axis=0).astype(np.float64)
+        shift_y = float(y.mean())
+
+        n  = np.zeros(D + 1)
+        sx = np.zeros((D + 1, K))
+        sy = np.zeros(D + 1)
+        xx = np.zeros((D + 1, K, K))
+        xy = np.zeros((D + 1, K))
+        for d in range(D):
+            a, b = panel.indptr[d], panel.indptr[d + 1]
+            if a == b:
+                continue
+            Xc = X[a:b].astype(np.float64) - shift_x
+            yc = y[a:b].astype(np.float64) - shift_y
+            n[d + 1], sx[d + 1], sy[d + 1] = b - a, Xc.sum(axis=0), yc.sum()
+            xx[d + 1], xy[d + 1] = Xc.T @ Xc, Xc.T @ yc
+
+        for arr in (n, sx, sy, xx, xy):
+            np.cumsum(arr, axis=0, out=arr)
+        return cls(panel.dates, n, sx, sy, xx, xy, shift_x, shift_y)
+
+    def window(self, start, end) -> RidgeMoments:
+        """[start, end] 날짜 구간(양끝 포함)의 통계"""
+        a = self.dates.searchsorted(pd.Timestamp(start), side="left")
+        b = self.dates.searchsorted(pd.Timestamp(end),   side="right")
+        return RidgeMoments(float(self.n[b] - self.n[a]), self.sx[b] - self.sx[a],
+                            float(self.sy[b] - self.sy[a]), self.xx[b] - self.xx[a],
+                            self.xy[b] - self.xy[a], self.shift_x, self.shift_y)
+
+    def total(self) -> RidgeMoments:
+        return self.window(self.dates[0], self.dates[-1])
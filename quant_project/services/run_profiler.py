@@ -0,0 +1,160 @@
+"""
+RunProfiler — 학습 파이프라인 단계별 계측 (벽시계 / CPU 시간 / 최대 RSS)
+
+  prof = RunProfiler()
+  with prof.stage("walk_forward"):
+      with prof.stage("window_03", window=3):
+          ...
+  prof.write(version_dir)     # run_report.json (+ profile.folded)
+
+  - 단계는 중첩 가능 → 기록마다 경로(path)를 남겨 트리/집계 양쪽으로 볼 수 있음
+  - CPU 시간은 프로세스 전체(모든 스레드) 기준, RSS는 단계 동안 백그라운드 샘플링한 최댓값
+  - 워커 프로세스에서 만든 기록은 records()로 반환 → 메인에서 merge(records, parent)로 편입
+  - profile.folded: flamegraph.pl / speedscope 호환 접힌 스택 (값 = 단계 고유 벽시계 ms)
+"""
+
+from __future__ import annotations
+import json
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+RSS_SAMPLE_SEC = 0.05
+REPORT_FILE    = "run_report.json"
+FOLDED_FILE    = "profile.folded"
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_mb() -> float:
+    """현재 RSS (MB). /proc가 없으면 프로세스 수명 최대 RSS로 대체."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if os.uname().sysname == "Darwin" else peak / 2**10
+
+
+class RunProfiler:
+
+    def __init__(self, sample_sec: float = RSS_SAMPLE_SEC):
+        self.sample_sec = sample_sec
+        self._records: list[dict] = []
+        self._stack:   list[str] = []
+        self._open:    list[dict] = []         # 진행 중 단계 (RSS 최댓값 갱신 대상)
+        self._lock     = threading.Lock()
+        self._sampler: threading.Thread | None = None
+        self._t0       = time.perf_counter()
+
+    # ── 계측 ─────────────────────────────────────────────────
+
+    def _sample(self) -> None:
+        while True:
+            with self._lock:
+                if not self._open:
+                    self._sampler = None
+                    return
+                rss = _rss_mb()
+                for rec in self._open:
+                    rec["peak_rss_mb"] = max(rec["peak_rss_mb"], rss)
+            time.sleep(self.sample_sec)
+
+    @contextmanager
+    def stage(self, name: str, **tags):
+        rec = {"path": [*self._stack, name], "peak_rss_mb": _rss_mb(), "pid": os.getpid(), **tags}
+        with self._lock:
+            self._open.append(rec)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, daemon=True)
+                self._sampler.start()
+        self._stack.append(name)
+        started, wall0, cpu0 = time.time(), time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        finally:
+            rec["started_at"] = round(started, 4)          # epoch — 프로세스 간 정렬 기준
+            rec["wall_s"]     = round(time.perf_counter() - wall0, 4)
+            rec["cpu_s"]      = round(time.process_time() - cpu0, 4)
+            self._stack.pop()
+            with self._lock:
+                self._open.remove(rec)
+                rec["peak_rss_mb"] = round(max(rec["peak_rss_mb"], _rss_mb()), 1)
+                self._records.append(rec)
+
+    def current_path(self) -> list[str]:
+        """현재 열려 있는 단계 경로"""
+        return list(self._stack)
+
+    def records(self) -> list[dict]:
+        with self._lock:
+            return list(self._records)
+
+    def merge(self, records: list[dict], parent: list[str] | None = None) -> None:
+        """다른 프로세스의 기록을 parent 경로 아래로 편입"""
+        parent = list(parent or [])
+        with self._lock:
+            self._records.extend({**r, "path": parent + r["path"]} for r in records)
+
+    # ── 보고서 ───────────────────────────────────────────────
+
+    def summary(self) -> list[dict]:
+        """단계 이름(경로 끝)별 합계 — 시간 많이 쓴 순"""
+        agg: dict[str, dict] = {}
+        for r in self.records():
+            a = agg.setdefault(r["path"][-1], {"stage": r["path"][-1], "count": 0, "wall_s": 0.0,
+                                                "cpu_s": 0.0, "peak_rss_mb": 0.0})
+            a["count"]  += 1
+            a["wall_s"] += r["wall_s"]
+            a["cpu_s"]  += r["cpu_s"]
+            a["peak_rss_mb"] = max(a["peak_rss_mb"], r["peak_rss_mb"])
+        for a in agg.values():
+            a["wall_s"], a["cpu_s"] = round(a["wall_s"], 3), round(a["cpu_s"], 3)
+        return sorted(agg.values(), key=lambda a: a["wall_s"], reverse=True)
+
+    def folded(self) -> list[str]:
+        """접힌 스택 라인 'a;b;c <ms>' — 값은 자식 단계를 뺀 고유 시간.
+        노드 시간 = max(기록된 벽시계 합, 자식 노드 시간 합): 워커에서 편입된 자식이
+        부모 기록보다 길어도(대기 중 워커 실행) 이중 계산하지 않는다."""
+        recorded: dict[tuple, float] = {}
+        children: dict[tuple, set] = {}
+        for r in self.records():
+            path = tuple(r["path"])
+            recorded[path] = recorded.get(path, 0.0) + r["wall_s"]
+            for k in range(1, len(path)):
+                children.setdefault(path[:k], set()).add(path[:k + 1])
+
+        total: dict[tuple, float] = {}
+
+        def node_total(path: tuple) -> float:
+            if path not in total:
+                kids = sum(node_total(c) for c in children.get(path, ()))
+                total[path] = max(recorded.get(path, 0.0), kids)
+            return total[path]
+
+        lines = []
+        for path in sorted(set(recorded) | set(children)):
+            own = node_total(path) - sum(node_total(c) for c in children.get(path, ()))
+            if own > 0:
+                lines.append(f"{';'.join(path)} {int(round(own * 1000))}")
+        return lines
+
+    def report(self, **meta) -> dict:
+        return {
+            **meta,
+            "total_wall_s": round(time.perf_counter() - self._t0, 3),
+            "summary":      self.summary(),
+            "stages":       sorted(self.records(), key=lambda r: r["started_at"]),
+        }
+
+    def write(self, out_dir, folded: bool = False, **meta) -> str:
+        """out_dir/run_report.json (+ profile.folded) 기록. Returns: 보고서 경로"""
+        path = os.path.join(str(out_dir), REPORT_FILE)
+        with open(path, "w") as f:
+            json.dump(self.report(**meta), f, indent=2, default=str)
+        if folded:
+            with open(os.path.join(str(out_dir), FOLDED_FILE), "w") as f:
+                f.write("\n".join(self.folded()) + "\n")
+        return path
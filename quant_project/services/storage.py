@@ -5,8 +5,11 @@ DB 교체 시 config.py의 STORAGE_BACKEND 값만 변경
 
 from __future__ import annotations
 import os
+import shutil
 import logging
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -16,6 +19,9 @@ logger = logging.getLogger(__name__)
 
 class BaseStorage(ABC):
 
+    # load_range / iter_parts가 필요한 부분만 읽는지 (아웃오브코어 팩터 빌드 요구 사항)
+    CHUNKED_READS = False
+
     @abstractmethod
     def save(self, df: pd.DataFrame, table: str, **kwargs) -> None:
         ...
@@ -32,11 +38,68 @@ class BaseStorage(ABC):
     def exists(self, table: str) -> bool:
         ...
 
+    def save_part(self, df: pd.DataFrame, table: str, part: int) -> None:
+        """분할 저장 (아웃오브코어 빌드용) — part 0이면 기존 테이블 교체"""
+        if part == 0:
+            self.save(df, table)
+        else:
+            self.append(df, table)
+
+    def add_part(self, df: pd.DataFrame, table: str) -> None:
+        """기존 행을 다시 쓰지 않고 분할 하나 추가 (열 구성·타입은 기존 분할과 같아야 함) — 기본 구현은 append"""
+        if self.exists(table):
+            self.append(df, table)
+        else:
+            self.save(df, table)
+
+    def iter_parts(self, table: str, columns: list[str] | None = None) -> Iterator[pd.DataFrame]:
+        """분할 단위 순차 로드 — 기본 구현은 전체를 한 번에 반환"""
+        df = self.load(table)
+        yield df[columns] if columns is not None else df
+
+    def load_index(self, table: str) -> pd.Index:
+        """인덱스(날짜)만 — 기본 구현은 전체 로드"""
+        return self.load(table).index
+
+    def load_range(self, table: str, start, end) -> pd.DataFrame:
+        """start ≤ 인덱스 ≤ end 행 (인덱스 정렬) — 기본 구현은 전체 로드 후 자름"""
+        df = self.load(table).sort_index()
+        return df[(df.index >= start) & (df.index <= end)]
+
+    def load_tail(self, table: str, n_rows: int) -> pd.DataFrame:
+        """인덱스(날짜) 기준 마지막 n_rows행"""
+        index = self.load_index(table).sort_values()
+        if len(index) <= n_rows:
+            return self.load(table).sort_index()
+        return self.load_range(table, index[-n_rows], index[-1]).iloc[-n_rows:]
+
+    def delete(self, table: str) -> None:
+        raise NotImplementedError(f"{type(self).__name__}.delete")
+
+    def _lock_dir(self) -> str:
+        from config import DATA_PROCESSED
+        return DATA_PROCESSED
+
+    @contextmanager
+    def lock(self, name: str):
+        """프로세스 간 배타 잠금 (읽기-수정-쓰기 구간용, POSIX flock).
+        같은 저장소를 쓰는 CLI 스크립트·API 프로세스·워커가 같은 잠금 파일을 공유한다."""
+        import fcntl
+        os.makedirs(self._lock_dir(), exist_ok=True)
+        with open(os.path.join(self._lock_dir(), f".{name}.lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
 
 # ─── Parquet 구현체 (프로토타입) ──────────────────────────────
 
 class ParquetStorage(BaseStorage):
 
+    CHUNKED_READS = True
+
     def __init__(self, base_dir: str | None = None):
         from config import DATA_PROCESSED
         self.base_dir = base_dir or DATA_PROCESSED
@@ -45,9 +108,17 @@ class ParquetStorage(BaseStorage):
     def _path(self, table: str) -> str:
         return os.path.join(self.base_dir, f"{table}.parquet")
 
+    def _lock_dir(self) -> str:
+        return self.base_dir
+
     def save(self, df: pd.DataFrame, table: str, **kwargs) -> None:
+        """임시 파일에 쓴 뒤 교체 → 다른 프로세스가 쓰는 중인 파일을 읽지 않는다"""
         path = self._path(table)
-        df.to_parquet(path, **kwargs)
+        tmp  = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp, **kwargs)
+        if os.path.isdir(path):           # 이전 분할 저장본 교체
+            shutil.rmtree(path)
+        os.replace(tmp, path)
         logger.info(f"저장 완료: {path} ({len(df):,}행)")
 
     def load(self, table: str, **filters) -> pd.DataFrame:
@@ -60,6 +131,33 @@ class ParquetStorage(BaseStorage):
                 df = df[df[col] == val]
         return df
 
+    def _index_column(self, table: str) -> str | None:
+        """단일 파일 + 이름 있는 단일 인덱스면 parquet 상의 인덱스 열 이름 (RangeIndex·파트 디렉터리는 None)"""
+        import pyarrow.parquet as pq
+        path = self._path(table)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"파일 없음: {path}")
+        if not os.path.isfile(path):
+            return None
+        index_cols = (pq.ParquetFile(path).schema_arrow.pandas_metadata or {}).get("index_columns", [])
+        return index_cols[0] if len(index_cols) == 1 and isinstance(index_cols[0], str) else None
+
+    def load_index(self, table: str) -> pd.Index:
+        """인덱스 열만 읽음"""
+        import pyarrow.parquet as pq
+        col = self._index_column(table)
+        if col is None:
+            return super().load_index(table)
+        return pd.Index(pq.read_table(self._path(table), columns=[col]).column(0).to_pandas())
+
+    def load_range(self, table: str, start, end) -> pd.DataFrame:
+        """`start ≤ 인덱스 ≤ end` 필터로 읽음 — 행 그룹 통계(min/max)로 구간 밖 행 그룹은 건너뜀
+        (행 그룹이 하나뿐인 파일은 필터 적용 전 전체를 읽음 — 저장 시 row_group_size 지정)"""
+        col = self._index_column(table)
+        if col is None:
+            return super().load_range(table, start, end)
+        return pd.read_parquet(self._path(table), filters=[(col, ">=", start), (col, "<=", end)]).sort_index()
+
     def append(self, df: pd.DataFrame, table: str) -> None:
         if self.exists(table):
             existing = self.load(table)
@@ -69,6 +167,55 @@ class ParquetStorage(BaseStorage):
     def exists(self, table: str) -> bool:
         return os.path.exists(self._path(table))
 
+    def delete(self, table: str) -> None:
+        path = self._path(table)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def save_part(self, df: pd.DataFrame, table: str, part: int) -> None:
+        """{table}.parquet/ 디렉터리에 part-NNNNN.parquet 로 저장.
+        pd.read_parquet(디렉터리)가 파트를 합쳐 읽으므로 load()는 그대로 동작."""
+        path = self._path(table)
+        if part == 0:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif os.path.exists(path):
+                os.remove(path)
+            os.makedirs(path)
+        part_path = os.path.join(path, f"part-{part:05d}.parquet")
+        df.to_parquet(part_path, index=False)
+        logger.info(f"파트 저장: {part_path} ({len(df):,}행)")
+
+    def add_part(self, df: pd.DataFrame, table: str) -> None:
+        """{table}.parquet/ 에 다음 번호 파트 추가. 단일 파일이면 먼저 part-00000으로 옮긴다.
+        임시 파일(점으로 시작 → pd.read_parquet이 무시)에 쓴 뒤 교체."""
+        path = self._path(table)
+        if os.path.isfile(path):
+            moved = f"{path}.{os.getpid()}.file"
+            os.replace(path, moved)
+            os.makedirs(path)
+            os.replace(moved, os.path.join(path, "part-00000.parquet"))
+        os.makedirs(path, exist_ok=True)
+        n    = sum(name.endswith(".parquet") for name in os.listdir(path))
+        part = os.path.join(path, f"part-{n:05d}.parquet")
+        tmp  = os.path.join(path, f".part-{n:05d}.{os.getpid()}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, part)
+        logger.info(f"파트 추가: {part} ({len(df):,}행)")
+
+    def iter_parts(self, table: str, columns: list[str] | None = None) -> Iterator[pd.DataFrame]:
+        path = self._path(table)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"파일 없음: {path}")
+        if not os.path.isdir(path):
+            yield pd.read_parquet(path, columns=columns)
+            return
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".parquet"):
+                yield pd.read_parquet(os.path.join(path, name), columns=columns)
+
 
 # ─── PostgreSQL 스텁 (실전) ───────────────────────────────────
 
@@ -100,6 +247,11 @@ class PostgresStorage(BaseStorage):
         import sqlalchemy as sa
         return sa.inspect(self.engine).has_table(table)
 
+    def delete(self, table: str) -> None:
+        import sqlalchemy as sa
+        with self.engine.begin() as conn:
+            conn.execute(sa.text(f'DROP TABLE IF EXISTS "{table}"'))
+
 
 # ─── 팩토리 ──────────────────────────────────────────────────
 
@@ -0,0 +1,9 @@
+"""
+pytest 공통 설정 — 프로젝트 루트(quant_project)를 import 경로에 추가
+(scripts/*.py와 같은 방식: `from services import ...`, `import config`)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
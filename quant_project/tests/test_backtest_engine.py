@@ -0,0 +1,129 @@
+"""
+services.backtest_engine 행렬 커널 vs 기존 일별 루프 (run_single_backtest 원본) 동치성
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtest_engine import (
+    DEFAULT_COST, DEFAULT_VOL, MIN_AFTER_STOP, STOP_LOOKBACK, STOP_LOSS_1M,
+    get_regime_multiplier, prepare_inputs, simulate, simulate_family,
+)
+
+
+# ─── 기준 구현: 행렬 커널 도입 전 일별 루프 ─────────────────
+
+def reference_loop(scores, close, factors, macro, ml_weight, top_n,
+                   rule_scores=None, rule_weight=0.0, start="2017-01-01"):
+    """기존 run_single_backtest의 일별 루프 (지표 계산 전 일별 수익률 Series)"""
+    dates = scores.index[scores.index >= start]
+    months = pd.PeriodIndex(dates, freq="M")
+    rebal_dates = set(dates[np.concatenate([[True], months[1:] != months[:-1]])])
+
+    tickers_all  = scores.columns.tolist()
+    close_common = close.reindex(columns=tickers_all).reindex(dates).ffill()
+    regime_mult  = get_regime_multiplier(macro, dates, close=close)
+
+    total_w = ml_weight + (rule_weight if rule_scores is not None else 0.0)
+    if rule_scores is not None and rule_weight > 0.0 and total_w > 0:
+        ml_ranks   = scores.rank(axis=1, pct=True)
+        rule_ranks = rule_scores.reindex(index=scores.index, columns=scores.columns).rank(axis=1, pct=True)
+        combined   = (ml_weight * ml_ranks + rule_weight * rule_ranks) / total_w
+    else:
+        combined = scores
+
+    prev_weights  = pd.Series(0.0, index=tickers_all)
+    daily_returns = []
+    for i, date in enumerate(dates):
+        if date in rebal_dates:
+            day_scores = combined.loc[date].dropna()
+            if len(day_scores) < top_n:
+                weights = prev_weights
+            else:
+                valid_scores = day_scores
+                if i >= STOP_LOOKBACK:
+                    ret_1m = (close_common.loc[date] / close_common.loc[dates[i - STOP_LOOKBACK]] - 1).fillna(0)
+                    valid_scores = day_scores[day_scores.index.map(lambda t: ret_1m.get(t, 0) >= STOP_LOSS_1M)]
+                    if len(valid_scores) < MIN_AFTER_STOP:
+                        valid_scores = day_scores
+                ranked = valid_scores.nlargest(top_n).index.tolist()
+                if "vol_20" in factors.columns:
+                    vols = factors.loc[date, "vol_20"].reindex(ranked).fillna(DEFAULT_VOL).clip(lower=1e-4)
+                    w = (1.0 / vols) / (1.0 / vols).sum()
+                else:
+                    w = pd.Series(1.0 / len(ranked), index=ranked)
+                weights = pd.Series(0.0, index=tickers_all)
+                weights[ranked] = w.values
+                weights *= regime_mult.loc[date]
+            cost = (weights - prev_weights).abs().sum() * DEFAULT_COST
+            prev_weights = weights
+        else:
+            cost = 0.0
+
+        if i > 0:
+            ret = (close_common.loc[date] / close_common.loc[dates[i - 1]] - 1).fillna(0)
+            port_ret = (prev_weights * ret).sum() - cost
+        else:
+            port_ret = 0.0
+        daily_returns.append(port_ret)
+
+    return pd.Series(daily_returns, index=dates, name="return")
+
+
+# ─── 합성 데이터 ──────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def market():
+    rng   = np.random.default_rng(1)
+    dates = pd.bdate_range("2016-06-01", "2018-12-31")
+    N     = 40
+    tick  = [f"T{i:03d}" for i in range(N)] + ["SPY"]
+    close = pd.DataFrame(np.exp(np.cumsum(rng.normal(0, 0.03, (len(dates), N + 1)), 0)) * 50,
+                         index=dates, columns=tick)
+    close.iloc[100:130, 5] = np.nan                                   # 거래 정지 구간
+    scores = pd.DataFrame(rng.standard_normal((len(dates), N)).round(1),  # 동점 다수
+                          index=dates, columns=tick[:N])
+    scores[scores > 1.8] = np.nan
+    scores.iloc[:300, 30:] = np.nan                                   # 후보 부족 리밸런싱일
+    rule  = pd.DataFrame(rng.standard_normal((len(dates), N)), index=dates, columns=tick[:N])
+    idx   = pd.MultiIndex.from_product([dates, tick[:N]], names=["date", "ticker"])
+    factors = pd.DataFrame({"vol_20": rng.uniform(0.1, 0.6, len(idx))}, index=idx)
+    factors.loc[factors.sample(frac=0.1, random_state=0).index, "vol_20"] = np.nan
+    macro = pd.DataFrame({"VIXCLS": 15 + 20 * rng.random(len(dates)),
+                          "T10Y2Y": rng.normal(0.3, 0.5, len(dates))}, index=dates)
+    return scores, close, factors, macro, rule
+
+
+PARAMS = [
+    dict(ml_weight=0.5, top_n=10, rule_weight=0.3),
+    dict(ml_weight=1.0, top_n=10, rule_weight=0.0),
+    dict(ml_weight=0.5, top_n=5, rule_weight=0.7),
+    dict(ml_weight=0.5, top_n=35, rule_weight=0.3),
+]
+
+
+@pytest.mark.parametrize("with_vol", [True, False])
+@pytest.mark.parametrize("params", PARAMS)
+def test_simulate_matches_daily_loop(market, params, with_vol):
+    scores, close, factors, macro, rule = market
+    fac = factors if with_vol else factors[[]].assign(x=1.0)
+    expected = reference_loop(scores, close, fac, macro, params["ml_weight"], params["top_n"],
+                              rule_scores=rule, rule_weight=params["rule_weight"])
+    inp = prepare_inputs(scores, close, fac, macro, rule_scores=rule)
+    got = simulate(inp, params["ml_weight"], params["top_n"], params["rule_weight"])
+    pd.testing.assert_index_equal(got.index, expected.index)
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-12)
+
+
+def test_simulate_family_matches_single(market):
+    scores, close, factors, macro, rule = market
+    inp    = prepare_inputs(scores, close, factors, macro, rule_scores=rule)
+    top_ns = [5, 10, 35]
+    costs  = [0.0, DEFAULT_COST, 0.005]
+    R = simulate_family(inp, 0.5, 0.3, top_ns, costs)
+    assert R.shape == (len(top_ns), len(costs), len(inp.dates))
+    for t, top_n in enumerate(top_ns):
+        for c, cost in enumerate(costs):
+            single = simulate(inp, 0.5, top_n, 0.3, cost=cost).to_numpy()
+            np.testing.assert_allclose(R[t, c], single, rtol=0, atol=1e-12)
@@ -0,0 +1,88 @@
+"""
+services.cross_section 3차원 배치 정규화 vs 날짜별 단면 기준 구현 동치성
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.cross_section import _average_ranks, live_beta, normalize_panel, rolling_beta
+
+stats = pytest.importorskip("scipy.stats")
+
+
+# ─── 기준 구현: 날짜 × 팩터별 단면 루프 ─────────────────────
+
+def reference_normalize(y: np.ndarray, x: np.ndarray | None, method: str, winsor: float) -> np.ndarray:
+    """단면 1개 (N,) → 윈저라이징 → 변환 → 최소제곱 잔차 → 재표준화"""
+    out, ok = np.full_like(y, np.nan), ~np.isnan(y)
+    v = y[ok]
+    v = np.clip(v, v.mean() - winsor * v.std(), v.mean() + winsor * v.std())
+    if method == "rank":
+        v = (stats.rankdata(v) - 0.5) / len(v) - 0.5
+    else:
+        v = (v - v.mean()) / v.std()
+    if x is not None:
+        coef, *_ = np.linalg.lstsq(x[ok], v, rcond=None)
+        v = v - x[ok] @ coef
+        v = (v - v.mean()) / v.std()
+    out[ok] = v
+    return out
+
+
+@pytest.fixture(scope="module")
+def panel():
+    rng = np.random.default_rng(3)
+    D, N, K = 6, 50, 3
+    Y = rng.standard_normal((D, N, K))
+    Y[:, :, 1] = Y[:, :, 1].round(1)                 # 동점
+    Y[0, 3, 0] = 12.0                                # 윈저라이징 대상
+    Y[rng.random((D, N, K)) < 0.1] = np.nan
+    sector = rng.integers(0, 4, N)
+    onehot = (sector[:, None] == np.arange(4)[None, :]).astype(float)
+    beta   = rng.normal(1.0, 0.3, (D, N, 1))
+    X = np.concatenate([np.broadcast_to(onehot, (D, N, 4)), beta], axis=2)
+    return Y, X
+
+
+def test_average_ranks_match_scipy():
+    rng = np.random.default_rng(0)
+    Y = rng.integers(0, 5, (4, 30, 2)).astype(float)
+    got = _average_ranks(Y)
+    for d in range(Y.shape[0]):
+        for k in range(Y.shape[2]):
+            np.testing.assert_array_equal(got[d, :, k], stats.rankdata(Y[d, :, k]) - 1)
+
+
+@pytest.mark.parametrize("method", ["zscore", "rank"])
+@pytest.mark.parametrize("neutralize", [False, True])
+def test_normalize_panel_matches_per_date(panel, method, neutralize):
+    Y, X = panel
+    got = normalize_panel(Y, X if neutralize else None, method=method, winsor=3.0)
+    for d in range(Y.shape[0]):
+        for k in range(Y.shape[2]):
+            expected = reference_normalize(Y[d, :, k], X[d] if neutralize else None, method, 3.0)
+            np.testing.assert_allclose(got[d, :, k], expected, rtol=1e-6, atol=1e-6)
+
+
+def test_live_beta_matches_build_history(tmp_path, monkeypatch):
+    """저장소 후행 윈도우로 계산한 라이브 베타 == 전체 이력 ffill 종가 기준 빌드 베타
+    (윈도우 시작에 걸친 거래 정지, 윈도우 이전 상장 폐지 포함)"""
+    import services.storage as storage_mod
+    from services import factor_registry as fr
+
+    rng   = np.random.default_rng(5)
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    close = pd.DataFrame(np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), 4)), 0)),
+                         index=dates, columns=["A", "B", "C", "SPY"])
+    close.iloc[230:250, 1] = np.nan                  # 윈도우 시작에 걸친 거래 정지
+    close.iloc[200:, 2] = np.nan                     # 윈도우 이전 상장 폐지
+    store = storage_mod.ParquetStorage(str(tmp_path))
+    store.save(pd.concat({"Close": close, "High": close, "Low": close, "Volume": close * 0 + 1e5}, axis=1),
+               "ohlcv", row_group_size=50)
+    monkeypatch.setattr(storage_mod, "get_storage", lambda: store)
+
+    build = rolling_beta(close.ffill(), 60).iloc[-1]
+    _, window = fr.load_ohlcv_window(61, universe=list(close.columns))
+    live  = live_beta(window, 60)
+    pd.testing.assert_series_equal(live, build, check_exact=False, rtol=1e-10, atol=1e-12)
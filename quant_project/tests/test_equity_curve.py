@@ -0,0 +1,74 @@
+"""
+services.equity_curve 화면용 축소 (downsample / LTTB) 성질
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.equity_curve import EquityCurves, drawdown_extremes, lttb_indices
+
+
+@pytest.fixture(scope="module")
+def curves():
+    rng   = np.random.default_rng(11)
+    dates = pd.bdate_range("2015-01-01", periods=2000)
+    equity = rng.normal(0.0004, 0.012, len(dates))
+    equity[900:1000] -= 0.01                           # 뚜렷한 최대 낙폭 구간
+    spy = rng.normal(0.0003, 0.01, len(dates))
+    spy[300:380] -= 0.012
+    return EquityCurves.from_returns(dates, {"equity": equity, "spy": spy})
+
+
+def _mdd(v: np.ndarray) -> float:
+    v = v.astype(np.float64)
+    return float((v / np.maximum.accumulate(v) - 1).min())
+
+
+@pytest.mark.parametrize("max_points", [4, 6, 50, 500])
+def test_downsample_keeps_budget_and_drawdown(curves, max_points):
+    out = curves.downsample(max_points)
+    assert len(out) <= max_points
+    assert np.all(np.diff(out.days) > 0)
+    eq = curves.values["equity"]
+    _, top, trough, _ = drawdown_extremes(eq)
+    kept = set(out.days.tolist())
+    # 첫 곡선의 첫·끝 점과 최대 낙폭 (고점, 저점) → 축소 후에도 같은 MDD
+    assert {curves.days[0], curves.days[-1], curves.days[top], curves.days[trough]} <= kept
+    assert _mdd(out.values["equity"]) == pytest.approx(_mdd(eq), rel=1e-6)
+    if max_points >= 6:
+        _, s_top, s_trough, _ = drawdown_extremes(curves.values["spy"])
+        assert {curves.days[s_top], curves.days[s_trough]} <= kept
+        assert _mdd(out.values["spy"]) == pytest.approx(_mdd(curves.values["spy"]), rel=1e-6)
+
+
+@pytest.mark.parametrize("max_points", [1, 2, 3])
+def test_downsample_tiny_budget(curves, max_points):
+    """예산이 우선순위 점보다 작으면 우선순위 순으로 자름 (첫 점 → 끝 점 → 낙폭 고점)"""
+    _, top, _, _ = drawdown_extremes(curves.values["equity"])
+    out = curves.downsample(max_points)
+    assert len(out) == max_points
+    assert set(out.days.tolist()) == set(curves.days[[0, -1, top][:max_points]].tolist())
+
+
+def test_downsample_noop_when_short(curves):
+    assert curves.downsample(len(curves)) is curves
+    assert curves.downsample(0) is curves
+
+
+def test_downsample_values_are_original_points(curves):
+    out = curves.downsample(200)
+    pos = np.searchsorted(curves.days, out.days)
+    for name, v in curves.values.items():
+        np.testing.assert_array_equal(out.values[name], v[pos])
+
+
+def test_lttb_indices():
+    rng = np.random.default_rng(2)
+    y   = np.cumsum(rng.standard_normal(1000))
+    x   = np.arange(1000)
+    idx = lttb_indices(x, y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+    np.testing.assert_array_equal(lttb_indices(x, y, 2000), x)
@@ -0,0 +1,135 @@
+"""
+services.factor_registry DAG 엔진 vs 레지스트리 도입 전 종목별 수식 (build_factors._calc_single 원본) 동치성
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import factor_registry as fr
+from scripts import build_factors as bf
+
+ta = pytest.importorskip("ta")
+
+
+# ─── 기준 구현: 레지스트리 도입 전 _calc_single ─────────────
+
+def reference_single(ticker, c, h, l, v) -> pd.DataFrame:
+    ret   = c.pct_change()
+    ma50  = c.rolling(50).mean()
+    ma200 = c.rolling(200).mean()
+    tr    = pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1).max(axis=1)
+    vol_mean, vol_std = v.rolling(20).mean(), v.rolling(20).std()
+    target_next = ret.shift(-1)
+
+    df = pd.DataFrame({
+        "ret_1m":        c.pct_change(21),
+        "ret_3m":        c.pct_change(63),
+        "mom_gap":       (ma50 - ma200) / ma200,
+        "vol_20":        ret.rolling(20).std() * np.sqrt(252),
+        "downside_vol":  ret.clip(upper=0).rolling(20).std() * np.sqrt(252),
+        "natr":          tr.rolling(14).mean() / c,
+        "skew":          ret.rolling(60).skew(),
+        "kurt":          ret.rolling(60).kurt(),
+        "dol_vol":       (c * v).rolling(20).mean(),
+        "vol_zscore":    (v - vol_mean) / (vol_std + 1e-9),
+        "mfi":           ta.volume.MFIIndicator(high=h, low=l, close=c, volume=v, window=14,
+                                                fillna=False).money_flow_index(),
+        "rsi":           ta.momentum.RSIIndicator(close=c, window=14, fillna=False).rsi(),
+        "disparity_20":  (c / c.rolling(20).mean() - 1) * 100,
+        "ma_cross":      (ma50 > ma200).astype(float),
+        "target_next":   target_next,
+        "target_smooth": target_next.rolling(5).mean(),
+    }, index=c.index)
+    df.index.name = "date"
+    df["ticker"] = ticker
+    return df.dropna(subset=["target_next"]).reset_index().set_index(["date", "ticker"])
+
+
+# ─── 합성 데이터 ──────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def panel():
+    """date × ticker OHLCV (load_price_data와 같은 전처리) — 늦은 상장·거래 정지·거래량 0 구간 포함"""
+    rng   = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", periods=700)
+    tick  = [f"T{i}" for i in range(6)]
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), len(tick))), 0)),
+                         index=dates, columns=tick)
+    high  = close * (1 + np.abs(rng.normal(0, 0.01, close.shape)))
+    low   = close * (1 - np.abs(rng.normal(0, 0.01, close.shape)))
+    vol   = pd.DataFrame(rng.integers(100_000, 1_000_000, close.shape).astype(float),
+                         index=dates, columns=tick)
+    close.iloc[:150, 2] = high.iloc[:150, 2] = low.iloc[:150, 2] = vol.iloc[:150, 2] = np.nan   # 늦은 상장
+    close.iloc[300:320, 3] = np.nan                                                        # 거래 정지
+    vol.iloc[100:130, 4] = 0.0
+    return close.ffill(), high.ffill(), low.ffill(), vol.ffill().fillna(0)
+
+
+def _single_inputs(panel, ticker):
+    close, high, low, vol = panel
+    c = close[ticker].dropna()
+    return c, high[ticker].reindex(c.index).ffill(), low[ticker].reindex(c.index).ffill(), \
+        vol[ticker].reindex(c.index).fillna(0)
+
+
+def test_calc_single_matches_reference(panel):
+    for ticker in panel[0].columns:
+        args = _single_inputs(panel, ticker)
+        got  = bf._calc_single(ticker, *args)
+        expected = reference_single(ticker, *args)
+        assert list(got.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_calc_single_subset_resolves_dependencies(panel):
+    args = _single_inputs(panel, "T0")
+    got  = bf._calc_single("T0", *args, factors=["mom_gap", "rsi"])
+    full = bf._calc_single("T0", *args)
+    assert list(got.columns) == ["mom_gap", "rsi"] + bf.TARGET_COLS
+    pd.testing.assert_frame_equal(got, full[got.columns])
+
+
+def test_calc_block_matches_per_ticker(panel):
+    """종목 축 벡터화 (아웃오브코어 블록) == 종목별 루프 (calc_factors)"""
+    expected = bf.calc_factors(*panel)
+    got = bf._calc_block(*panel).reindex(expected.index)
+    pd.testing.assert_frame_equal(got[expected.columns], expected,
+                                  check_exact=False, rtol=1e-8, atol=1e-10)
+
+
+def test_latest_cross_section_matches_full_history(panel):
+    """최소 윈도우 라이브 단면 == 전체 이력 계산의 마지막 날짜 (RSI는 EWM 워밍업 잔차 허용)"""
+    close, high, low, vol = panel
+    feats = fr.factor_names()
+    full  = fr.compute({"close": close, "high": high, "low": low, "volume": vol}, feats)
+    n     = fr.required_rows(feats)
+    tail  = {k: x.iloc[-n:] for k, x in dict(close=close, high=high, low=low, volume=vol).items()}
+    xs    = fr.latest_cross_section(tail, feats)
+    for f in feats:
+        atol = 1e-3 if f == "rsi" else 1e-9
+        np.testing.assert_allclose(xs[f].to_numpy(), full[f].iloc[-1].to_numpy(),
+                                   rtol=1e-9, atol=atol, err_msg=f)
+
+
+def test_live_window_matches_build_across_halt(panel, tmp_path, monkeypatch):
+    """저장소 후행 윈도우(load_ohlcv_tail) 단면 == 빌드(전체 이력 ffill) 마지막 날짜 — 윈도우 시작에 걸친 거래 정지 포함"""
+    import services.storage as storage_mod
+
+    close, high, low, vol = (x.copy() for x in panel)
+    feats = fr.factor_names()
+    n     = fr.required_rows(feats)
+    for x in (close, high, low, vol):
+        x.iloc[-n - 15:-n + 10, 1] = np.nan
+    store = storage_mod.ParquetStorage(str(tmp_path))
+    store.save(pd.concat({"Close": close, "High": high, "Low": low, "Volume": vol}, axis=1),
+               "ohlcv", row_group_size=100)
+    monkeypatch.setattr(storage_mod, "get_storage", lambda: store)
+
+    full = fr.compute({"close": close.ffill(), "high": high.ffill(), "low": low.ffill(),
+                       "volume": vol.ffill().fillna(0)}, feats)
+    xs   = fr.latest_cross_section(fr.load_ohlcv_tail(n, universe=list(close.columns)), feats)
+    for f in feats:
+        atol = 1e-3 if f == "rsi" else 1e-9
+        np.testing.assert_allclose(xs[f].to_numpy(), full[f].iloc[-1].reindex(xs.index).to_numpy(),
+                                   rtol=1e-9, atol=atol, err_msg=f)
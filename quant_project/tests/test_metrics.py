@@ -0,0 +1,76 @@
+"""
+services.metrics 벡터화 지표 vs 시계열별 루프 기준 구현, bootstrap 신뢰구간 성질
+"""
+
+import numpy as np
+import pytest
+
+from services.metrics import (
+    BOOT_ALPHA, PERIODS, bootstrap_sharpe, compute_metrics, drawdown_durations,
+    stationary_bootstrap_blocks, stationary_bootstrap_indices,
+)
+
+
+@pytest.fixture(scope="module")
+def returns():
+    rng = np.random.default_rng(7)
+    R = rng.normal(0.0005, 0.01, (5, 750))
+    R[1] -= 0.001                                      # 음의 Sharpe
+    R[2, 400:] = 0.0                                   # 고점 이후 평탄 (낙폭 아님)
+    return R
+
+
+def reference_durations(r: np.ndarray) -> tuple[int, int]:
+    cum, peak, since, longest = 1.0, 1.0, 0, 0
+    for x in r:
+        cum *= 1 + x
+        if cum >= peak:
+            peak, since = cum, 0
+        else:
+            since += 1
+        longest = max(longest, since)
+    return longest, since
+
+
+def test_drawdown_durations_match_loop(returns):
+    longest, current = drawdown_durations(returns)
+    for p, r in enumerate(returns):
+        assert (longest[p], current[p]) == reference_durations(r)
+
+
+def test_compute_metrics_match_loop(returns):
+    m = compute_metrics(returns, n_boot=0)
+    for p, r in enumerate(returns):
+        cum = np.cumprod(1 + r)
+        assert m["total_return"][p] == pytest.approx(cum[-1] - 1, rel=1e-12)
+        assert m["sharpe"][p] == pytest.approx(r.mean() / r.std(ddof=1) * np.sqrt(PERIODS), rel=1e-6)
+        assert m["max_drawdown"][p] == pytest.approx((cum / np.maximum.accumulate(cum) - 1).min(), rel=1e-12)
+    assert np.isnan(m["sharpe_ci_lo"]).all() and np.isnan(m["sharpe_ci_hi"]).all()
+
+
+def test_bootstrap_ci_brackets_point_sharpe(returns):
+    m = compute_metrics(returns, n_boot=500)
+    assert (m["sharpe_ci_lo"] < m["sharpe"]).all()
+    assert (m["sharpe"] < m["sharpe_ci_hi"]).all()
+
+
+def test_bootstrap_matches_explicit_resamples(returns):
+    """블록 누적합 경로 == 재표본 인덱스를 펼쳐 직접 계산한 Sharpe 분위수"""
+    n_boot = 200
+    lo, hi = bootstrap_sharpe(returns, n_boot, seed=3)
+    idx    = stationary_bootstrap_indices(returns.shape[1], n_boot, seed=3)
+    for p, r in enumerate(returns):
+        s = r[idx]
+        boots = s.mean(axis=1) / (s.std(axis=1, ddof=1) + 1e-9) * np.sqrt(PERIODS)
+        exp_lo, exp_hi = np.quantile(boots, [BOOT_ALPHA / 2, 1 - BOOT_ALPHA / 2])
+        assert lo[p] == pytest.approx(exp_lo, rel=1e-6)
+        assert hi[p] == pytest.approx(exp_hi, rel=1e-6)
+
+
+def test_bootstrap_blocks_cover_each_resample():
+    n, n_boot = 50, 30
+    origin, length, first = stationary_bootstrap_blocks(n, n_boot, block=5.0, seed=1)
+    assert len(first) == n_boot
+    sizes = np.add.reduceat(length, first)
+    np.testing.assert_array_equal(sizes, np.full(n_boot, n))
+    assert ((origin >= 0) & (origin < n)).all()